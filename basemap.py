@@ -0,0 +1,270 @@
+import hashlib
+import os
+import time
+import numpy as np
+from lazy_imports import lazy_import
+
+gpd = lazy_import('geopandas')
+plt = lazy_import('matplotlib.pyplot')
+mpimg = lazy_import('matplotlib.image')
+
+# geopandas 1.x no longer ships naturalearth_lowres; the same 1:110m country polygons
+# are downloaded from Natural Earth by an explicit `python basemap.py --fetch` and read
+# from the local file afterwards, so rendering never waits on the network.
+NATURAL_EARTH_URL = 'https://naciscdn.org/naturalearth/110m/cultural/ne_110m_admin_0_countries.zip'
+BASEMAP_CACHE_DIR = '.basemap_cache'
+BASEMAP_FILE = os.path.join(BASEMAP_CACHE_DIR, 'ne_110m_admin_0_countries.zip')
+BASEMAP_PATH = os.environ.get('TALL_BUILDINGS_BASEMAP', BASEMAP_FILE)
+FETCH_TIMEOUT = 30
+
+# Simplification tolerance in degrees per zoom level; 0 keeps the full geometry.
+ZOOM_TOLERANCES = (0.5, 0.1, 0.02, 0.0)
+WORLD_EXTENT = (-180, 180, -90, 90)  # (lon_min, lon_max, lat_min, lat_max)
+BASEMAP_STYLE = {'color': 'lightgrey', 'edgecolor': 'black', 'linewidth': 0.5}
+
+# Basemaps loaded in this process, by source path.
+_basemaps = {}
+
+
+def fetch_basemap(url=NATURAL_EARTH_URL, path=BASEMAP_FILE, timeout=FETCH_TIMEOUT):
+    """
+    Downloads the basemap to a local file.
+
+    Parameters:
+    - url (str): The world file to download.
+    - path (str): Where to store it.
+    - timeout (float): Request timeout in seconds.
+
+    Returns:
+    - str: `path`, or None if the download failed.
+    """
+    import requests
+    try:
+        response = requests.get(url, timeout=timeout)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"Error: Could not download the basemap from {url}: {e}")
+        return None
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(response.content)
+    os.replace(tmp_path, path)
+    return path
+
+
+def zoom_for_extent(extent):
+    """
+    Picks the zoom level for a map extent: the wider the map, the coarser the geometry.
+    """
+    span = max(extent[1] - extent[0], extent[3] - extent[2])
+    if span >= 90:
+        return 0
+    if span >= 20:
+        return 1
+    if span >= 5:
+        return 2
+    return 3
+
+
+class Basemap:
+    """
+    World polygons prepared for repeated map rendering.
+
+    Simplified geometries are computed once per zoom level, and backgrounds rasterized
+    once per zoom level, extent and size (in memory and, with a cache directory, as PNG
+    files), so a map only has to draw its own layers on top.
+    """
+
+    def __init__(self, world, cache_dir=BASEMAP_CACHE_DIR, key='world'):
+        """
+        Parameters:
+        - world (GeoDataFrame): Country polygons; reprojected to EPSG:4326 if needed.
+        - cache_dir (str): Directory for rasterized backgrounds, or None to keep them in memory only.
+        - key (str): Identifies the source in the names of the cached files.
+        """
+        if world.crs is not None and world.crs.to_epsg() != 4326:
+            world = world.to_crs('EPSG:4326')
+        self.world = world[['geometry']]
+        self.cache_dir = cache_dir
+        self.key = key
+        self._simplified = {}
+        self._backgrounds = {}
+
+    @classmethod
+    def load(cls, path=BASEMAP_PATH, cache_dir=BASEMAP_CACHE_DIR):
+        """
+        Reads a world file, keeping a GeoParquet copy in `cache_dir` so the source is
+        parsed only once. A URL is downloaded first with fetch_basemap(), which times out
+        instead of stalling the caller.
+
+        Returns:
+        - Basemap: The basemap, or None if the source cannot be read.
+        """
+        key = hashlib.sha256(path.encode('utf-8')).hexdigest()[:16]
+        local_path = os.path.join(cache_dir, f'{key}.parquet') if cache_dir else None
+        try:
+            if local_path and os.path.exists(local_path):
+                world = gpd.read_parquet(local_path)
+            else:
+                if path.startswith(('http://', 'https://')):
+                    download = os.path.join(cache_dir or '.', f'{key}{os.path.splitext(path)[1]}')
+                    path = fetch_basemap(path, download)
+                    if path is None:
+                        return None
+                elif not os.path.exists(path):
+                    print(f"Error: No basemap at {path}; run 'python basemap.py --fetch' to download it.")
+                    return None
+                world = gpd.read_file(path)
+                if local_path:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    world[['geometry']].to_parquet(local_path + '.tmp')
+                    os.replace(local_path + '.tmp', local_path)
+        except Exception as e:
+            print(f"Error: Could not load the basemap from {path}: {e}")
+            return None
+        return cls(world, cache_dir=cache_dir, key=key)
+
+    def geometries(self, zoom=0):
+        """
+        The world polygons simplified for a zoom level (see ZOOM_TOLERANCES).
+        """
+        zoom = min(zoom, len(ZOOM_TOLERANCES) - 1)
+        if zoom not in self._simplified:
+            tolerance = ZOOM_TOLERANCES[zoom]
+            geometry = self.world.geometry
+            self._simplified[zoom] = geometry.simplify(tolerance, preserve_topology=True) if tolerance else geometry
+        return self._simplified[zoom]
+
+    def background(self, zoom, extent, size):
+        """
+        The basemap rasterized for a zoom level, extent and image size in pixels.
+
+        Returns:
+        - ndarray: RGBA image of shape (height, width, 4).
+        """
+        key = (zoom, tuple(extent), tuple(size))
+        if key in self._backgrounds:
+            return self._backgrounds[key]
+        path = None
+        if self.cache_dir:
+            name = '-'.join(str(part) for part in (self.key, zoom, *extent, *size))
+            path = os.path.join(self.cache_dir, f'{name}.png')
+        if path and os.path.exists(path):
+            image = (mpimg.imread(path) * 255).astype(np.uint8)
+        else:
+            image = self._rasterize(zoom, extent, size)
+            if path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                mpimg.imsave(path, image)
+        self._backgrounds[key] = image
+        return image
+
+    def _rasterize(self, zoom, extent, size):
+        dpi = 100
+        fig = plt.figure(figsize=(size[0] / dpi, size[1] / dpi), dpi=dpi)
+        ax = fig.add_axes([0, 0, 1, 1])
+        self.geometries(zoom).plot(ax=ax, **BASEMAP_STYLE)
+        ax.set_xlim(extent[0], extent[1])
+        ax.set_ylim(extent[2], extent[3])
+        ax.set_aspect('auto')
+        ax.set_axis_off()
+        fig.canvas.draw()
+        image = np.asarray(fig.canvas.buffer_rgba()).copy()
+        plt.close(fig)
+        return image
+
+    def draw(self, ax, zoom=None, extent=WORLD_EXTENT, raster=True, size=None):
+        """
+        Draws the basemap into `ax` and sets the axes to `extent`.
+
+        Parameters:
+        - ax (Axes): The axes to draw into.
+        - zoom (int): Zoom level; chosen from the extent if None.
+        - extent (tuple): (lon_min, lon_max, lat_min, lat_max) in degrees.
+        - raster (bool): Draw the cached background image instead of the polygons.
+        - size (tuple): Background size in pixels when `raster` is True; defaults to the
+          size of the axes, so the image is drawn without resampling.
+        """
+        zoom = zoom_for_extent(extent) if zoom is None else zoom
+        ax.set_xlim(extent[0], extent[1])
+        ax.set_ylim(extent[2], extent[3])
+        ax.set_aspect('equal')
+        if raster:
+            if size is None:
+                ax.apply_aspect()
+                bbox = ax.get_window_extent()
+                size = (round(bbox.width), round(bbox.height))
+            ax.imshow(self.background(zoom, extent, size), extent=extent, origin='upper',
+                      zorder=0, interpolation='nearest')
+        else:
+            self.geometries(zoom).plot(ax=ax, zorder=0, **BASEMAP_STYLE)
+        ax.set_xlim(extent[0], extent[1])
+        ax.set_ylim(extent[2], extent[3])
+
+
+def get_basemap(path=BASEMAP_PATH, cache_dir=BASEMAP_CACHE_DIR):
+    """
+    Returns the basemap for `path`, loading it only on the first call in this process.
+    A source that failed to load is not retried in this process, and None is returned
+    for it.
+    """
+    if path not in _basemaps:
+        _basemaps[path] = Basemap.load(path, cache_dir)
+    return _basemaps[path]
+
+
+def benchmark_basemap(geo_df, n_maps=20, path=BASEMAP_PATH, zoom=None, output_dir='charts'):
+    """
+    Times rendering `n_maps` global maps with the basemap read from `path` on every
+    call (the original plot_global_distribution), with the cached polygons and with the
+    cached background image. `zoom` is passed to plot_global_distribution; the highest
+    level draws the unsimplified polygons.
+
+    Returns:
+    - DataFrame: Total and per-map seconds per approach.
+    """
+    import pandas as pd
+    from geographical_analysis import plot_global_distribution
+
+    os.makedirs(output_dir, exist_ok=True)
+    output_file = os.path.join(output_dir, 'basemap_benchmark.png')
+    results = []
+
+    start = time.perf_counter()
+    for _ in range(n_maps):
+        world = gpd.read_file(path)
+        fig, ax = plt.subplots(figsize=(15, 10))
+        world.plot(ax=ax, **BASEMAP_STYLE)
+        geo_df.plot(ax=ax, color='blue', markersize=10, alpha=0.7)
+        fig.savefig(output_file, bbox_inches='tight')
+        plt.close(fig)
+    results.append({'approach': 'read per map', 'seconds': time.perf_counter() - start})
+
+    for raster in (False, True):
+        get_basemap(path)  # load outside the timed loop, as in a long-running process
+        start = time.perf_counter()
+        for _ in range(n_maps):
+            plot_global_distribution(geo_df, output_file=output_file, zoom=zoom, raster=raster,
+                                     basemap_path=path)
+        results.append({'approach': 'cached background image' if raster else 'cached polygons',
+                        'seconds': time.perf_counter() - start})
+
+    results = pd.DataFrame(results)
+    results['ms_per_map'] = results['seconds'] / n_maps * 1000
+    print(results.to_string(index=False))
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    if '--fetch' in sys.argv:
+        if fetch_basemap() is None:
+            sys.exit(1)
+        print(f"Basemap saved to {BASEMAP_FILE}.")
+        sys.exit(0)
+    plt.switch_backend('Agg')
+    from dataset_cache import read_dataset
+    from geographical_analysis import prepare_geodata
+    data = read_dataset(sys.argv[1] if len(sys.argv) > 1 else 'tallest_buildings.csv', clean=True)
+    benchmark_basemap(prepare_geodata(data))
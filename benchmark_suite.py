@@ -0,0 +1,147 @@
+import argparse
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from instrumentation import Instrumentation
+from synthetic_data import generate_buildings
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def _benchmarks(raw, clean, csv_path, max_model_rows, seed):
+    """
+    The functions to time, as (name, rows processed, callable) for one dataset size.
+    """
+    from data_cleaning import clean_data, detect_outliers
+    from data_analysis import calculate_summary_statistics
+    from geographical_analysis import prepare_geodata
+    from main import getBuildingsByCountry
+    from predictive_model import feature_engineering, prepare_data, train_random_forest
+    from streaming_stats import outlier_mask
+
+    numeric = clean.select_dtypes('number')
+    model_data = clean.sample(min(len(clean), max_model_rows), random_state=seed) if max_model_rows else clean
+
+    def buildings_by_country():
+        return [getBuildingsByCountry(country, file_path=csv_path) for country in clean['Country'].unique()]
+
+    def predictive_model():
+        X_train, X_test, y_train, y_test = prepare_data(feature_engineering(model_data.copy(deep=False)))
+        return train_random_forest(X_train, y_train)
+
+    return [
+        ('clean_data', len(raw), lambda: clean_data(raw)),
+        ('detect_outliers', len(clean), lambda: detect_outliers(clean, 'Height')),
+        ('outlier_mask', len(clean), lambda: outlier_mask(clean)),
+        ('calculate_summary_statistics', len(numeric), lambda: calculate_summary_statistics(numeric)),
+        ('getBuildingsByCountry', len(clean), buildings_by_country),
+        ('prepare_geodata', len(clean), lambda: prepare_geodata(clean)),
+        ('predictive_model', len(model_data), predictive_model),
+    ]
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, seed=0, max_model_rows=100_000, only=None, trace_memory=True):
+    """
+    Times the public data functions on synthetic datasets of increasing size.
+
+    Every size gets a freshly generated dataset (raw scraped formats, with coordinates);
+    getBuildingsByCountry reads it from a temporary CSV. The random forest is trained on
+    at most `max_model_rows` sampled rows, since its cost grows much faster than the rest.
+
+    Parameters:
+    - sizes (list): Dataset sizes in rows.
+    - seed (int): Random seed for the generated data.
+    - max_model_rows (int): Row cap for the predictive model (None: no cap).
+    - only (list): Names of the benchmarks to run (default: all).
+    - trace_memory (bool): Record tracemalloc peaks per function.
+
+    Returns:
+    - DataFrame: One row per function and size with time, throughput and peak memory.
+    """
+    import importlib
+    from data_cleaning import clean_data
+
+    # Import the lazily bound libraries up front so the first size doesn't pay for them.
+    for module in ('geopandas', 'sklearn.ensemble', 'sklearn.model_selection', 'sklearn.preprocessing'):
+        importlib.import_module(module)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            print(f"\nGenerating {size} rows...")
+            raw = generate_buildings(size, seed=seed, with_coordinates=True)
+            csv_path = os.path.join(tmp, f'buildings_{size}.csv')
+            raw.to_csv(csv_path, index=False)
+            clean = clean_data(raw)
+
+            instrumentation = Instrumentation(trace_memory=trace_memory)
+            for name, n_rows, func in _benchmarks(raw, clean, csv_path, max_model_rows, seed):
+                if only and name not in only:
+                    continue
+                try:
+                    with instrumentation.measure(name, rows_in=n_rows) as record:
+                        func()
+                except Exception as e:
+                    print(f"Error: {name} failed at {size} rows: {e!r}")
+                    record['status'] = 'failed'
+                rows.append({
+                    'function': name, 'size': size, 'rows': n_rows, 'status': record['status'],
+                    'seconds': record['wall_seconds'], 'cpu_seconds': record['cpu_seconds'],
+                    'rows_per_second': n_rows / record['wall_seconds'] if record['wall_seconds'] else None,
+                    'peak_memory_mb': record.get('tracemalloc_peak_mb'),
+                })
+                print(f"{name:30s} {size:>10d} rows: {record['wall_seconds']:.3f}s")
+    return pd.DataFrame(rows)
+
+
+def scaling_exponents(results):
+    """
+    Fits time ~ rows**k and memory ~ rows**k per function on a log-log scale.
+
+    An exponent near 1 means linear scaling; a function whose exponent grows between
+    releases has regressed.
+
+    Parameters:
+    - results (DataFrame): The output of run_benchmarks().
+
+    Returns:
+    - DataFrame: 'time_exponent' and 'memory_exponent' per function.
+    """
+    def fit(x, y):
+        mask = (x > 0) & (y > 0)
+        if mask.sum() < 2:
+            return np.nan
+        return np.polyfit(np.log(x[mask]), np.log(y[mask]), 1)[0]
+
+    exponents = {}
+    for name, group in results[results['status'] == 'succeeded'].groupby('function', sort=False):
+        rows = group['rows'].to_numpy(dtype=float)
+        exponents[name] = {
+            'time_exponent': fit(rows, group['seconds'].to_numpy(dtype=float)),
+            'memory_exponent': fit(rows, group['peak_memory_mb'].to_numpy(dtype=float)),
+        }
+    return pd.DataFrame.from_dict(exponents, orient='index')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the data functions on synthetic data.")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated dataset sizes, e.g. 10000,100000,1000000,10000000")
+    parser.add_argument('--only', default=None, help="Comma-separated benchmark names")
+    parser.add_argument('--max-model-rows', type=int, default=100_000)
+    parser.add_argument('--output', default='benchmark_results.json', help="Path of the JSON report")
+    args = parser.parse_args()
+
+    results = run_benchmarks([int(size) for size in args.sizes.split(',')],
+                             max_model_rows=args.max_model_rows,
+                             only=args.only.split(',') if args.only else None)
+    exponents = scaling_exponents(results)
+    print("\n" + results.round(3).to_string(index=False))
+    print("\nScaling exponents (1 = linear):\n" + exponents.round(2).to_string())
+    with open(args.output, 'w') as f:
+        json.dump({'results': results.to_dict(orient='records'),
+                   'scaling': exponents.reset_index(names='function').to_dict(orient='records')},
+                  f, indent=2, default=str)
+    print(f"Report written to {args.output}.")
@@ -0,0 +1,268 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from dataset_cache import read_dataset
+
+
+class CountryYearCube:
+    """
+    Dense countries x years matrix of building completion counts with prefix sums.
+
+    Row i holds the number of buildings completed per year in country i, starting at
+    `first_year`. A prefix-sum copy of the matrix turns cumulative and range counts into
+    one lookup per country, and the per-year total is kept so that queries over all
+    countries are a single lookup as well.
+    """
+
+    def __init__(self, countries, first_year, counts):
+        """
+        Parameters:
+        - countries (list): Country names, one per row of `counts`.
+        - first_year (int): The year of the first column of `counts`.
+        - counts (ndarray): Integer array of shape (len(countries), n_years).
+        """
+        self.countries = list(countries)
+        self.first_year = int(first_year)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self._rows = {country: i for i, country in enumerate(self.countries)}
+        self._rebuild_prefix()
+
+    @classmethod
+    def from_frame(cls, df, country_column='Country', year_column='Year Completed'):
+        """
+        Builds the cube from a DataFrame with one row per building.
+
+        Parameters:
+        - df (DataFrame): The buildings data.
+        - country_column (str): Column holding the country name.
+        - year_column (str): Column holding the completion year.
+
+        Returns:
+        - CountryYearCube: The populated cube.
+        """
+        codes, countries, years = _encode(df, country_column, year_column)
+        if len(years) == 0:
+            return cls([], 0, np.zeros((0, 0), dtype=np.int64))
+        first_year = int(years.min())
+        n_years = int(years.max()) - first_year + 1
+        flat = codes * n_years + (years - first_year)
+        counts = np.bincount(flat, minlength=len(countries) * n_years).reshape(len(countries), n_years)
+        return cls(countries, first_year, counts)
+
+    @classmethod
+    def from_csv(cls, file_path='tallest_buildings.csv', **kwargs):
+        """
+        Builds the cube from a CSV file, loaded through the dataset cache.
+        See `from_frame` for keyword arguments.
+        """
+        return cls.from_frame(read_dataset(file_path), **kwargs)
+
+    @property
+    def last_year(self):
+        return self.first_year + self.counts.shape[1] - 1
+
+    def _rebuild_prefix(self, rows=None):
+        """
+        Recomputes prefix sums, either for all rows or only for the given row indexes.
+        """
+        if rows is None:
+            self._prefix = np.zeros((self.counts.shape[0], self.counts.shape[1] + 1), dtype=np.int64)
+            np.cumsum(self.counts, axis=1, out=self._prefix[:, 1:])
+        else:
+            self._prefix[rows, 1:] = np.cumsum(self.counts[rows], axis=1)
+        self._total_prefix = self._prefix.sum(axis=0)
+
+    def _prefix_rows(self, countries):
+        """
+        Returns the prefix-sum row for a country, a list of countries, or all countries (None).
+        Unknown countries contribute zeros.
+        """
+        if countries is None:
+            return self._total_prefix
+        if isinstance(countries, str):
+            countries = [countries]
+        rows = [self._rows[country] for country in countries if country in self._rows]
+        if len(rows) == 1:
+            return self._prefix[rows[0]]
+        return self._prefix[rows].sum(axis=0)
+
+    def _positions(self, years):
+        """
+        Maps years to prefix-sum positions so that prefix[position] counts years <= year.
+        """
+        return np.clip(np.asarray(years, dtype=np.int64) - self.first_year + 1, 0, self.counts.shape[1])
+
+    def cumulative(self, countries=None, start=1995, end=2022):
+        """
+        Counts buildings completed up to and including each year in [start, end].
+
+        Parameters:
+        - countries (str, list or None): One country, several countries, or None for all.
+        - start (int): First year of the result.
+        - end (int): Last year of the result.
+
+        Returns:
+        - ndarray: One cumulative count per year.
+        """
+        return self._prefix_rows(countries)[self._positions(np.arange(start, end + 1))]
+
+    def per_year(self, countries=None, start=1995, end=2022):
+        """
+        Counts buildings completed in each year in [start, end].
+
+        Returns:
+        - ndarray: One count per year.
+        """
+        prefix = self._prefix_rows(countries)
+        years = np.arange(start, end + 1)
+        return prefix[self._positions(years)] - prefix[self._positions(years - 1)]
+
+    def count(self, countries=None, start=None, end=None):
+        """
+        Counts buildings completed between `start` and `end` inclusive (open-ended if None).
+
+        Returns:
+        - int: The number of buildings.
+        """
+        prefix = self._prefix_rows(countries)
+        upper = prefix[-1] if end is None else prefix[self._positions(end)]
+        lower = 0 if start is None else prefix[self._positions(start - 1)]
+        return int(upper - lower)
+
+    def cumulative_table(self, start=1995, end=2022):
+        """
+        Cumulative counts for every country at once.
+
+        Returns:
+        - DataFrame: Countries as rows, years as columns.
+        """
+        years = np.arange(start, end + 1)
+        return pd.DataFrame(self._prefix[:, self._positions(years)], index=self.countries, columns=years)
+
+    def add_rows(self, df, country_column='Country', year_column='Year Completed'):
+        """
+        Adds newly arrived buildings to the cube in place.
+
+        The year axis and country list grow as needed, and only the prefix sums of the
+        countries that received rows are recomputed.
+
+        Parameters:
+        - df (DataFrame): The new rows.
+        - country_column (str): Column holding the country name.
+        - year_column (str): Column holding the completion year.
+
+        Returns:
+        - CountryYearCube: self, for chaining.
+        """
+        codes, countries, years = _encode(df, country_column, year_column)
+        if len(years) == 0:
+            return self
+
+        for country in countries:
+            if country not in self._rows:
+                self._rows[country] = len(self.countries)
+                self.countries.append(country)
+        rows = np.array([self._rows[country] for country in countries], dtype=np.int64)
+        new_countries = len(self.countries) - self.counts.shape[0]
+
+        if self.counts.size == 0:
+            self.first_year = int(years.min())
+        before = max(self.first_year - int(years.min()), 0)
+        after = max(int(years.max()) - (self.first_year + self.counts.shape[1] - 1), 0)
+        if new_countries or before or after:
+            self.counts = np.pad(self.counts, ((0, new_countries), (before, after)))
+            self.first_year -= before
+            self._rebuild_prefix()
+
+        np.add.at(self.counts, (rows[codes], years - self.first_year), 1)
+        self._rebuild_prefix(np.unique(rows[codes]))
+        return self
+
+
+def _encode(df, country_column, year_column):
+    """
+    Factorizes countries and extracts integer years, dropping rows without a country or
+    without a valid year.
+    """
+    years = pd.to_numeric(df[year_column], errors='coerce')
+    valid = (years.notna() & df[country_column].notna()).to_numpy()
+    country = df[country_column][valid].astype(str).str.strip()
+    codes, countries = pd.factorize(country)
+    return codes.astype(np.int64), list(countries), years[valid].to_numpy(dtype=np.int64)
+
+
+_cubes = {}
+
+def cube_for_file(file_path='tallest_buildings.csv'):
+    """
+    Returns the cube for a CSV file, building it only when the file has changed.
+    """
+    key = (os.path.abspath(file_path), os.stat(file_path).st_mtime_ns)
+    if key not in _cubes:
+        _cubes.clear()
+        _cubes[key] = CountryYearCube.from_csv(file_path)
+    return _cubes[key]
+
+
+def _legacy_buildings_by_country(country, file_path='tallest_buildings.csv'):
+    """
+    The original main.getBuildingsByCountry, kept as the benchmark baseline.
+    """
+    array = [0 for _ in range(1995, 2023)]
+    df = pd.read_csv(file_path)
+    for row in df.itertuples(index=False, name=None):
+        if row[2].strip() == country:
+            if 1995 > int(row[5]):
+                array[0] += 1
+            if 1995 <= int(row[5]) and int(row[5]) <= 2022:
+                array[int(row[5]) - 1995] += 1
+    for i in range(1, len(array)):
+        array[i] = array[i] + array[i-1]
+    return array
+
+
+def benchmark_cube(file_path='tallest_buildings.csv', repeat=5):
+    """
+    Times cumulative counts for every country: the original per-call CSV scan against
+    building the cube once and querying it.
+
+    Parameters:
+    - file_path (str): The raw buildings CSV.
+    - repeat (int): Number of timed runs; the best run is reported.
+
+    Returns:
+    - DataFrame: Best time per approach.
+    """
+    countries = pd.read_csv(file_path)['Country'].dropna().astype(str).str.strip().unique()
+
+    def legacy():
+        return [_legacy_buildings_by_country(country, file_path) for country in countries]
+
+    def cube():
+        built = CountryYearCube.from_csv(file_path)
+        return [built.cumulative(country).tolist() for country in countries]
+
+    assert legacy() == cube()
+    results = []
+    for name, func in [('legacy', legacy), ('cube', cube)]:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        results.append({'approach': name, 'countries': len(countries), 'seconds': min(timings)})
+
+    built = CountryYearCube.from_csv(file_path)
+    start = time.perf_counter()
+    for country in countries:
+        built.cumulative(country)
+    results.append({'approach': 'cube (queries only)', 'countries': len(countries),
+                    'seconds': time.perf_counter() - start})
+    results = pd.DataFrame(results)
+    print(results.to_string(index=False))
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_cube()
@@ -0,0 +1,159 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Code of values that are missing or not in the dictionary. Known categories start at 1.
+UNKNOWN_CODE = 0
+
+CATEGORY_PATH = os.path.join('models', 'category_codes.json')
+
+
+def _keys(values):
+    """
+    The dictionary keys of `values`: every present value as a string, missing values
+    left missing. Whole floats are written as integers, so an integer column stores the
+    same keys whether or not missing values turned it into floats.
+
+    Returns:
+    - ndarray: object array of str and missing values.
+    """
+    values = pd.Series(values)
+    if pd.api.types.infer_dtype(values, skipna=True) == 'string':
+        return values.to_numpy(dtype=object)
+    present = values.notna().to_numpy()
+    values = values[present]
+    if pd.api.types.is_float_dtype(values) and (values % 1 == 0).all():
+        values = values.astype(np.int64)
+    keys = np.full(len(present), None, dtype=object)
+    keys[present] = values.astype(str).to_numpy(dtype=object)
+    return keys
+
+
+class CategoryDictionary:
+    """
+    Stable integer codes for the values of one categorical column.
+
+    Unlike refitting a LabelEncoder, codes never change once assigned: new categories
+    are appended with the next free code, and values that are not in the dictionary
+    (or missing) encode to UNKNOWN_CODE instead of raising. Encoding is a hash lookup,
+    done once per category when the input is a pandas categorical.
+    """
+
+    def __init__(self, categories=()):
+        """
+        Parameters:
+        - categories (list): Known categories; the i-th one gets code i + 1.
+        """
+        self._index = pd.Index(_keys(list(categories)), dtype=object)
+        if not self._index.is_unique:
+            raise ValueError("Categories must be unique.")
+
+    @property
+    def categories(self):
+        return list(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __repr__(self):
+        return f"CategoryDictionary({len(self)} categories)"
+
+    def update(self, values):
+        """
+        Adds the categories of `values` that are not known yet, in sorted order so that
+        the codes do not depend on the order of the rows.
+
+        Returns:
+        - int: The number of categories added.
+        """
+        keys = _keys(values)
+        uniques = pd.Series(pd.unique(keys[pd.notna(keys)]), dtype=object)
+        new = uniques[self._index.get_indexer(uniques) == -1].sort_values()
+        if len(new):
+            self._index = self._index.append(pd.Index(new.to_numpy(), dtype=object))
+        return len(new)
+
+    def encode(self, values):
+        """
+        Encodes values to their codes.
+
+        Parameters:
+        - values (Series, Categorical or array-like): The values to encode.
+
+        Returns:
+        - ndarray: int32 codes; UNKNOWN_CODE for missing and unknown values.
+        """
+        values = values if isinstance(values, pd.Series) else pd.Series(values)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # Look up each category once and expand by the categorical's own codes;
+            # the appended UNKNOWN_CODE is picked up by the -1 code of missing values.
+            lookup = np.append(self._index.get_indexer(_keys(values.cat.categories)) + 1, UNKNOWN_CODE)
+            return lookup[values.cat.codes.to_numpy()].astype(np.int32)
+        return (self._index.get_indexer(_keys(values)) + 1).astype(np.int32)
+
+    def decode(self, codes):
+        """
+        Maps codes back to categories; UNKNOWN_CODE and unassigned codes become None.
+        """
+        codes = np.asarray(codes)
+        categories = np.append(np.array([None], dtype=object), self._index.to_numpy(dtype=object))
+        valid = (codes > 0) & (codes <= len(self._index))
+        return np.where(valid, categories[np.where(valid, codes, 0)], None)
+
+    def to_categorical(self, values):
+        """
+        Converts values to a pandas categorical whose categories are this dictionary's,
+        so its codes are the dictionary codes minus one (-1 for unknown values).
+        """
+        return pd.Categorical(_keys(values), categories=self._index)
+
+
+def load_dictionaries(path=CATEGORY_PATH):
+    """
+    Loads the dictionaries saved by save_dictionaries().
+
+    Returns:
+    - dict: Column name -> CategoryDictionary (empty if the file does not exist).
+    """
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return {}
+    return {column: CategoryDictionary(categories) for column, categories in saved['columns'].items()}
+
+
+def save_dictionaries(dictionaries, path=CATEGORY_PATH):
+    """
+    Saves dictionaries as JSON, column name -> categories in code order.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    payload = {'unknown_code': UNKNOWN_CODE,
+               'columns': {column: dictionary.categories for column, dictionary in dictionaries.items()}}
+    with open(path + '.tmp', 'w') as f:
+        json.dump(payload, f, indent=2, ensure_ascii=False)
+    os.replace(path + '.tmp', path)
+
+
+def fit_dictionaries(df, columns, path=None):
+    """
+    Extends the dictionaries of `columns` with the values of `df`.
+
+    Parameters:
+    - df (DataFrame): The data to learn categories from.
+    - columns (list): Categorical columns.
+    - path (str): If given, the dictionaries are loaded from and saved back to this
+      JSON file, so codes stay the same across runs.
+
+    Returns:
+    - dict: Column name -> CategoryDictionary.
+    """
+    dictionaries = load_dictionaries(path) if path else {}
+    added = 0
+    for column in columns:
+        dictionary = dictionaries.setdefault(column, CategoryDictionary())
+        added += dictionary.update(df[column])
+    if path and added:
+        save_dictionaries(dictionaries, path)
+    return dictionaries
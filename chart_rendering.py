@@ -0,0 +1,216 @@
+import contextlib
+import glob
+import os
+import pickle
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import importlib
+import pandas as pd
+from lazy_imports import lazy_import
+
+matplotlib = lazy_import('matplotlib')
+plt = lazy_import('matplotlib.pyplot')
+
+# Default directory for saved charts.
+CHART_DIR = 'charts'
+
+# Backends that cannot open a window; figures are closed instead of shown.
+NON_INTERACTIVE_BACKENDS = {'agg', 'cairo', 'pdf', 'pgf', 'ps', 'svg', 'template'}
+
+# Figures finished inside hold_figures() in this process, instead of being shown.
+_held_figures = None
+
+
+def is_headless():
+    """
+    Returns True when matplotlib uses a non-interactive backend (e.g. on render servers).
+    """
+    return matplotlib.get_backend().lower() in NON_INTERACTIVE_BACKENDS
+
+
+def finish_figure(output_file=None):
+    """
+    Finishes the current figure: saves it if `output_file` is given, then shows it, or
+    closes it when running headless so that batch renders don't accumulate figures.
+
+    Parameters:
+    - output_file (str): Optional path to save the figure to; missing directories are
+      created.
+    """
+    fig = plt.gcf()
+    if output_file:
+        os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+        fig.savefig(output_file, bbox_inches='tight')
+    if _held_figures is not None:
+        _held_figures.append(fig)
+    elif is_headless():
+        plt.close(fig)
+    else:
+        plt.show()
+
+
+@contextlib.contextmanager
+def hold_figures(figure_dir, prefix):
+    """
+    Keeps the figures finished in the enclosed block instead of showing them, and
+    pickles them to `figure_dir` as <prefix>-<n>.pickle, so that a worker process can
+    render with Agg while the main process shows the figures (see show_figures()).
+    """
+    global _held_figures
+    _held_figures = held = []
+    try:
+        yield held
+    finally:
+        _held_figures = None
+        os.makedirs(figure_dir, exist_ok=True)
+        for number, fig in enumerate(held):
+            with open(os.path.join(figure_dir, f'{prefix}-{number:03d}.pickle'), 'wb') as f:
+                pickle.dump(fig, f)
+            plt.close(fig)
+
+
+def show_figures(figure_dir, prefixes):
+    """
+    Shows the figures pickled by hold_figures(), in the order of `prefixes`. GUI
+    backends must be driven from the main thread, so this is called from there.
+    """
+    for prefix in prefixes:
+        for path in sorted(glob.glob(os.path.join(figure_dir, f'{glob.escape(prefix)}-*.pickle'))):
+            with open(path, 'rb') as f:
+                pickle.load(f)
+    if plt.get_fignums():
+        plt.show()
+
+
+def chart_jobs(data, countries=None):
+    """
+    Lists the charts of a full render: every dataset-wide chart plus one height trend
+    per country.
+
+    Parameters:
+    - data (DataFrame): The cleaned dataset.
+    - countries (list): Countries to render trends for; defaults to every country.
+
+    Returns:
+    - list: (module, function, kwargs) tuples.
+    """
+    jobs = [
+        ('visualization', 'tallest_buildings_bar_chart', {}),
+        ('visualization', 'height_histogram', {}),
+        ('visualization', 'floors_vs_height_scatter', {}),
+        ('visualization', 'yearly_construction_trend', {}),
+        ('visualization', 'country_building_distribution', {}),
+        ('visualization', 'tallest_in_each_country', {}),
+        ('visualization', 'correlation_heatmap', {}),
+        ('data_analysis', 'plot_column_distribution', {'column': 'Height'}),
+        ('data_analysis', 'plot_correlation_heatmap', {}),
+        ('data_analysis', 'analyze_trends', {'x_column': 'Floors', 'y_column': 'Height'}),
+        ('data_analysis', 'category_analysis', {'category_column': 'Country', 'numerical_column': 'Height'}),
+    ]
+    if countries is None:
+        countries = sorted(data['Country'].dropna().unique())
+    jobs.extend(('visualization', 'plot_height_trend', {'country_name': country}) for country in countries)
+    return jobs
+
+
+def _job_filename(module, function, kwargs):
+    suffix = '-'.join(re.sub(r'[^0-9A-Za-z]+', '_', str(value)).strip('_') for value in kwargs.values())
+    return f"{module}.{function}{'-' + suffix if suffix else ''}.png"
+
+
+# Numeric-only inputs for the correlation charts, which call data.corr().
+_NUMERIC_ONLY = {'correlation_heatmap', 'plot_correlation_heatmap'}
+
+_worker_data = None
+
+
+def _init_worker(source):
+    """
+    Process pool initializer: switches to the Agg backend and loads the data once per worker.
+    """
+    global _worker_data
+    plt.switch_backend('Agg')
+    from data_cleaning import as_dataframe
+    _worker_data = as_dataframe(source)
+
+
+def _render_job(job, output_dir):
+    """
+    Renders one chart in a worker and returns its path and render time.
+    """
+    module, function, kwargs = job
+    output_file = os.path.join(output_dir, _job_filename(module, function, kwargs))
+    data = _worker_data.select_dtypes(include='number') if function in _NUMERIC_ONLY else _worker_data
+    start = time.perf_counter()
+    try:
+        getattr(importlib.import_module(module), function)(data, output_file=output_file, **kwargs)
+    finally:
+        plt.close('all')
+    if not os.path.exists(output_file):
+        # The function had nothing to draw (e.g. no rows for a country).
+        output_file = None
+    return output_file, time.perf_counter() - start
+
+
+def render_charts(source, jobs, output_dir=CHART_DIR, processes=None):
+    """
+    Renders charts headlessly across a process pool and writes them to `output_dir`.
+
+    Each worker uses the Agg backend, loads the dataset once and closes every figure
+    after saving it. A failing chart is reported and does not stop the others.
+
+    Parameters:
+    - source (DataFrame or str): The cleaned dataset or the path to the data file.
+      Paths are read through the dataset cache, so workers do not re-parse the CSV.
+    - jobs (list): (module, function, kwargs) tuples, e.g. from chart_jobs().
+    - output_dir (str): Directory to write the PNG files to.
+    - processes (int): Number of worker processes; defaults to the number of CPUs.
+
+    Returns:
+    - DataFrame: One row per chart with its file, render time and error (if any).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if not isinstance(source, pd.DataFrame):
+        # Warm the cache once so that the workers only memory-map it.
+        from data_cleaning import as_dataframe
+        as_dataframe(source)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count(),
+                             initializer=_init_worker, initargs=(source,)) as executor:
+        futures = {executor.submit(_render_job, job, output_dir): job for job in jobs}
+        for future in as_completed(futures):
+            module, function, kwargs = futures[future]
+            try:
+                output_file, seconds = future.result()
+                results.append({'chart': f'{module}.{function}', 'kwargs': kwargs,
+                                'file': output_file, 'seconds': seconds, 'error': None})
+            except Exception as e:
+                print(f"Error: Rendering {module}.{function}({kwargs}) failed: {e}")
+                results.append({'chart': f'{module}.{function}', 'kwargs': kwargs,
+                                'file': None, 'seconds': None, 'error': repr(e)})
+    return pd.DataFrame(results)
+
+
+def render_all_charts(source='tallest_buildings.csv', output_dir=CHART_DIR, countries=None, processes=None):
+    """
+    Renders every chart, including the per-country trends, to `output_dir`.
+
+    Returns:
+    - DataFrame: The render results, see render_charts().
+    """
+    from data_cleaning import as_dataframe
+    data = as_dataframe(source)
+    if data is None:
+        return None
+    start = time.perf_counter()
+    results = render_charts(source, chart_jobs(data, countries), output_dir=output_dir, processes=processes)
+    print(f"Rendered {results['file'].notna().sum()} of {len(results)} charts to {output_dir} "
+          f"in {time.perf_counter() - start:.2f} seconds.")
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    render_all_charts(*sys.argv[1:3])
@@ -0,0 +1,125 @@
+import sys
+import numpy as np
+import pandas as pd
+from dataset_cache import read_dataset
+
+# Storage type per column of the cleaned dataset:
+# - 'category': repeated labels stored once, rows hold small integer codes
+# - 'intern': mostly unique strings; equal values share one string object
+# - numpy dtypes: the narrowest type that holds the values (heights stay float64, since
+#   float32 would turn e.g. 829.8 into 829.799988 in published summaries)
+COMPACT_SCHEMA = {
+    'Building': 'intern',
+    'City': 'category',
+    'Country': 'category',
+    'Height': 'float64',
+    'Floors': 'int16',
+    'Year Completed': 'int16',
+}
+
+
+def _intern(series):
+    """
+    Makes equal strings share one object. Only object columns hold a Python object
+    per row; string columns backed by pyarrow are already compact and kept as they are.
+    """
+    if not pd.api.types.is_object_dtype(series):
+        return series
+    codes, uniques = pd.factorize(series)
+    uniques = np.array([sys.intern(value) if isinstance(value, str) else value for value in uniques], dtype=object)
+    values = pd.api.extensions.take(uniques, codes, allow_fill=True)
+    return pd.Series(values, index=series.index, name=series.name, dtype=object)
+
+
+def _to_integer(series, dtype):
+    """
+    Casts to a small integer type if every value is present and fits; otherwise to
+    float32, which keeps missing values as NaN for the numeric functions downstream.
+    """
+    numbers = pd.to_numeric(series, errors='coerce')
+    info = np.iinfo(dtype)
+    if numbers.notna().all() and (len(numbers) == 0 or (numbers.min() >= info.min and numbers.max() <= info.max)):
+        return numbers.astype(dtype)
+    return numbers.astype('float32')
+
+
+def to_compact(df, schema=COMPACT_SCHEMA):
+    """
+    Converts a cleaned dataset to the compact in-memory representation.
+
+    Parameters:
+    - df (DataFrame): The cleaned dataset; it is not modified.
+    - schema (dict): Column -> 'category', 'intern' or a numpy dtype. Columns not in
+      the schema are kept as they are.
+
+    Returns:
+    - DataFrame: A new frame with the compact column types.
+    """
+    columns = {}
+    for col in df.columns:
+        kind = schema.get(col)
+        series = df[col]
+        if kind is None:
+            columns[col] = series
+        elif kind == 'category':
+            columns[col] = series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype('category')
+        elif kind == 'intern':
+            columns[col] = _intern(series)
+        elif np.issubdtype(np.dtype(kind), np.integer):
+            columns[col] = _to_integer(series, kind)
+        else:
+            columns[col] = pd.to_numeric(series, errors='coerce').astype(kind)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def memory_report(before, after):
+    """
+    Compares the memory use of two versions of a frame per column, measured with
+    memory_usage(deep=True). Interned object columns are over-counted, since pandas
+    counts shared string objects once per row.
+
+    Returns:
+    - DataFrame: 'before_mb', 'after_mb', 'after_dtype' and 'ratio' per column plus a 'total' row.
+    """
+    report = pd.DataFrame({
+        'before_mb': before.memory_usage(deep=True) / 2**20,
+        'after_mb': after.memory_usage(deep=True) / 2**20,
+    })
+    report.loc['total'] = report.sum()
+    report['after_dtype'] = after.dtypes.astype(str).reindex(report.index).fillna('')
+    report['ratio'] = report['after_mb'] / report['before_mb']
+    return report
+
+
+def load_compact(file_path='tallest_buildings.csv', schema=COMPACT_SCHEMA, report=False):
+    """
+    Loads and cleans a dataset (through the dataset cache) and converts it to the
+    compact representation.
+
+    Parameters:
+    - file_path (str): The raw dataset.
+    - schema (dict): See to_compact().
+    - report (bool): Print the memory use before and after the conversion.
+
+    Returns:
+    - DataFrame: The compact dataset, or None if the file does not exist.
+    """
+    try:
+        data = read_dataset(file_path, clean=True)
+    except FileNotFoundError:
+        print(f"Error: File not found at {file_path}")
+        return None
+    compact = to_compact(data, schema)
+    if report:
+        print(memory_report(data, compact).round(3).to_string())
+    return compact
+
+
+if __name__ == "__main__":
+    from synthetic_data import generate_buildings
+    from data_cleaning import clean_data
+
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    raw = generate_buildings(rows)
+    print(f"Raw scraped frame vs. compact frame, {rows} rows:")
+    print(memory_report(raw, to_compact(clean_data(raw))).round(3).to_string())
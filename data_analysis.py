@@ -1,31 +1,72 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+from chart_rendering import finish_figure
+from data_cleaning import as_dataframe
+from lazy_imports import lazy_import
+from result_cache import memoize
+from streaming_stats import ChunkedStatistics, chunked_statistics
 
-def calculate_summary_statistics(data):
+plt = lazy_import('matplotlib.pyplot')
+sns = lazy_import('seaborn')
+
+def _chunked(data, chunksize):
+    """
+    Returns ChunkedStatistics for a raw CSV path (or list of paths), or None for a DataFrame.
+    """
+    if isinstance(data, ChunkedStatistics):
+        return data
+    if isinstance(data, (str, list, tuple)):
+        return chunked_statistics(data, chunksize=chunksize)
+    return None
+
+@memoize
+def _describe(data):
+    summary = data.describe().transpose()
+    summary['range'] = summary['max'] - summary['min']
+    return summary[['mean', '50%', 'std', 'range']].rename(columns={'50%': 'median'})
+
+@memoize
+def correlation_matrix(data):
+    """
+    The correlation matrix of a numeric DataFrame, cached by the content of the data
+    (see result_cache.py), so the analysis and every heatmap share one computation.
+    """
+    return data.corr()
+
+@memoize
+def group_means(data, category_column, numerical_column):
+    """
+    Mean of `numerical_column` per value of `category_column`, sorted ascending and
+    cached by the content of the two columns.
+    """
+    return data.groupby(category_column, observed=True)[numerical_column].mean().sort_values()
+
+def calculate_summary_statistics(data, chunksize=100_000):
     """
     Calculates summary statistics for numerical columns in the dataset.
     
     Parameters:
-    - data (DataFrame): The DataFrame to analyze.
+    - data (DataFrame, str, list or ChunkedStatistics): The DataFrame to analyze, or raw
+      CSV file(s) to read in chunks of `chunksize` rows with bounded memory (the median
+      is then estimated with a quantile sketch), or precomputed chunked statistics.
+    - chunksize (int): Rows per chunk when reading files.
     
     Returns:
     - DataFrame: Summary statistics including mean, median, standard deviation, and range.
     """
-    summary = data.describe().transpose()
-    summary['range'] = summary['max'] - summary['min']
-    summary = summary[['mean', '50%', 'std', 'range']].rename(columns={'50%': 'median'})
+    statistics = _chunked(data, chunksize)
+    summary = statistics.summary() if statistics is not None else _describe(data)
     print("Summary statistics calculated.")
     return summary
 
-def plot_column_distribution(data, column):
+def plot_column_distribution(data, column, output_file=None):
     """
     Plots the distribution of a specified column.
     
     Parameters:
     - data (DataFrame): The DataFrame to analyze.
     - column (str): The column to plot.
+    - output_file (str): Optional path to save the figure to.
     """
     plt.figure(figsize=(10, 6))
     sns.histplot(data[column], kde=True, color='blue', bins=30)
@@ -33,36 +74,39 @@ def plot_column_distribution(data, column):
     plt.xlabel(column, fontsize=14)
     plt.ylabel('Frequency', fontsize=14)
     plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.show()
+    finish_figure(output_file)
 
-def calculate_correlation_matrix(data):
+def calculate_correlation_matrix(data, chunksize=100_000):
     """
     Calculates the correlation matrix for numerical columns.
     
     Parameters:
-    - data (DataFrame): The DataFrame to analyze.
+    - data (DataFrame, str, list or ChunkedStatistics): The DataFrame to analyze, or raw
+      CSV file(s) to read in chunks, or precomputed chunked statistics.
+    - chunksize (int): Rows per chunk when reading files.
     
     Returns:
     - DataFrame: The correlation matrix.
     """
-    correlation_matrix = data.corr()
+    statistics = _chunked(data, chunksize)
+    matrix = statistics.correlation() if statistics is not None else correlation_matrix(data)
     print("Correlation matrix calculated.")
-    return correlation_matrix
+    return matrix
 
-def plot_correlation_heatmap(data):
+def plot_correlation_heatmap(data, output_file=None):
     """
     Plots a heatmap of the correlation matrix.
     
     Parameters:
     - data (DataFrame): The DataFrame to analyze.
+    - output_file (str): Optional path to save the figure to.
     """
-    correlation_matrix = data.corr()
     plt.figure(figsize=(12, 8))
-    sns.heatmap(correlation_matrix, annot=True, fmt=".2f", cmap='coolwarm', cbar=True)
+    sns.heatmap(correlation_matrix(data), annot=True, fmt=".2f", cmap='coolwarm', cbar=True)
     plt.title('Correlation Heatmap', fontsize=16)
-    plt.show()
+    finish_figure(output_file)
 
-def analyze_trends(data, x_column, y_column):
+def analyze_trends(data, x_column, y_column, output_file=None):
     """
     Analyzes trends between two variables using a scatter plot with a trend line.
     
@@ -70,6 +114,7 @@ def analyze_trends(data, x_column, y_column):
     - data (DataFrame): The DataFrame to analyze.
     - x_column (str): The column to use as the x-axis.
     - y_column (str): The column to use as the y-axis.
+    - output_file (str): Optional path to save the figure to.
     """
     plt.figure(figsize=(10, 6))
     sns.scatterplot(data=data, x=x_column, y=y_column, color='purple')
@@ -78,7 +123,7 @@ def analyze_trends(data, x_column, y_column):
     plt.xlabel(x_column, fontsize=14)
     plt.ylabel(y_column, fontsize=14)
     plt.grid(alpha=0.5)
-    plt.show()
+    finish_figure(output_file)
 
 def top_n_entries(data, column, n=5, ascending=False):
     """
@@ -97,7 +142,7 @@ def top_n_entries(data, column, n=5, ascending=False):
     print(f"Top {n} entries based on '{column}':")
     return top_entries
 
-def category_analysis(data, category_column, numerical_column):
+def category_analysis(data, category_column, numerical_column, output_file=None):
     """
     Analyzes a numerical variable grouped by a categorical variable.
     
@@ -105,8 +150,9 @@ def category_analysis(data, category_column, numerical_column):
     - data (DataFrame): The DataFrame to analyze.
     - category_column (str): The categorical column.
     - numerical_column (str): The numerical column to analyze.
+    - output_file (str): Optional path to save the figure to.
     """
-    group_data = data.groupby(category_column)[numerical_column].mean().sort_values()
+    group_data = group_means(data[[category_column, numerical_column]], category_column, numerical_column)
     plt.figure(figsize=(10, 6))
     group_data.plot(kind='bar', color='teal')
     plt.title(f'{numerical_column} by {category_column}', fontsize=16)
@@ -114,7 +160,7 @@ def category_analysis(data, category_column, numerical_column):
     plt.ylabel(f'Average {numerical_column}', fontsize=14)
     plt.xticks(rotation=45)
     plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.show()
+    finish_figure(output_file)
 
 def export_analysis_results(data, output_path):
     """
@@ -126,3 +172,27 @@ def export_analysis_results(data, output_path):
     """
     data.to_csv(output_path, index=False)
     print(f"Analysis results saved to {output_path}.")
+
+def analyze_data(data):
+    """
+    Runs the standard analysis: summary statistics, correlations, the tallest entries
+    and distribution plots.
+    
+    Parameters:
+    - data (DataFrame or str): The cleaned DataFrame, or the path to the raw data file.
+    
+    Returns:
+    - dict: The summary statistics, correlation matrix and top entries.
+    """
+    data = as_dataframe(data)
+    if data is None:
+        return None
+    numeric_data = data.select_dtypes(include='number')
+    summary = calculate_summary_statistics(numeric_data)
+    print(summary)
+    correlation_matrix = calculate_correlation_matrix(numeric_data)
+    top_entries = top_n_entries(data, 'Height')
+    print(top_entries)
+    plot_column_distribution(data, 'Height')
+    plot_correlation_heatmap(numeric_data)
+    return {'summary': summary, 'correlation_matrix': correlation_matrix, 'top_entries': top_entries}
@@ -1,9 +1,40 @@
+import re
 import pandas as pd
 import numpy as np
+from dataset_cache import read_dataset
+
+# Canonical dataset columns, as used by data_validation, visualization and predictive_model.
+# Heights are in metres.
+CANONICAL_COLUMNS = ['Building', 'City', 'Country', 'Height', 'Floors', 'Year Completed']
+
+# Known spellings of the canonical columns (compared lowercased and stripped).
+COLUMN_ALIASES = {
+    'building': 'Building',
+    'name': 'Building',
+    'city': 'City',
+    'country': 'Country',
+    'height': 'Height',
+    'height (m)': 'Height',
+    'height_(m)': 'Height',
+    'height_m': 'Height',
+    'floors': 'Floors',
+    'year completed': 'Year Completed',
+    'year_completed': 'Year Completed',
+    'year': 'Year Completed',
+    'built': 'Year Completed',
+}
+
+FOOTNOTE_PATTERN = re.compile(r'\[[^\]]*\]|[†‡*]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+HEIGHT_PATTERN = re.compile(r'(?P<value>-?\d[\d,]*(?:\.\d+)?)\s*(?P<unit>[a-z]+)?', re.IGNORECASE)
+INTEGER_PATTERN = re.compile(r'(-?\d[\d,]*)')
+# Height units and their factor to metres; heights in any other unit are not parsed.
+HEIGHT_UNITS = {'m': 1.0, 'metre': 1.0, 'metres': 1.0, 'meter': 1.0, 'meters': 1.0,
+                'ft': 0.3048, 'feet': 0.3048, 'foot': 0.3048}
 
 def load_data(file_path):
     """
-    Loads data from a CSV file into a pandas DataFrame.
+    Loads data from a CSV file into a pandas DataFrame, through the binary cache in dataset_cache.
     
     Parameters:
     - file_path (str): The path to the data file.
@@ -12,13 +43,185 @@ def load_data(file_path):
     - DataFrame: Loaded data.
     """
     try:
-        data = pd.read_csv(file_path)
+        data = read_dataset(file_path)
         print("Data loaded successfully.")
         return data
     except FileNotFoundError:
         print(f"Error: File not found at {file_path}")
         return None
 
+def canonicalize_columns(data):
+    """
+    Renames known column spellings (e.g. 'Height (m)', 'height_(m)', 'year_completed')
+    to the canonical names in CANONICAL_COLUMNS.
+
+    Parameters:
+    - data (DataFrame): The DataFrame to process.
+
+    Returns:
+    - DataFrame: A copy of the DataFrame with canonical column names.
+    """
+    renames = {}
+    for col in data.columns:
+        canonical = COLUMN_ALIASES.get(str(col).strip().lower())
+        if canonical is not None and canonical not in data.columns:
+            renames[col] = canonical
+    return data.rename(columns=renames)
+
+def _as_text(series):
+    """
+    Returns the series with a string dtype so that the `.str` accessor can be used.
+    """
+    if pd.api.types.is_string_dtype(series) and not pd.api.types.is_object_dtype(series):
+        return series
+    return series.astype('string')
+
+def _map_uniques(series, cleaner):
+    """
+    Applies a vectorized cleaner to the distinct values of a column only.
+
+    Scraped columns repeat heavily (cities, countries, heights), so factorizing first
+    and expanding the cleaned uniques back by code is much cheaper than running the
+    regular expressions over every row.
+    """
+    codes, uniques = pd.factorize(series)
+    cleaned = cleaner(pd.Series(uniques))
+    values = pd.api.extensions.take(cleaned.array, codes, allow_fill=True)
+    return pd.Series(values, index=series.index, name=series.name)
+
+def clean_text_column(series):
+    """
+    Strips footnote markers ('†', '[55]') and redundant whitespace from a text column.
+
+    Parameters:
+    - series (Series): The column to clean.
+
+    Returns:
+    - Series: The cleaned column, with empty strings replaced by missing values.
+    """
+    def clean(values):
+        text = (_as_text(values)
+                .str.replace(FOOTNOTE_PATTERN, '', regex=True)
+                .str.replace(WHITESPACE_PATTERN, ' ', regex=True)
+                .str.strip())
+        return text.mask(text == '')
+    return _map_uniques(series, clean)
+
+def clean_height_column(series):
+    """
+    Converts heights such as '829.8 m' or '2,717 ft' to metres.
+
+    Values without a unit are taken to be in metres; values in a unit not listed in
+    HEIGHT_UNITS (e.g. '1.5 km') become missing rather than being guessed.
+
+    Parameters:
+    - series (Series): The column to clean.
+
+    Returns:
+    - Series: Heights in metres as float64.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('float64')
+
+    def parse(values):
+        parts = _as_text(values).str.extract(HEIGHT_PATTERN)
+        value = pd.to_numeric(parts['value'].str.replace(',', '', regex=False), errors='coerce')
+        unit = parts['unit'].str.lower().fillna('m')
+        factor = pd.to_numeric(unit.map(HEIGHT_UNITS), errors='coerce')
+        return (value * factor).astype('float64')
+    return _map_uniques(series, parse).astype('float64')
+
+def clean_integer_column(series):
+    """
+    Extracts the leading (possibly negative) integer from values such as '163' or
+    '1,234 (est.)'.
+
+    Parameters:
+    - series (Series): The column to clean.
+
+    Returns:
+    - Series: The smallest integer dtype that fits, or float32 if values are missing.
+    """
+    if not pd.api.types.is_numeric_dtype(series):
+        def parse(values):
+            digits = _as_text(values).str.extract(INTEGER_PATTERN, expand=False)
+            return pd.to_numeric(digits.str.replace(',', '', regex=False), errors='coerce').astype('float64')
+        series = _map_uniques(series, parse)
+    series = series.astype('float64')
+    if series.isnull().any():
+        return pd.to_numeric(series, downcast='float')
+    return pd.to_numeric(series.astype('int64'), downcast='integer')
+
+_COLUMN_CLEANERS = {
+    'Building': clean_text_column,
+    'City': clean_text_column,
+    'Country': clean_text_column,
+    'Height': clean_height_column,
+    'Floors': clean_integer_column,
+    'Year Completed': clean_integer_column,
+}
+
+def clean_columns(data):
+    """
+    Cleans the raw scraped dataset column by column, without reporting (e.g. for the
+    chunks of a file that is read in pieces).
+
+    Column names are canonicalized first, then every known column goes through one
+    vectorized cleaner: footnote stripping for text, unit-aware parsing for heights and
+    integer extraction for floors and years. Floors and years are downcast. Unknown
+    columns are passed through unchanged.
+
+    Parameters:
+    - data (DataFrame): The raw DataFrame, e.g. as read from tallest_buildings.csv.
+
+    Returns:
+    - DataFrame: A new, cleaned DataFrame with canonical column names.
+    """
+    data = canonicalize_columns(data)
+    cleaned = {}
+    for col in data.columns:
+        cleaner = _COLUMN_CLEANERS.get(col)
+        cleaned[col] = cleaner(data[col]) if cleaner else data[col]
+    return pd.DataFrame(cleaned, index=data.index)
+
+def clean_data(data):
+    """
+    Cleans the raw scraped dataset, see clean_columns().
+
+    Parameters:
+    - data (DataFrame): The raw DataFrame, e.g. as read from tallest_buildings.csv.
+
+    Returns:
+    - DataFrame: A new, cleaned DataFrame with canonical column names.
+    """
+    cleaned = clean_columns(data)
+    print("Data cleaned successfully.")
+    return cleaned
+
+def as_dataframe(data):
+    """
+    Returns a cleaned DataFrame for a pipeline stage.
+
+    Stages accept either an already cleaned DataFrame, which is returned as is so that
+    every stage shares the same frame, or a path to the raw CSV, which is loaded and
+    cleaned.
+
+    Parameters:
+    - data (DataFrame or str): A cleaned DataFrame or the path to the data file.
+
+    Returns:
+    - DataFrame: Cleaned data, or None if the file could not be loaded.
+    """
+    if isinstance(data, pd.DataFrame):
+        return data
+    try:
+        cleaned = read_dataset(data, clean=True)
+        print("Data loaded successfully.")
+        return cleaned
+    except FileNotFoundError:
+        print(f"Error: File not found at {data}")
+        return None
+
 def inspect_data(data):
     """
     Prints a summary of the dataset, including info, head, and basic statistics.
@@ -153,7 +356,7 @@ def feature_engineering(data):
     """
     current_year = pd.Timestamp.now().year
     data['building_age'] = current_year - data['year_completed']
-    data['height_category'] = pd.cut(data['height_(m)'], bins=[0, 150, 300, 600], labels=['Low', 'Medium', 'High'])
+    data['height_category'] = pd.cut(data['height'], bins=[0, 150, 300, 600], labels=['Low', 'Medium', 'High'])
     print("Feature engineering completed. Added 'building_age' and 'height_category'.")
     return data
 
@@ -1,11 +1,42 @@
+import datetime
+import hashlib
+import json
+import os
+import numpy as np
 import pandas as pd
+from data_cleaning import canonicalize_columns, clean_columns
+from dataset_cache import read_dataset
+
+CURRENT_YEAR = datetime.date.today().year
+VALIDATION_INDEX_PATH = os.path.join('.validation_cache', 'index.npz')
+
+# Columns that identify a building (as incremental_scrape.KEY_COLUMNS); a changed row
+# replaces the indexed row with the same identity.
+IDENTITY_COLUMNS = ['Building', 'City', 'Country']
+
+# Declarative schema of the cleaned dataset (canonical column names, see
+# data_cleaning.CANONICAL_COLUMNS). Per column: the expected type ('numeric' or
+# 'string'), whether missing values are allowed, and optional bounds: 'min' and 'max'
+# are inclusive, 'greater_than' is exclusive. 'unique' lists the column combinations
+# that must identify a row.
+VALIDATION_SCHEMA = {
+    'columns': {
+        'Building': {'type': 'string', 'nullable': False},
+        'City': {'type': 'string', 'nullable': False},
+        'Country': {'type': 'string', 'nullable': False},
+        'Height': {'type': 'numeric', 'nullable': False, 'greater_than': 0},
+        'Floors': {'type': 'numeric', 'nullable': True, 'greater_than': 0},
+        'Year Completed': {'type': 'numeric', 'nullable': True, 'min': 1800, 'max': CURRENT_YEAR},
+    },
+    'unique': [['Building', 'City']],
+}
 
 def load_data(file_path='tallest_buildings_cleaned.csv'):
     """
     Load the cleaned dataset.
     """
     try:
-        data = pd.read_csv(file_path)
+        data = read_dataset(file_path)
         print(f"Data loaded successfully from {file_path}.")
         return data
     except FileNotFoundError:
@@ -58,20 +89,458 @@ def check_range_values(df):
     if not df['Year Completed'].between(1800, 2025).all():
         print("Error: 'Year Completed' contains values outside the valid range (1800-2025).")
 
-def run_validations(file_path='tallest_buildings_cleaned.csv'):
+class ValidationRule:
+    """
+    One check of a compiled schema: a column (or key), the check and its severity.
+    Failing nullable checks are warnings; every other failure is an error.
+    """
+
+    def __init__(self, column, check, severity='error', bound=None):
+        self.column = column
+        self.check = check
+        self.severity = severity
+        self.bound = bound
+
+    @property
+    def name(self):
+        column = ','.join(self.column) if isinstance(self.column, (list, tuple)) else self.column
+        return f"{column}:{self.check}"
+
+
+def compile_schema(schema=VALIDATION_SCHEMA):
+    """
+    Turns a declarative schema into the list of rules that validate() evaluates.
+
+    Returns:
+    - list: ValidationRule objects, in schema order.
+    """
+    rules = []
+    for column, spec in schema.get('columns', {}).items():
+        rules.append(ValidationRule(column, 'present'))
+        rules.append(ValidationRule(column, f"type:{spec.get('type', 'any')}"))
+        rules.append(ValidationRule(column, 'not_null', 'error' if spec.get('nullable', True) is False else 'warning'))
+        for check in ('greater_than', 'min', 'max'):
+            if spec.get(check) is not None:
+                rules.append(ValidationRule(column, check, bound=spec[check]))
+    for key in schema.get('unique', []):
+        rules.append(ValidationRule(list(key), 'unique'))
+    return rules
+
+
+class ValidationReport:
+    """
+    The outcome of validate(): per rule the number of failing rows and their index
+    labels. In sampled mode the counts are for the sample, and 'estimated_failures'
+    scales them to the whole frame.
+    """
+
+    def __init__(self, rules, failures, n_rows, n_checked, n_validated=None):
+        self.rules = rules
+        self.failures = failures  # rule name -> index labels of the failing rows
+        self.n_rows = n_rows
+        self.n_checked = n_checked
+        # Rows actually evaluated; fewer than n_checked when outcomes came from a ValidationIndex.
+        self.n_validated = n_checked if n_validated is None else n_validated
+
+    @property
+    def sampled(self):
+        return self.n_checked < self.n_rows
+
+    @property
+    def passed(self):
+        """
+        True if no rule with severity 'error' failed.
+        """
+        return all(len(self.failures[rule.name]) == 0 for rule in self.rules if rule.severity == 'error')
+
+    def rows(self, rule_name):
+        """
+        Index labels of the rows that failed a rule, e.g. report.rows('Height:greater_than').
+        """
+        return self.failures[rule_name]
+
+    def summary(self):
+        """
+        Returns:
+        - DataFrame: One row per rule with its column, check, severity and failure count
+          (and the estimated count for the whole frame when sampled).
+        """
+        summary = pd.DataFrame({
+            'column': [','.join(r.column) if isinstance(r.column, list) else r.column for r in self.rules],
+            'check': [r.check for r in self.rules],
+            'severity': [r.severity for r in self.rules],
+            'failures': [len(self.failures[r.name]) for r in self.rules],
+        }, index=pd.Index([r.name for r in self.rules], name='rule'))
+        if self.sampled:
+            summary['estimated_failures'] = (summary['failures'] * self.n_rows / max(self.n_checked, 1)).round().astype(int)
+        return summary
+
+    def print_summary(self):
+        summary = self.summary()
+        failed = summary[summary['failures'] > 0]
+        scope = f"a sample of {self.n_checked} of {self.n_rows}" if self.sampled else f"{self.n_rows}"
+        reused = f" ({self.n_validated} new or changed)" if self.n_validated < self.n_checked else ""
+        print(f"Validated {scope} rows{reused} against {len(summary)} rules: "
+              f"{'passed' if self.passed else 'FAILED'}.")
+        if not failed.empty:
+            print(failed.to_string())
+
+    def to_dict(self, max_rows=100):
+        """
+        A JSON-serializable form with at most `max_rows` offending index labels per rule.
+        """
+        return {
+            'passed': self.passed,
+            'n_rows': self.n_rows,
+            'n_checked': self.n_checked,
+            'n_validated': self.n_validated,
+            'rules': [{'rule': r.name, 'severity': r.severity, 'failures': len(self.failures[r.name]),
+                       'rows': [label.item() if hasattr(label, 'item') else label
+                                for label in self.failures[r.name][:max_rows]]}
+                      for r in self.rules],
+        }
+
+
+def validate(df, schema=VALIDATION_SCHEMA, sample=None, seed=0):
+    """
+    Validates a frame against a schema in one vectorized evaluation.
+
+    Column names are canonicalized first, so e.g. 'Height (m)' is checked as 'Height'.
+    Numeric columns are coerced once and stacked into one matrix, and the type and
+    range checks of all of them are evaluated together, as are the missing-value
+    checks of every column; uniqueness keys are checked by hashing.
+
+    Parameters:
+    - df (DataFrame): The data to validate.
+    - schema (dict): See VALIDATION_SCHEMA.
+    - sample (int or float): Validate only a random sample of this many rows (or this
+      fraction) of large inputs. Uniqueness is still checked on every row, since
+      duplicates rarely show up in a sample.
+    - seed (int): Seed for the sample.
+
+    Returns:
+    - ValidationReport: Failure counts and offending row labels per rule.
+    """
+    df = canonicalize_columns(df)
+    n_rows = len(df)
+    checked = df
+    if sample is not None:
+        size = int(sample * n_rows) if isinstance(sample, float) else int(sample)
+        if size < n_rows:
+            checked = df.sample(n=size, random_state=seed)
+    rules = compile_schema(schema)
+    specs = schema.get('columns', {})
+    present = [col for col in specs if col in checked.columns]
+    index = checked.index.to_numpy()
+    failures = {}
+
+    # Missing values of every schema column at once
+    missing = checked[present].isna().to_numpy() if present else np.empty((len(checked), 0), dtype=bool)
+
+    # Type checks and bounds of every numeric column at once
+    numeric = [col for col in present if specs[col].get('type') == 'numeric']
+    values = np.empty((len(checked), len(numeric)), dtype=np.float64, order='F')
+    bad_type = np.zeros((len(checked), len(numeric)), dtype=bool, order='F')
+    for i, col in enumerate(numeric):
+        series = checked[col]
+        coerced = series if pd.api.types.is_numeric_dtype(series) else pd.to_numeric(series, errors='coerce')
+        values[:, i] = coerced.to_numpy(dtype=np.float64, na_value=np.nan)
+        if not pd.api.types.is_numeric_dtype(series):
+            bad_type[:, i] = np.isnan(values[:, i]) & series.notna().to_numpy()
+    lower = np.array([specs[col].get('min', -np.inf) for col in numeric], dtype=np.float64)
+    upper = np.array([specs[col].get('max', np.inf) for col in numeric], dtype=np.float64)
+    strict = np.array([specs[col].get('greater_than', -np.inf) for col in numeric], dtype=np.float64)
+    below_min = values < lower
+    above_max = values > upper
+    not_greater = values <= strict
+    bounds = {'min': below_min, 'max': above_max, 'greater_than': not_greater}
+
+    for rule in rules:
+        column = rule.column
+        if rule.check == 'unique':
+            if all(col in df.columns for col in column):
+                rows = df.index[df.duplicated(subset=column, keep='first').to_numpy()].to_numpy()
+            else:
+                rows = np.empty(0, dtype=index.dtype)
+        elif column not in checked.columns:
+            rows = index if rule.check == 'present' else np.empty(0, dtype=index.dtype)
+        elif rule.check == 'present':
+            rows = np.empty(0, dtype=index.dtype)
+        elif rule.check == 'not_null':
+            rows = index[missing[:, present.index(column)]]
+        elif rule.check == 'type:numeric':
+            rows = index[bad_type[:, numeric.index(column)]]
+        elif rule.check == 'type:string':
+            series = checked[column]
+            if pd.api.types.is_object_dtype(series):
+                # infer_dtype scans in C; only mixed columns need the per-value type lookup.
+                if pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+                    rows = np.empty(0, dtype=index.dtype)
+                else:
+                    valid = series.map(type).isin([str, np.str_]) | series.isna()
+                    rows = index[~valid.to_numpy(dtype=bool)]
+            elif pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                rows = index[series.notna().to_numpy()]
+            else:
+                rows = np.empty(0, dtype=index.dtype)
+        elif rule.check in bounds:
+            rows = index[bounds[rule.check][:, numeric.index(column)]] if column in numeric else np.empty(0, dtype=index.dtype)
+        else:
+            rows = np.empty(0, dtype=index.dtype)
+        failures[rule.name] = rows
+    return ValidationReport(rules, failures, n_rows, len(checked))
+
+
+def column_hashes(df, columns):
+    """
+    Hashes every value of the given columns, one vectorized call per column.
+
+    Numbers are compared as float64 rounded to 3 decimals and categories by their
+    labels, so a cleaned frame and its compact form (see compact_schema.py) hash equal.
+
+    Returns:
+    - dict: Column -> one uint64 hash per row.
     """
-    Run all validation checks.
+    hashes = {}
+    for col in columns:
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            series = pd.Series(series.to_numpy(dtype=np.float64, na_value=np.nan), index=df.index).round(3)
+        hashes[col] = pd.util.hash_pandas_object(series, index=False, categorize=False).to_numpy()
+    return hashes
+
+
+def row_hashes(df, columns, hashes=None):
+    """
+    Combines the column hashes of each row into one uint64 row hash.
+
+    Parameters:
+    - df (DataFrame): The rows to hash.
+    - columns (list): The columns to include, in order.
+    - hashes (dict): Precomputed column_hashes() to reuse.
+
+    Returns:
+    - ndarray: One uint64 hash per row.
+    """
+    hashes = column_hashes(df, [col for col in columns if hashes is None or col not in hashes]) | (hashes or {})
+    combined = np.full(len(df), 0x345678, dtype=np.uint64)
+    for col in columns:
+        combined = (combined ^ hashes[col]) * np.uint64(0x100000001B3)
+    return combined
+
+
+class ValidationIndex:
+    """
+    A persistent record of every row of the dataset: its identity and content hashes,
+    the row-level rules it failed (as a bit mask) and the hashes of its uniqueness keys.
+
+    validate(df) evaluates only rows whose content hash is not in the index and reuses
+    the stored outcome of the others; uniqueness is checked on the stored key hashes
+    instead of the key columns. update(changes) applies a ChangeSet from
+    incremental_scrape.py and validates just the added and changed rows, so its cost
+    grows with the size of the change rather than of the dataset.
+
+    The index is discarded when the schema changes.
+    """
+
+    def __init__(self, path=VALIDATION_INDEX_PATH, schema=VALIDATION_SCHEMA, identity_columns=IDENTITY_COLUMNS):
+        self.path = path
+        self.schema = schema
+        self.identity_columns = list(identity_columns)
+        self.rules = compile_schema(schema)
+        self.row_rules = [rule for rule in self.rules if rule.check not in ('present', 'unique')]
+        self.key_rules = [rule for rule in self.rules if rule.check == 'unique']
+        if len(self.row_rules) > 64:
+            raise ValueError("A ValidationIndex supports at most 64 row-level rules.")
+        self.version = hashlib.sha256(json.dumps([schema, self.identity_columns], sort_keys=True, default=str)
+                                      .encode('utf-8')).hexdigest()[:16]
+        self.records = self._load()
+
+    def _empty(self):
+        columns = ['identity', 'content', 'outcome'] + [f'key_{i}' for i in range(len(self.key_rules))]
+        return pd.DataFrame({col: np.empty(0, dtype=np.uint64) for col in columns})
+
+    def _load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return self._empty()
+        try:
+            with np.load(self.path) as stored:
+                if str(stored['version']) != self.version:
+                    return self._empty()
+                return pd.DataFrame({name: stored[name] for name in stored.files if name != 'version'})
+        except (OSError, ValueError, KeyError):
+            return self._empty()
+
+    def save(self):
+        """
+        Writes the index to `path` (a no-op for an in-memory index with path=None).
+        """
+        if self.path is None:
+            return
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp.npz'
+        np.savez(tmp_path, version=np.array(self.version), **{col: self.records[col].to_numpy() for col in self.records})
+        os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        return len(self.records)
+
+    def _evaluate(self, df, hashes=None):
+        """
+        Validates rows against the row-level rules and returns their records.
+        """
+        report = validate(df, schema={'columns': self.schema.get('columns', {})})
+        positions = pd.Series(np.arange(len(df)), index=df.index)
+        outcome = np.zeros(len(df), dtype=np.uint64)
+        for bit, rule in enumerate(self.row_rules):
+            failed = report.rows(rule.name)
+            if len(failed):
+                outcome[positions.loc[failed].to_numpy()] |= np.uint64(1 << bit)
+        columns = self._content_columns(df)
+        needed = set(columns).union(self.identity_columns, *[rule.column for rule in self.key_rules])
+        hashes = column_hashes(df, [col for col in needed if hashes is None or col not in hashes]) | (hashes or {})
+        records = {
+            'identity': row_hashes(df, self.identity_columns, hashes),
+            'content': row_hashes(df, columns, hashes),
+            'outcome': outcome,
+        }
+        for i, rule in enumerate(self.key_rules):
+            records[f'key_{i}'] = row_hashes(df, rule.column, hashes)
+        return pd.DataFrame(records, index=df.index)
+
+    def _content_columns(self, df):
+        return [col for col in self.schema.get('columns', {}) if col in df.columns]
+
+    def _report(self, df, records, n_validated, duplicated):
+        """
+        Builds a ValidationReport from row records and their duplicate flags per key.
+        """
+        index = df.index.to_numpy()
+        failures = {}
+        for rule in self.rules:
+            if rule.check == 'present':
+                failures[rule.name] = index[:0] if rule.column in df.columns else index
+            elif rule.check == 'unique':
+                failures[rule.name] = index[duplicated[self.key_rules.index(rule)]]
+            else:
+                bit = np.uint64(1 << self.row_rules.index(rule))
+                failures[rule.name] = index[(records['outcome'].to_numpy() & bit) != 0]
+        return ValidationReport(self.rules, failures, len(df), len(df), n_validated)
+
+    def validate(self, df):
+        """
+        Validates a whole frame, evaluating only rows whose content is not yet indexed,
+        and makes the index describe exactly this frame.
+
+        Parameters:
+        - df (DataFrame): The cleaned dataset.
+
+        Returns:
+        - ValidationReport: The outcome for every row of `df`.
+        """
+        df = canonicalize_columns(df)
+        missing_keys = [col for rule in self.key_rules for col in rule.column if col not in df.columns]
+        if any(col not in df.columns for col in self.identity_columns) or missing_keys:
+            # Rows cannot be identified; fall back to a full evaluation.
+            return validate(df, self.schema)
+
+        hashes = column_hashes(df, self._content_columns(df))
+        content = row_hashes(df, self._content_columns(df), hashes)
+        # Rows usually keep their position between runs, so compare in place first and
+        # look up only the rows that moved or changed.
+        known = self.records
+        stored = known['content'].to_numpy()
+        positions = np.full(len(df), -1, dtype=np.int64)
+        aligned = min(len(df), len(stored))
+        positions[:aligned] = np.where(content[:aligned] == stored[:aligned], np.arange(aligned), -1)
+        moved = np.flatnonzero(positions < 0)
+        if len(moved) and len(stored):
+            order = np.argsort(stored)
+            found = np.minimum(np.searchsorted(stored[order], content[moved]), len(stored) - 1)
+            positions[moved] = np.where(stored[order][found] == content[moved], order[found], -1)
+        fresh = positions < 0
+        evaluated = self._evaluate(df[fresh], {col: values[fresh] for col, values in hashes.items()})
+        records = {}
+        for col in known.columns:
+            values = known[col].to_numpy()[np.maximum(positions, 0)] if len(known) else np.empty(len(df), np.uint64)
+            values[fresh] = evaluated[col].to_numpy()
+            records[col] = values
+        records = pd.DataFrame(records, index=df.index)
+
+        # Dataset-wide uniqueness over the stored key hashes
+        duplicated = [pd.Series(records[f'key_{i}'].to_numpy()).duplicated(keep='first').to_numpy()
+                      for i in range(len(self.key_rules))]
+        self.records = records.reset_index(drop=True)
+        self.save()
+        return self._report(df, records, int(fresh.sum()), duplicated)
+
+    def update(self, changes):
+        """
+        Applies the added, changed and removed rows of a re-scrape to the index and
+        validates only the added and changed rows. The index must describe the stored
+        rows the changes were computed against (build it once with validate()).
+
+        Parameters:
+        - changes (ChangeSet): Raw rows, as returned by incremental_scrape.diff_rows().
+
+        Returns:
+        - ValidationReport: The outcome for the added and changed rows; a row fails a
+          uniqueness rule if its key now occurs more than once in the dataset.
+        """
+        added, changed, removed = (clean_columns(part) for part in changes)
+        fresh = pd.concat([part for part in (changed, added) if len(part)] or [changed])
+        gone = [row_hashes(part, self.identity_columns) for part in (removed, changed) if len(part)]
+        if gone:
+            self.records = self.records[~np.isin(self.records['identity'].to_numpy(), np.concatenate(gone))]
+
+        records = self._evaluate(fresh) if len(fresh) else self._empty().set_axis(fresh.index)
+        self.records = pd.concat([self.records, records.reset_index(drop=True)], ignore_index=True)
+        duplicated = []
+        for i in range(len(self.key_rules)):
+            keys = records[f'key_{i}'].to_numpy()
+            stored = self.records[f'key_{i}'].to_numpy()
+            counts = pd.Series(stored[np.isin(stored, keys)]).value_counts()
+            duplicated.append(counts.reindex(keys, fill_value=0).to_numpy() > 1)
+        self.save()
+        return self._report(fresh, records, len(fresh), duplicated)
+
+    @property
+    def passed(self):
+        """
+        True if no indexed row fails an error-severity rule.
+        """
+        errors = np.uint64(sum(1 << bit for bit, rule in enumerate(self.row_rules) if rule.severity == 'error'))
+        if ((self.records['outcome'].to_numpy() & errors) != 0).any():
+            return False
+        return not any(self.records[f'key_{i}'].duplicated().any()
+                       for i, rule in enumerate(self.key_rules) if rule.severity == 'error')
+
+    def clear(self):
+        """
+        Empties the index and removes its file.
+        """
+        self.records = self._empty()
+        if self.path is not None and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def run_validations(file_path='tallest_buildings_cleaned.csv', sample=None):
+    """
+    Run all validation checks in one pass and print the report.
+
+    Returns:
+    - ValidationReport: The report, or None if the file could not be loaded.
     """
     df = load_data(file_path)
     if df is None:
-        return
-    
+        return None
+
     print("\n--- Data Validation Report ---")
-    check_missing_values(df)
-    check_data_types(df)
-    check_unique_values(df)
-    check_range_values(df)
+    report = validate(df, sample=sample)
+    report.print_summary()
     print("\nValidation completed.")
+    return report
 
 if __name__ == "__main__":
-    run_validations()
+    import sys
+    run_validations(*sys.argv[1:2])
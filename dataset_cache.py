@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import time
+import pandas as pd
+
+CACHE_DIR = os.environ.get('TALL_BUILDINGS_CACHE_DIR', '.dataset_cache')
+CACHE_FORMAT_VERSION = 1
+_HASH_CHUNK_SIZE = 1 << 20
+
+
+def file_fingerprint(file_path, with_hash=True):
+    """
+    Describes a source file by size, modification time and (optionally) content hash.
+
+    Parameters:
+    - file_path (str): The file to describe.
+    - with_hash (bool): Whether to hash the file contents.
+
+    Returns:
+    - dict: 'size', 'mtime_ns' and, if requested, 'sha256'.
+    """
+    stat = os.stat(file_path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        fingerprint['sha256'] = digest.hexdigest()
+    return fingerprint
+
+
+def _cache_paths(file_path, clean, cache_dir):
+    """
+    Returns the data and manifest paths of the cache entry for a source file.
+    """
+    key = hashlib.sha256(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:16]
+    stem = os.path.join(cache_dir, f"{key}-{'clean' if clean else 'raw'}")
+    return stem + '.feather', stem + '.json'
+
+
+def _read_manifest(manifest_path):
+    try:
+        with open(manifest_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(manifest_path, manifest):
+    tmp_path = f'{manifest_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+
+def cleaner_version():
+    """
+    Hash of the cleaning code (data_cleaning.py), stored with cleaned entries so that a
+    change to the cleaners invalidates them.
+    """
+    import data_cleaning
+    with open(data_cleaning.__file__, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def _is_fresh(file_path, manifest, manifest_path, clean=False):
+    """
+    Checks a cache entry against the source file (and, for cleaned entries, against
+    the cleaning code).
+
+    A different size invalidates the entry outright. If size and mtime both match, the
+    entry is trusted without reading the source. If only the mtime changed, the content
+    hash decides, and a matching hash refreshes the stored mtime.
+    """
+    if manifest is None or manifest.get('version') != CACHE_FORMAT_VERSION:
+        return False
+    if clean and manifest.get('cleaner') != cleaner_version():
+        return False
+    current = file_fingerprint(file_path, with_hash=False)
+    if current['size'] != manifest['size']:
+        return False
+    if current['mtime_ns'] == manifest['mtime_ns']:
+        return True
+    current = file_fingerprint(file_path)
+    if current['sha256'] != manifest['sha256']:
+        return False
+    manifest['mtime_ns'] = current['mtime_ns']
+    _write_manifest(manifest_path, manifest)
+    return True
+
+
+def _parse(file_path, clean):
+    data = pd.read_csv(file_path)
+    if clean:
+        from data_cleaning import clean_data
+        data = clean_data(data)
+    return data
+
+
+def read_dataset(file_path, clean=False, cache_dir=CACHE_DIR, use_cache=True):
+    """
+    Loads a CSV dataset through a binary columnar cache.
+
+    The first load parses the CSV (and cleans it if requested) and stores the result as
+    an uncompressed Feather file next to a manifest with the source file's size, mtime
+    and SHA-256. Later loads memory-map the Feather file instead of parsing the CSV, as
+    long as the source is unchanged. Without pyarrow the CSV is parsed every time.
+
+    Parameters:
+    - file_path (str): The source CSV file.
+    - clean (bool): Whether to return (and cache) the output of data_cleaning.clean_data.
+    - cache_dir (str): Directory holding the cache entries.
+    - use_cache (bool): Set to False to always parse the CSV.
+
+    Returns:
+    - DataFrame: The loaded data.
+
+    Raises:
+    - FileNotFoundError: If the source file does not exist.
+    """
+    if not use_cache:
+        return _parse(file_path, clean)
+    try:
+        from pyarrow import feather
+    except ImportError:
+        return _parse(file_path, clean)
+
+    data_path, manifest_path = _cache_paths(file_path, clean, cache_dir)
+    manifest = _read_manifest(manifest_path)
+    if _is_fresh(file_path, manifest, manifest_path, clean) and os.path.exists(data_path):
+        try:
+            return feather.read_table(data_path, memory_map=True).to_pandas()
+        except (OSError, ValueError):
+            pass
+
+    fingerprint = file_fingerprint(file_path)
+    data = _parse(file_path, clean)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Per-process temporary names, so concurrent first loads don't write the same file.
+    tmp_path = f'{data_path}.{os.getpid()}.tmp'
+    data.reset_index(drop=True).to_feather(tmp_path, compression='uncompressed')
+    os.replace(tmp_path, data_path)
+    manifest = dict(fingerprint, version=CACHE_FORMAT_VERSION, clean=clean)
+    if clean:
+        manifest['cleaner'] = cleaner_version()
+    _write_manifest(manifest_path, manifest)
+    return data
+
+
+def clear_cache(cache_dir=CACHE_DIR):
+    """
+    Removes every cache entry in `cache_dir`.
+    """
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        if name.endswith(('.feather', '.json', '.tmp')):
+            os.remove(os.path.join(cache_dir, name))
+
+
+def benchmark_cache(file_path='tallest_buildings.csv', clean=True, repeat=5, cache_dir=CACHE_DIR):
+    """
+    Compares a cold load (parse, clean and write the cache) with warm loads from the cache.
+
+    Parameters:
+    - file_path (str): The source CSV file.
+    - clean (bool): Whether to benchmark the cleaned dataset.
+    - repeat (int): Number of warm loads; the best one is reported.
+    - cache_dir (str): Cache directory used for the benchmark.
+
+    Returns:
+    - DataFrame: Time of the plain CSV load, the cold load and the best warm load.
+    """
+    start = time.perf_counter()
+    expected = _parse(file_path, clean)
+    csv_seconds = time.perf_counter() - start
+
+    data_path, manifest_path = _cache_paths(file_path, clean, cache_dir)
+    for path in (data_path, manifest_path):
+        if os.path.exists(path):
+            os.remove(path)
+    start = time.perf_counter()
+    read_dataset(file_path, clean=clean, cache_dir=cache_dir)
+    cold_seconds = time.perf_counter() - start
+
+    warm = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = read_dataset(file_path, clean=clean, cache_dir=cache_dir)
+        warm.append(time.perf_counter() - start)
+    pd.testing.assert_frame_equal(data, expected.reset_index(drop=True))
+
+    results = pd.DataFrame([
+        {'load': 'csv (no cache)', 'rows': len(data), 'seconds': csv_seconds},
+        {'load': 'cold (parse + write cache)', 'rows': len(data), 'seconds': cold_seconds},
+        {'load': 'warm (memory-mapped)', 'rows': len(data), 'seconds': min(warm)},
+    ])
+    print(results.to_string(index=False))
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    benchmark_cache(*sys.argv[1:2])
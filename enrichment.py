@@ -0,0 +1,306 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+ENRICHMENT_CACHE_DIR = '.enrichment_cache'
+
+# World Bank indicator API: one request returns the whole yearly series for a country.
+WORLD_BANK_URL = 'https://api.worldbank.org/v2/country/{code}/indicator/{indicator}?format=json&per_page=1000'
+GDP_INDICATOR = 'NY.GDP.MKTP.CD'
+
+# ISO 3166-1 alpha-3 codes, keyed by the country names used in the dataset. Taiwan has
+# no World Bank country code (the API does not cover it), so its rows get no values.
+COUNTRY_CODES = {
+    'Australia': 'AUS',
+    'Bahrain': 'BHR',
+    'Brazil': 'BRA',
+    'Canada': 'CAN',
+    'China': 'CHN',
+    'Egypt': 'EGY',
+    'France': 'FRA',
+    'Germany': 'DEU',
+    'India': 'IND',
+    'Indonesia': 'IDN',
+    'Israel': 'ISR',
+    'Japan': 'JPN',
+    'Kuwait': 'KWT',
+    'Malaysia': 'MYS',
+    'Mexico': 'MEX',
+    'Philippines': 'PHL',
+    'Qatar': 'QAT',
+    'Russia': 'RUS',
+    'Saudi Arabia': 'SAU',
+    'Singapore': 'SGP',
+    'South Korea': 'KOR',
+    'Thailand': 'THA',
+    'Turkey': 'TUR',
+    'United Arab Emirates': 'ARE',
+    'United Kingdom': 'GBR',
+    'United States': 'USA',
+    'Vietnam': 'VNM',
+}
+
+# Responses worth retrying; other 4xx errors are final.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HostRateLimiter:
+    """
+    Limits requests per host: at most `concurrency` in flight and at least
+    1 / `rate` seconds between request starts.
+    """
+
+    def __init__(self, rate=5.0, concurrency=4):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.concurrency = concurrency
+        self._semaphores = {}
+        self._locks = {}
+        self._next_start = {}
+
+    @contextlib.asynccontextmanager
+    async def limit(self, host):
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.concurrency))
+        async with semaphore:
+            async with self._locks.setdefault(host, asyncio.Lock()):
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.interval
+                if start > now:
+                    await asyncio.sleep(start - now)
+            yield
+
+
+class ThreadSessions:
+    """
+    One requests.Session per worker thread, since a Session is not guaranteed to be
+    thread-safe. Each session gets an HTTPAdapter whose connection pool is sized for
+    the requests one thread can have in flight.
+    """
+
+    def __init__(self, pool_size=4):
+        self.pool_size = pool_size
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions.clear()
+
+
+class ResponseCache:
+    """
+    On-disk cache of response bodies keyed by URL, with an optional time to live.
+    """
+
+    def __init__(self, cache_dir=ENRICHMENT_CACHE_DIR, ttl=None):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url):
+        try:
+            with open(self._path(url)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.ttl is not None and time.time() - entry['fetched_at'] > self.ttl:
+            return None
+        return entry['body']
+
+    def set(self, url, body):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(url)
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'url': url, 'fetched_at': time.time(), 'body': body}, f)
+        os.replace(path + '.tmp', path)
+
+
+def parse_world_bank(body, country, value_name='GDP'):
+    """
+    Parses a World Bank indicator response into yearly values.
+
+    Parameters:
+    - body (str): The JSON response: [metadata, [{'date': '2022', 'value': ...}, ...]].
+    - country (str): The dataset's name for the country.
+    - value_name (str): Name of the value column.
+
+    Returns:
+    - DataFrame: 'Country', 'Year' and `value_name` columns.
+    """
+    payload = json.loads(body)
+    records = payload[1] if len(payload) > 1 and payload[1] else []
+    series = pd.DataFrame(records, columns=['date', 'value'])
+    return pd.DataFrame({
+        'Country': country,
+        'Year': pd.to_numeric(series['date'], errors='coerce').astype('Int64'),
+        value_name: pd.to_numeric(series['value'], errors='coerce'),
+    }).dropna(subset=['Year'])
+
+
+async def _fetch(url, sessions, executor, limiter, cache, retries, backoff, timeout):
+    """
+    Fetches one URL through the cache, the per-host limiter and the retry policy.
+    """
+    body = cache.get(url) if cache is not None else None
+    if body is not None:
+        return body
+
+    loop = asyncio.get_running_loop()
+    host = urlsplit(url).netloc
+    for attempt in range(retries + 1):
+        delay = backoff * 2 ** attempt * (1 + random.random())
+        try:
+            async with limiter.limit(host):
+                response = await loop.run_in_executor(executor, lambda: sessions.get().get(url, timeout=timeout))
+        except requests.RequestException as e:
+            if attempt == retries:
+                raise
+            print(f"Request to {url} failed ({e}); retrying in {delay:.1f}s.")
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                response.raise_for_status()
+                if cache is not None:
+                    cache.set(url, response.text)
+                return response.text
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+        await asyncio.sleep(delay)
+
+
+async def fetch_series_async(countries, url_template=WORLD_BANK_URL, indicator=GDP_INDICATOR,
+                             parse=parse_world_bank, country_codes=COUNTRY_CODES, concurrency=16,
+                             rate=5.0, per_host_concurrency=4, retries=3, backoff=0.5, timeout=30,
+                             cache_dir=ENRICHMENT_CACHE_DIR, cache_ttl=None):
+    """
+    Fetches one series per country concurrently. See fetch_country_series().
+    """
+    cache = ResponseCache(cache_dir, ttl=cache_ttl) if cache_dir else None
+    limiter = HostRateLimiter(rate=rate, concurrency=per_host_concurrency)
+    targets = {}
+    for country in dict.fromkeys(countries):
+        code = country_codes.get(country)
+        if code is None:
+            print(f"No country code for '{country}'; skipping.")
+        else:
+            targets[country] = url_template.format(code=code, indicator=indicator)
+
+    sessions = ThreadSessions(pool_size=per_host_concurrency)
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            bodies = await asyncio.gather(
+                *(_fetch(url, sessions, executor, limiter, cache, retries, backoff, timeout) for url in targets.values()),
+                return_exceptions=True)
+    finally:
+        sessions.close()
+
+    frames = []
+    for (country, url), body in zip(targets.items(), bodies):
+        if isinstance(body, Exception):
+            print(f"Error: Could not fetch data for '{country}': {body}")
+            continue
+        try:
+            frames.append(parse(body, country))
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            print(f"Error: Could not parse data for '{country}': {e}")
+    if not frames:
+        return pd.DataFrame(columns=['Country', 'Year'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def fetch_country_series(countries, **kwargs):
+    """
+    Fetches a yearly series (GDP by default) for every country concurrently.
+
+    Requests use one pooled HTTP session per worker thread, are limited per host,
+    retried with exponential backoff on connection errors, 429 and 5xx responses, and
+    cached on disk so that repeated runs don't hit the network.
+
+    Parameters:
+    - countries (iterable): Country names as used in the dataset.
+    - url_template (str): URL with {code} and {indicator} placeholders.
+    - indicator (str): The indicator to request.
+    - parse (callable): (body, country) -> DataFrame with 'Country' and 'Year' columns.
+    - country_codes (dict): Country name -> code used in the URL.
+    - concurrency (int): Maximum number of requests in flight overall.
+    - rate (float): Maximum request starts per second and host.
+    - per_host_concurrency (int): Maximum requests in flight per host.
+    - retries (int): Retries per request.
+    - backoff (float): Base delay in seconds, doubled on every retry.
+    - timeout (float): Request timeout in seconds.
+    - cache_dir (str): Response cache directory, or None to disable caching.
+    - cache_ttl (float): Maximum age of cached responses in seconds (None: no expiry).
+
+    Returns:
+    - DataFrame: The series of all countries that could be fetched.
+    """
+    return asyncio.run(fetch_series_async(countries, **kwargs))
+
+
+def enrich_buildings(buildings_df, series, country_column='Country', year_column='Year Completed'):
+    """
+    Joins per-country yearly values onto the buildings in one merge.
+
+    Parameters:
+    - buildings_df (DataFrame): The buildings data.
+    - series (DataFrame): 'Country', 'Year' and value columns, e.g. from fetch_country_series().
+    - country_column (str): Country column of `buildings_df`.
+    - year_column (str): Year column of `buildings_df`.
+
+    Returns:
+    - DataFrame: `buildings_df` with the value columns for its country and year added.
+    """
+    series = series.rename(columns={'Country': country_column, 'Year': year_column})
+    series = series.drop_duplicates([country_column, year_column], keep='last')
+    series = series.astype({year_column: 'Int64'})
+    keys = pd.DataFrame({
+        country_column: buildings_df[country_column].to_numpy(),
+        year_column: pd.to_numeric(buildings_df[year_column], errors='coerce').astype('Int64').to_numpy(),
+    })
+    enriched = keys.merge(series, on=[country_column, year_column], how='left')
+    enriched.index = buildings_df.index
+    return buildings_df.join(enriched.drop(columns=[country_column, year_column]))
+
+
+def enrich_with_gdp(buildings_df, **kwargs):
+    """
+    Fetches GDP for every country in `buildings_df` and adds it as a 'GDP' column.
+    Keyword arguments are passed to fetch_country_series().
+    """
+    series = fetch_country_series(buildings_df['Country'].dropna().unique(), **kwargs)
+    if 'GDP' not in series.columns:
+        series = series.assign(GDP=pd.Series(dtype='float64'))
+    return enrich_buildings(buildings_df, series)
+
+
+if __name__ == "__main__":
+    from data_cleaning import as_dataframe
+    buildings = as_dataframe('tallest_buildings.csv')
+    print(enrich_with_gdp(buildings).head(10))
@@ -0,0 +1,183 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from data_cleaning import clean_text_column
+from lazy_imports import lazy_import
+
+gpd = lazy_import('geopandas')
+shapely_geometry = lazy_import('shapely.geometry')
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gazetteer.csv')
+GEOCODE_CACHE_DIR = '.geocode_cache'
+KEY_COLUMNS = ['City', 'Country']
+COORDINATE_COLUMNS = ['Latitude', 'Longitude']
+
+
+def _normalize_keys(keys):
+    """
+    Lower-cased, footnote-free City and Country used for matching, so that e.g.
+    'Dubai†' and 'dubai' find the same entry.
+    """
+    return pd.DataFrame({col: clean_text_column(keys[col]).str.casefold() for col in KEY_COLUMNS},
+                        index=keys.index)
+
+
+def load_gazetteer(path=GAZETTEER_PATH):
+    """
+    Loads the offline gazetteer: one row per city with 'City', 'Country', 'Latitude'
+    and 'Longitude'.
+    """
+    return pd.read_csv(path)
+
+
+def _lookup(keys, table):
+    """
+    Looks up unique (City, Country) pairs in a coordinate table with one hash join.
+
+    Returns:
+    - DataFrame: 'Latitude' and 'Longitude' per row of `keys` (NaN if not found).
+    """
+    index = pd.MultiIndex.from_frame(_normalize_keys(table[KEY_COLUMNS]))
+    positions = index.get_indexer(pd.MultiIndex.from_frame(_normalize_keys(keys)))
+    values = table[COORDINATE_COLUMNS].to_numpy(dtype=np.float64)
+    found = positions >= 0
+    coordinates = np.full((len(keys), 2), np.nan)
+    coordinates[found] = values[positions[found]]
+    return pd.DataFrame(coordinates, columns=COORDINATE_COLUMNS, index=keys.index)
+
+
+class GeocodeCache:
+    """
+    Persistent (City, Country) -> coordinates cache, stored as one CSV file.
+
+    Only resolved pairs are stored, so a pair no source knew is looked up again on the
+    next run, e.g. after the gazetteer gains it or with a `geocoder`.
+    """
+
+    def __init__(self, cache_dir=GEOCODE_CACHE_DIR):
+        self.path = os.path.join(cache_dir, 'geocodes.csv')
+        try:
+            self.table = pd.read_csv(self.path, keep_default_na=False, na_values=[''])
+        except FileNotFoundError:
+            self.table = pd.DataFrame(columns=KEY_COLUMNS + COORDINATE_COLUMNS)
+
+    def lookup(self, keys):
+        """
+        Returns coordinates for the pairs in `keys` and a mask of the pairs that were cached.
+        """
+        if self.table.empty:
+            return pd.DataFrame(np.nan, columns=COORDINATE_COLUMNS, index=keys.index), np.zeros(len(keys), bool)
+        coordinates = _lookup(keys, self.table)
+        return coordinates, coordinates['Latitude'].notna().to_numpy()
+
+    def add(self, entries):
+        """
+        Adds the resolved entries ('City', 'Country', 'Latitude', 'Longitude') and writes
+        the cache file.
+        """
+        entries = entries.dropna(subset=COORDINATE_COLUMNS)
+        if entries.empty:
+            return
+        self.table = pd.concat([self.table, entries[KEY_COLUMNS + COORDINATE_COLUMNS]], ignore_index=True)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.table.to_csv(self.path + '.tmp', index=False)
+        os.replace(self.path + '.tmp', self.path)
+
+
+def add_coordinates(df, gazetteer=None, cache_dir=GEOCODE_CACHE_DIR, geocoder=None):
+    """
+    Adds 'Latitude' and 'Longitude' columns by looking up each building's (City, Country).
+
+    Only the distinct pairs are looked up: first in the on-disk cache, then in the
+    offline gazetteer and finally, for names neither knows, with the optional
+    `geocoder`. Newly resolved pairs are saved to the cache in one write (misses are not
+    cached), and the coordinates are joined back onto all rows at once.
+
+    Parameters:
+    - df (DataFrame): Buildings with 'City' and 'Country' columns; it is not modified.
+    - gazetteer (DataFrame): City coordinates (default: gazetteer.csv).
+    - cache_dir (str): Directory of the geocode cache, or None to disable it.
+    - geocoder (callable): Optional (city, country) -> (latitude, longitude) or None,
+      e.g. a wrapper around an online service.
+
+    Returns:
+    - DataFrame: A copy of `df` with 'Latitude' and 'Longitude' (NaN where unknown).
+    """
+    keys = df[KEY_COLUMNS].astype(object).drop_duplicates().reset_index(drop=True)
+    cache = GeocodeCache(cache_dir) if cache_dir else None
+    if cache is not None:
+        coordinates, cached = cache.lookup(keys)
+    else:
+        coordinates, cached = pd.DataFrame(np.nan, columns=COORDINATE_COLUMNS, index=keys.index), np.zeros(len(keys), bool)
+
+    todo = ~cached
+    if todo.any():
+        gazetteer = load_gazetteer() if gazetteer is None else gazetteer
+        coordinates.loc[todo] = _lookup(keys[todo], gazetteer).to_numpy()
+        unresolved = todo & coordinates['Latitude'].isna().to_numpy()
+        if geocoder is not None:
+            for i in np.flatnonzero(unresolved):
+                result = geocoder(keys.at[i, 'City'], keys.at[i, 'Country'])
+                if result is not None:
+                    coordinates.loc[i, COORDINATE_COLUMNS] = result
+        if cache is not None:
+            cache.add(pd.concat([keys[todo], coordinates[todo]], axis=1))
+
+    missing = coordinates['Latitude'].isna().sum()
+    if missing:
+        print(f"No coordinates for {missing} of {len(keys)} (City, Country) pairs.")
+
+    # Join back by position: every row's pair is located in `keys` with one hash lookup.
+    pair_index = pd.MultiIndex.from_frame(keys)
+    rows = pair_index.get_indexer(pd.MultiIndex.from_frame(df[KEY_COLUMNS].astype(object)))
+    values = coordinates.to_numpy()[rows]
+    values[rows < 0] = np.nan  # rows with a missing City or Country
+    return df.assign(Latitude=values[:, 0], Longitude=values[:, 1])
+
+
+def points_from_frame(df, crs='EPSG:4326'):
+    """
+    Builds a GeoDataFrame with point geometries from 'Longitude' and 'Latitude' in one
+    vectorized call. Rows without coordinates are dropped.
+    """
+    df = df.dropna(subset=COORDINATE_COLUMNS)
+    geometry = gpd.points_from_xy(df['Longitude'], df['Latitude'], crs=crs)
+    return gpd.GeoDataFrame(df, geometry=geometry, crs=crs)
+
+
+def benchmark_geodata(n_rows=1_000_000, seed=0, cache_dir=None):
+    """
+    Times geocoding and geometry construction on a synthetic dataset: per-row shapely
+    Points (the original prepare_geodata) against gpd.points_from_xy.
+
+    Returns:
+    - DataFrame: Seconds per step.
+    """
+    from synthetic_data import city_table, generate_buildings
+
+    buildings = generate_buildings(n_rows, seed=seed, raw=False)
+    results = []
+
+    # The synthetic cities are not in gazetteer.csv, so their own table stands in for it.
+    start = time.perf_counter()
+    located = add_coordinates(buildings, gazetteer=city_table(seed=seed), cache_dir=cache_dir)
+    results.append({'step': 'add_coordinates', 'rows': n_rows, 'seconds': time.perf_counter() - start})
+
+    located = located.dropna(subset=COORDINATE_COLUMNS)
+    start = time.perf_counter()
+    geometry = [shapely_geometry.Point(xy) for xy in zip(located['Longitude'], located['Latitude'])]
+    gpd.GeoDataFrame(located, geometry=geometry)
+    results.append({'step': 'per-row Points', 'rows': len(located), 'seconds': time.perf_counter() - start})
+
+    start = time.perf_counter()
+    points_from_frame(located)
+    results.append({'step': 'points_from_xy', 'rows': len(located), 'seconds': time.perf_counter() - start})
+
+    results = pd.DataFrame(results)
+    print(results.to_string(index=False))
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_geodata()
@@ -1,53 +1,77 @@
+import os
 import pandas as pd
-import geopandas as gpd
-import matplotlib.pyplot as plt
-from shapely.geometry import Point
+from basemap import BASEMAP_PATH, WORLD_EXTENT, get_basemap
+from chart_rendering import CHART_DIR, finish_figure
+from data_cleaning import as_dataframe
+from dataset_cache import read_dataset
+from geocoding import GEOCODE_CACHE_DIR, add_coordinates, points_from_frame
+from lazy_imports import lazy_import
+from regional_aggregation import aggregate_regions
+
+gpd = lazy_import('geopandas')
+plt = lazy_import('matplotlib.pyplot')
 
 # Load the cleaned dataset
 def load_data(file_path='tallest_buildings_cleaned.csv'):
-    return pd.read_csv(file_path)
+    return read_dataset(file_path)
 
 # Prepare GeoDataFrame
-def prepare_geodata(df):
-    # Assuming the dataset contains 'Latitude' and 'Longitude' columns
-    df = df.dropna(subset=['Latitude', 'Longitude'])
-    geometry = [Point(xy) for xy in zip(df['Longitude'], df['Latitude'])]
-    geo_df = gpd.GeoDataFrame(df, geometry=geometry)
-    return geo_df
+def prepare_geodata(df, cache_dir=GEOCODE_CACHE_DIR):
+    # Datasets without 'Latitude' and 'Longitude' columns (such as the scraped CSV) are
+    # geocoded from City and Country via the offline gazetteer and the geocode cache
+    if not {'Latitude', 'Longitude'}.issubset(df.columns):
+        df = add_coordinates(df, cache_dir=cache_dir)
+    return points_from_frame(df)
 
 # Plot distribution of buildings globally
-def plot_global_distribution(geo_df, output_file='global_distribution.png'):
-    world = gpd.read_file(gpd.datasets.get_path('naturalearth_lowres'))
-    ax = world.plot(color='lightgrey', edgecolor='black', figsize=(15, 10))
+def plot_global_distribution(geo_df, output_file=os.path.join(CHART_DIR, 'global_distribution.png'), extent=WORLD_EXTENT,
+                             zoom=None, raster=True, basemap_path=BASEMAP_PATH):
+    # The basemap is loaded once per process and, with raster=True, drawn as a cached
+    # background image, so bulk renders (per region, per year) only draw the buildings.
+    # extent is (lon_min, lon_max, lat_min, lat_max); zoom defaults to one that fits it.
+    fig, ax = plt.subplots(figsize=(15, 10))
+    basemap = get_basemap(basemap_path)
+    if basemap is not None:
+        basemap.draw(ax, zoom=zoom, extent=extent, raster=raster)
+    else:
+        print("Drawing the buildings without a basemap.")
+        ax.set_xlim(extent[0], extent[1])
+        ax.set_ylim(extent[2], extent[3])
     geo_df.plot(ax=ax, color='blue', markersize=10, alpha=0.7, label='Buildings')
-    plt.title('Global Distribution of Tallest Buildings')
-    plt.legend()
-    plt.savefig(output_file)
-    plt.show()
+    ax.set_title('Global Distribution of Tallest Buildings')
+    ax.legend()
+    finish_figure(output_file)
 
 # Plot number of buildings per country
-def plot_buildings_by_country(df, output_file='buildings_by_country.png'):
-    country_counts = df['Country'].value_counts()
+def plot_buildings_by_country(df, output_file=os.path.join(CHART_DIR, 'buildings_by_country.png')):
+    country_counts = aggregate_regions(df)['country']['count'].droplevel('Region')
     fig, ax = plt.subplots(figsize=(12, 8))
     country_counts.plot(kind='bar', color='skyblue', ax=ax)
     ax.set_title('Number of Tallest Buildings by Country')
     ax.set_xlabel('Country')
     ax.set_ylabel('Number of Buildings')
     plt.tight_layout()
-    plt.savefig(output_file)
-    plt.show()
+    finish_figure(output_file)
 
-# Analyze tallest building heights by region
-def region_height_analysis(df, region_mapping, output_file='region_heights.png'):
-    df['Region'] = df['Country'].map(region_mapping)
-    region_avg_height = df.groupby('Region')['Height'].mean().sort_values()
+# Analyze tallest building heights by region (region_mapping defaults to the full
+# country -> region table in country_regions.csv)
+def region_height_analysis(df, region_mapping=None, output_file=os.path.join(CHART_DIR, 'region_heights.png')):
+    region_avg_height = aggregate_regions(df, region_mapping)['region']['height_mean'].sort_values()
     fig, ax = plt.subplots(figsize=(12, 8))
     region_avg_height.plot(kind='barh', color='salmon', ax=ax)
     ax.set_title('Average Height of Tallest Buildings by Region')
     ax.set_xlabel('Average Height (m)')
     plt.tight_layout()
-    plt.savefig(output_file)
-    plt.show()
+    finish_figure(output_file)
+
+# Run the geographical analysis on a cleaned DataFrame or a data file
+def plot_geographical_data(data):
+    data = as_dataframe(data)
+    if data is None:
+        return
+    plot_buildings_by_country(data)
+    region_height_analysis(data)
+    plot_global_distribution(prepare_geodata(data))
 
 if __name__ == "__main__":
     # Load and prepare data
@@ -60,17 +84,5 @@ if __name__ == "__main__":
     # Plot buildings by country
     plot_buildings_by_country(data)
     
-    # Define region mapping (example for demonstration purposes)
-    region_map = {
-        'United States': 'North America',
-        'China': 'Asia',
-        'United Arab Emirates': 'Middle East',
-        'Saudi Arabia': 'Middle East',
-        'Malaysia': 'Asia',
-        'Canada': 'North America',
-        'Australia': 'Oceania',
-        # Add other countries and their regions as needed
-    }
-    
     # Analyze heights by region
-    region_height_analysis(data, region_map)
+    region_height_analysis(data)
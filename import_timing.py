@@ -0,0 +1,102 @@
+import argparse
+import json
+import subprocess
+import sys
+import pandas as pd
+
+# Libraries that a validation-only run must not import.
+HEAVY_MODULES = ['sklearn', 'geopandas', 'shapely', 'seaborn', 'matplotlib']
+
+
+def parse_importtime(stderr):
+    """
+    Parses the output of `python -X importtime`.
+
+    Parameters:
+    - stderr (str): The stderr of the measured process.
+
+    Returns:
+    - DataFrame: One row per imported module with 'self_us', 'cumulative_us',
+      'depth' and the top-level 'package'.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        rows.append({'module': name, 'package': name.split('.')[0], 'depth': depth,
+                     'self_us': int(self_us), 'cumulative_us': int(cumulative_us)})
+    return pd.DataFrame(rows, columns=['module', 'package', 'depth', 'self_us', 'cumulative_us'])
+
+
+def measure_import_time(statement='import index', runs=3):
+    """
+    Measures the import cost of a statement in fresh interpreters with `-X importtime`.
+
+    Parameters:
+    - statement (str): Python code to run, e.g. 'import index'.
+    - runs (int): Number of fresh interpreters; the fastest run is reported.
+
+    Returns:
+    - dict: Total import time in milliseconds, the per-package breakdown and the
+      imported top-level packages of the fastest run.
+    """
+    best = None
+    for _ in range(runs):
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                                 capture_output=True, text=True, check=True)
+        timings = parse_importtime(process.stderr)
+        total_ms = timings['self_us'].sum() / 1000
+        if best is None or total_ms < best[0]:
+            best = (total_ms, timings)
+
+    total_ms, timings = best
+    by_package = (timings.groupby('package')['self_us'].sum() / 1000).sort_values(ascending=False)
+    return {
+        'statement': statement,
+        'total_ms': round(total_ms, 1),
+        'packages_ms': by_package.round(1).to_dict(),
+        'packages': sorted(by_package.index),
+    }
+
+
+def stage_import_report(stages=('validate',), file_path='tallest_buildings.csv', runs=3):
+    """
+    Measures importing index and running the given stages, and lists which heavy
+    libraries the run imported.
+
+    Parameters:
+    - stages (tuple): Stages passed to index.main.
+    - file_path (str): Dataset for the run.
+    - runs (int): Number of fresh interpreters; the fastest run is reported.
+
+    Returns:
+    - dict: The import measurement plus 'stages' and 'heavy_modules_imported'.
+    """
+    statement = f'import index; index.main({file_path!r}, {list(stages)!r})'
+    report = measure_import_time(statement, runs=runs)
+    report['stages'] = list(stages)
+    report['heavy_modules_imported'] = [name for name in HEAVY_MODULES if name in report['packages']]
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure import time of the pipeline entry points.")
+    parser.add_argument('--output', default='import_times.json', help="Path of the JSON report")
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    report = {
+        'python': sys.version.split()[0],
+        'import_index': measure_import_time('import index', runs=args.runs),
+        'validate_only': stage_import_report(('validate',), runs=args.runs),
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"import index: {report['import_index']['total_ms']} ms")
+    print(f"validation-only run: {report['validate_only']['total_ms']} ms, "
+          f"heavy modules imported: {report['validate_only']['heavy_modules_imported'] or 'none'}")
+    print(f"Report written to {args.output}.")
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+import requests
+from data_cleaning import clean_columns
+from table_extractor import extract_table, BUILDINGS_SCHEMA
+
+SCRAPE_CACHE_DIR = '.scrape_cache'
+
+# Columns that identify a building; a row whose key is unchanged but whose other
+# values differ is reported as changed rather than as removed + added.
+KEY_COLUMNS = ['Building', 'City', 'Country']
+
+
+class ChangeSet(namedtuple('ChangeSet', ['added', 'changed', 'removed'])):
+    """
+    Rows added, changed (new values) and removed by a re-scrape, as DataFrames.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def empty(cls, columns=tuple(BUILDINGS_SCHEMA)):
+        frame = pd.DataFrame(columns=list(columns))
+        return cls(frame, frame.copy(), frame.copy())
+
+    @property
+    def is_empty(self):
+        return self.added.empty and self.changed.empty and self.removed.empty
+
+    def summary(self):
+        return f"{len(self.added)} added, {len(self.changed)} changed, {len(self.removed)} removed"
+
+
+def _normalize(df):
+    """
+    Gives equal values equal representations regardless of how the frame was produced
+    (numbers from the CSV as int64/float64, from the extractor as Int64; text as object
+    or string dtype).
+    """
+    normalized = {}
+    for col in df.columns:
+        if pd.api.types.is_numeric_dtype(df[col]):
+            normalized[col] = pd.to_numeric(df[col]).astype('Float64')
+        else:
+            normalized[col] = df[col].astype('string').str.strip()
+    return pd.DataFrame(normalized, index=df.index)
+
+
+def hash_rows(df, columns=None):
+    """
+    Hashes every row of a DataFrame in one vectorized call.
+
+    Parameters:
+    - df (DataFrame): The rows to hash.
+    - columns (list): Columns to include; defaults to all columns.
+
+    Returns:
+    - ndarray: One uint64 hash per row.
+    """
+    columns = list(df.columns) if columns is None else list(columns)
+    return pd.util.hash_pandas_object(_normalize(df[columns]), index=False).to_numpy()
+
+
+def diff_rows(old, new, key_columns=KEY_COLUMNS):
+    """
+    Compares two versions of the table row by row using key and content hashes.
+
+    Parameters:
+    - old (DataFrame): The stored rows.
+    - new (DataFrame): The freshly scraped rows.
+    - key_columns (list): Columns identifying a building.
+
+    Returns:
+    - ChangeSet: Rows of `new` that were added or changed and rows of `old` that were removed.
+    """
+    columns = [col for col in new.columns if col in old.columns]
+    old_keys, new_keys = hash_rows(old, key_columns), hash_rows(new, key_columns)
+    old_content = pd.Series(hash_rows(old, columns), index=old_keys)
+    old_content = old_content[~old_content.index.duplicated(keep='last')]
+    new_content = hash_rows(new, columns)
+
+    known = np.isin(new_keys, old_keys)
+    changed = known.copy()
+    changed[known] = old_content.reindex(new_keys[known]).to_numpy() != new_content[known]
+    removed = ~np.isin(old_keys, new_keys)
+    return ChangeSet(new[~known], new[changed], old[removed])
+
+
+def apply_changes(stored, changes, key_columns=KEY_COLUMNS):
+    """
+    Upserts a change set into the stored rows, keeping the stored row order.
+
+    Removed rows are dropped, changed rows are replaced in place and added rows are
+    appended at the end.
+
+    Parameters:
+    - stored (DataFrame): The stored rows.
+    - changes (ChangeSet): The output of diff_rows().
+    - key_columns (list): Columns identifying a building.
+
+    Returns:
+    - DataFrame: The updated rows.
+    """
+    keys = hash_rows(stored, key_columns)
+    kept = ~np.isin(keys, hash_rows(changes.removed, key_columns))
+    stored, keys = stored[kept], keys[kept]
+
+    # Changed rows take the position of the stored row they replace.
+    positions = pd.Series(np.arange(len(stored)), index=keys)
+    positions = positions[~positions.index.duplicated(keep='last')]
+    changed_positions = positions.reindex(hash_rows(changes.changed, key_columns)).to_numpy()
+    unchanged = ~np.isin(np.arange(len(stored)), changed_positions)
+
+    parts = [
+        (stored[unchanged], np.flatnonzero(unchanged)),
+        (changes.changed, changed_positions),
+        (changes.added, len(stored) + np.arange(len(changes.added))),
+    ]
+    parts = [part.assign(_position=order) for part, order in parts if len(part)]
+    if not parts:
+        return stored.iloc[:0]
+    updated = pd.concat(parts, ignore_index=True).sort_values('_position', kind='stable')
+    return updated.drop(columns='_position').reset_index(drop=True)
+
+
+def _meta_path(url, cache_dir):
+    key = hashlib.sha256(url.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f'{key}.json'), os.path.join(cache_dir, f'{key}.html')
+
+
+def fetch_if_changed(url, cache_dir=SCRAPE_CACHE_DIR, session=None, timeout=30):
+    """
+    Fetches a page with a conditional request.
+
+    The ETag and Last-Modified values stored by save_fetch() are sent as If-None-Match
+    and If-Modified-Since. A 304 response, or a 200 response whose body hashes to the
+    stored one, means the page is unchanged. Nothing is written here: the caller saves
+    the new body and validators with save_fetch() once it has processed the page, so a
+    failure in between makes the next run fetch the page again.
+
+    Parameters:
+    - url (str): The page to fetch.
+    - cache_dir (str): Directory for the cached HTML and response metadata.
+    - session (requests.Session): Optional session to reuse connections.
+    - timeout (float): Request timeout in seconds.
+
+    Returns:
+    - tuple: (body, meta). body is the new page (bytes), or None if the page is
+      unchanged; meta holds the response's 'sha256', 'etag' and 'last_modified'.
+    """
+    meta_path, html_path = _meta_path(url, cache_dir)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = {}
+    if not os.path.exists(html_path):
+        meta = {}
+
+    headers = {}
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+
+    response = (session or requests).get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        return None, meta
+    response.raise_for_status()
+
+    body = response.content
+    digest = hashlib.sha256(body).hexdigest()
+    unchanged = digest == meta.get('sha256')
+    meta = {'url': url, 'sha256': digest,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')}
+    if unchanged:
+        # Same content as the page already processed; only the validators may be new.
+        save_fetch(url, None, meta, cache_dir)
+        return None, meta
+    return body, meta
+
+
+def save_fetch(url, body, meta, cache_dir=SCRAPE_CACHE_DIR):
+    """
+    Stores a processed page and its response metadata, so that the next
+    fetch_if_changed() can send a conditional request.
+
+    Parameters:
+    - url (str): The page URL.
+    - body (bytes): The page body, or None to keep the stored one.
+    - meta (dict): The metadata returned by fetch_if_changed().
+    - cache_dir (str): Directory for the cached HTML and response metadata.
+    """
+    meta_path, html_path = _meta_path(url, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    if body is not None:
+        with open(html_path + '.tmp', 'wb') as f:
+            f.write(body)
+        os.replace(html_path + '.tmp', html_path)
+    with open(meta_path + '.tmp', 'w') as f:
+        json.dump(meta, f)
+    os.replace(meta_path + '.tmp', meta_path)
+
+
+def incremental_scrape(url, output_path='tallest_buildings.csv', cache_dir=SCRAPE_CACHE_DIR,
+                       session=None, key_columns=KEY_COLUMNS, validation_index=None):
+    """
+    Re-scrapes the table and merges the added, changed and removed rows into the
+    stored dataset.
+
+    An unchanged page costs one request and no parsing. Otherwise the table is
+    extracted and diffed against `output_path` by row hashes; if some row changed, the
+    merged table is written back (the whole CSV is rewritten). The page and its
+    validators are stored only after that succeeded, so a failed extraction or write is
+    retried on the next run.
+
+    Parameters:
+    - url (str): The page to scrape.
+    - output_path (str): The stored dataset (CSV).
+    - cache_dir (str): Directory for the cached HTML and response metadata.
+    - session (requests.Session): Optional session to reuse connections.
+    - key_columns (list): Columns identifying a building.
+    - validation_index (ValidationIndex): If given, the added and changed rows are
+      validated and the index is updated (see data_validation.ValidationIndex).
+
+    Returns:
+    - ChangeSet: The changes for downstream stages, or None if the table could not be extracted.
+    """
+    body, meta = fetch_if_changed(url, cache_dir=cache_dir, session=session)
+    if body is None:
+        print("Page unchanged; nothing to update.")
+        return ChangeSet.empty()
+
+    scraped = extract_table(body)
+    if scraped is None:
+        return None
+    if os.path.exists(output_path):
+        stored = pd.read_csv(output_path)
+    else:
+        stored = scraped.iloc[:0]
+
+    changes = diff_rows(stored, scraped, key_columns)
+    if not changes.is_empty:
+        apply_changes(stored, changes, key_columns).to_csv(output_path + '.tmp', index=False)
+        os.replace(output_path + '.tmp', output_path)
+    save_fetch(url, body, meta, cache_dir)
+    print(f"Incremental scrape: {changes.summary()}.")
+    if validation_index is not None:
+        if len(validation_index) == 0 and len(stored):
+            validation_index.validate(clean_columns(stored))
+        validation_index.update(changes).print_summary()
+    return changes
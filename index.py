@@ -1,13 +1,20 @@
 import pandas as pd
 import numpy as np
+import argparse
+import functools
 import os
+import shutil
+import tempfile
 import time
-from data_cleaning import clean_data
-from data_validation import load_data, check_missing_values, check_range_values
+from data_cleaning import clean_data, as_dataframe
+from compact_schema import to_compact, memory_report
+from data_validation import ValidationIndex, load_data
 from data_analysis import analyze_data
 from geographical_analysis import plot_geographical_data
 from visualization import create_visualizations
-from predictive_model import run_predictive_model
+from predictive_model import plot_model_results, run_predictive_model
+from pipeline import PipelineContext, Stage, run_stages
+from instrumentation import Instrumentation
 import logging
 
 # Set up logging
@@ -17,7 +24,8 @@ logger = logging.getLogger()
 # Load and Clean Data
 def load_and_clean_data(file_path='tallest_buildings.csv'):
     """
-    Load and clean the dataset.
+    Load and clean the dataset, and convert it to the compact representation
+    (see compact_schema.py).
     """
     logger.info("Loading data...")
     df = load_data(file_path)
@@ -30,17 +38,26 @@ def load_and_clean_data(file_path='tallest_buildings.csv'):
     if cleaned_df is None:
         logger.error("Data cleaning failed.")
         return None
-    
-    return cleaned_df
+
+    # Categoricals and narrow numeric types for every stage that follows
+    compact_df = to_compact(cleaned_df)
+    memory = memory_report(df, compact_df)
+    logger.info(f"Compact dataset: {memory.loc['total', 'after_mb'] * 1024:.1f} KB "
+                f"(raw: {memory.loc['total', 'before_mb'] * 1024:.1f} KB)")
+    return compact_df
 
 # Check data validation issues
 def validate_data(df):
     """
-    Check for missing values and other range issues.
+    Check the data against the validation schema (types, ranges, missing values and
+    duplicates) and return the ValidationReport. Validation goes through the persistent
+    ValidationIndex, so rows that are unchanged since the last run are not checked again.
     """
     logger.info("Validating data...")
-    check_missing_values(df)
-    check_range_values(df)
+    df = as_dataframe(df)
+    report = ValidationIndex().validate(df)
+    report.print_summary()
+    return report
 
 # Perform data analysis
 def perform_data_analysis(df):
@@ -48,7 +65,7 @@ def perform_data_analysis(df):
     Perform various types of data analysis on the dataset.
     """
     logger.info("Performing data analysis...")
-    analyze_data(df)
+    return analyze_data(df)
 
 # Perform geographical analysis
 def perform_geographical_analysis(df):
@@ -66,40 +83,159 @@ def generate_visualizations(df):
     logger.info("Generating visualizations...")
     create_visualizations(df)
 
+# Run predictive modeling
+def perform_predictive_modeling(df):
+    """
+    Train and evaluate the predictive models. Their charts are drawn by a separate
+    stage (plot_predictive_results), so training does not wait for other plots.
+    """
+    logger.info("Running predictive model...")
+    return run_predictive_model(df, plot=False)
+
+# Plot the predictive model charts
+def plot_predictive_results(results):
+    """
+    Plot actual vs predicted heights and the feature importance of the trained models.
+    """
+    logger.info("Plotting predictive model results...")
+    plot_model_results(results)
+
+# Run a plotting stage in a worker process
+def plot_in_worker(name, func, figure_dir, *args):
+    """
+    Runs a stage that draws with pyplot in a worker process with the Agg backend, since
+    pyplot is not thread-safe and GUI backends only work on the main thread. With
+    `figure_dir`, the figures the stage would have shown are pickled there, under the
+    stage's name, for the main process to show (see chart_rendering.show_figures()).
+    """
+    import matplotlib.pyplot as plt
+    from chart_rendering import hold_figures
+    plt.switch_backend('Agg')
+    if figure_dir is None:
+        return func(*args)
+    with hold_figures(figure_dir, name):
+        return func(*args)
+
+# Pipeline stages, in the order they are listed
+STAGES = ['validate', 'analysis', 'geographic', 'visualization', 'predictive']
+
+def pipeline_stages(figure_dir=None):
+    """
+    The stage graph: every stage reads the cleaned data and is independent of the
+    others, except 'predictive_charts', which plots the models trained by 'predictive'
+    and runs whenever 'predictive' is selected.
+
+    Validation and model training run in threads and share the frame. Stages that draw
+    with pyplot run in worker processes (see plot_in_worker()), so they do not wait for
+    each other or for training.
+    """
+    def plotting(name, func, inputs=('data',), outputs=()):
+        return Stage(name, functools.partial(plot_in_worker, name, func, figure_dir), inputs=inputs,
+                     outputs=outputs, executor='process')
+
+    return [
+        Stage('validate', validate_data, inputs=['data'], outputs=['validation_report']),
+        plotting('analysis', perform_data_analysis, outputs=['analysis_results']),
+        plotting('geographic', perform_geographical_analysis),
+        plotting('visualization', generate_visualizations),
+        Stage('predictive', perform_predictive_modeling, inputs=['data'], outputs=['predictive_results']),
+        plotting('predictive_charts', plot_predictive_results, inputs=['predictive_results']),
+    ]
+
 # Main orchestration function
-def main(file_path='tallest_buildings.csv'):
+def main(file_path='tallest_buildings.csv', stages=None, max_workers=None, report_path=None,
+         profile=False, trace_memory=False, strict=False):
     """
     Main function that orchestrates the entire process.
+
+    `stages` selects which of STAGES to run (all by default). Plotting, geospatial and
+    machine learning libraries are imported by the stages that use them, so e.g. a
+    validation-only run never loads scikit-learn or geopandas.
+
+    Independent stages run concurrently (see pipeline.run_stages); `max_workers=1` runs
+    them one at a time. A failing stage is logged and does not stop the others. Plotting
+    stages draw in worker processes with the Agg backend; unless matplotlib is headless,
+    their figures are shown on the main thread when all stages are done.
+    Returns the StageResult of every stage that was run.
+
+    Loading and every stage are measured (wall and CPU time, memory, row counts and,
+    with `profile=True`, a cProfile summary); with `report_path` the measurements are
+    written there as JSON (see instrumentation.py).
+
+    With `strict=True` validation runs before the other stages, and they are not run
+    if the data fails any error-severity rule of the validation schema.
     """
     start_time = time.time()
+    stages = STAGES if stages is None else list(stages)
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        logger.error(f"Unknown stages {unknown}; choose from {STAGES}.")
+        return
 
-    # Step 1: Load and Clean Data
+    # Step 1: Load and Clean Data (once, shared by every stage)
     logger.info("Starting data loading and cleaning...")
-    df = load_and_clean_data(file_path)
-    if df is None:
+    instrumentation = Instrumentation(profile=profile, trace_memory=trace_memory)
+    context = PipelineContext(file_path, loader=load_and_clean_data)
+    with instrumentation.measure('load_and_clean') as record:
+        record['rows_out'] = None if context.data is None else len(context.data)
+    if context.data is None:
         logger.error("Exiting due to data loading/cleaning failure.")
         return
     
-    # Step 2: Validate Data
-    validate_data(df)
-
-    # Step 3: Perform Data Analysis
-    perform_data_analysis(df)
-
-    # Step 4: Perform Geographical Analysis
-    perform_geographical_analysis(df)
-
-    # Step 5: Generate Visualizations
-    generate_visualizations(df)
-
-    # Step 6: Run Predictive Modeling
-    logger.info("Running predictive model...")
-    run_predictive_model(file_path)
+    # Steps 2-6: Run the selected stages, independent ones concurrently. Figures drawn
+    # in worker processes are shown afterwards on this thread, unless running headless.
+    figure_dir = None
+    if any(stage != 'validate' for stage in stages):
+        from chart_rendering import is_headless
+        if not is_headless():
+            figure_dir = tempfile.mkdtemp(prefix='tall_buildings_figures_')
+    selected = [stage for stage in pipeline_stages(figure_dir)
+                if stage.name in stages or stage.name == 'predictive_charts' and 'predictive' in stages]
+    results = {}
+    if strict and 'validate' in stages:
+        gate = [stage for stage in selected if stage.name == 'validate']
+        selected = [stage for stage in selected if stage.name != 'validate']
+        results = run_stages(gate, {'data': context.data}, max_workers=max_workers, logger=logger,
+                             instrumentation=instrumentation)
+        report = results['validate'].value
+        if report is None or not report.passed:
+            logger.error("Data failed validation; skipping the remaining stages.")
+            selected = []
+    if selected:
+        results.update(run_stages(selected, {'data': context.data}, max_workers=max_workers, logger=logger,
+                                  instrumentation=instrumentation))
+    failed = [name for name, result in results.items() if result.status != 'succeeded']
+    if failed:
+        logger.error(f"Stages that did not complete: {failed}")
 
     # Timing
     end_time = time.time()
     logger.info(f"Total execution time: {end_time - start_time:.2f} seconds")
+    if report_path:
+        instrumentation.write_report(report_path, file_path=str(file_path), stages_run=stages,
+                                     total_seconds=round(end_time - start_time, 6))
+        logger.info(f"Stage metrics written to {report_path}")
+
+    # Show the figures once the run is measured, since showing waits for the windows
+    if figure_dir is not None:
+        from chart_rendering import show_figures
+        try:
+            show_figures(figure_dir, [stage.name for stage in selected])
+        finally:
+            shutil.rmtree(figure_dir, ignore_errors=True)
+    return results
 
 if __name__ == "__main__":
-    file_path = 'tallest_buildings.csv'  # Path to your dataset
-    main(file_path)
+    parser = argparse.ArgumentParser(description="Run the tallest buildings pipeline.")
+    parser.add_argument('file_path', nargs='?', default='tallest_buildings.csv', help="Path to your dataset")
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"Comma-separated stages to run (default: all of {','.join(STAGES)})")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Maximum number of stages running at once (1 runs them sequentially)")
+    parser.add_argument('--report', default=None, help="Write per-stage metrics to this JSON file")
+    parser.add_argument('--profile', action='store_true', help="Include a cProfile summary per stage in the report")
+    parser.add_argument('--trace-memory', action='store_true', help="Record tracemalloc peaks (slower; needs --workers 1)")
+    parser.add_argument('--strict', action='store_true', help="Stop before the other stages if validation fails")
+    args = parser.parse_args()
+    main(args.file_path, args.stages.split(','), max_workers=args.workers, report_path=args.report,
+         profile=args.profile, trace_memory=args.trace_memory, strict=args.strict)
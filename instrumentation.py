@@ -0,0 +1,244 @@
+import contextlib
+import cProfile
+import datetime
+import io
+import json
+import os
+import platform
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_local = threading.local()
+
+
+def _rss_mb():
+    """
+    Current resident set size in MB (Linux only), or None.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages * os.sysconf('SC_PAGE_SIZE') / 2**20, 1)
+
+
+def _peak_rss_mb():
+    """
+    High-water mark of the process's resident set size in MB, or None.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+    return round(peak / (2**20 if sys.platform == 'darwin' else 2**10), 1)
+
+
+def _row_count(value):
+    return len(value) if isinstance(value, (pd.DataFrame, pd.Series)) else None
+
+
+def _profile_summary(profiler, limit):
+    """
+    The `limit` functions with the highest cumulative time, as JSON-friendly dicts.
+    """
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    stats.sort_stats('cumulative')
+    rows = []
+    for func in stats.fcn_list[:limit]:
+        calls, primitive_calls, tottime, cumtime, _ = stats.stats[func]
+        filename, line, name = func
+        rows.append({'function': f"{os.path.basename(filename)}:{line}({name})", 'calls': calls,
+                     'tottime': round(tottime, 4), 'cumtime': round(cumtime, 4)})
+    return rows
+
+
+class Instrumentation:
+    """
+    Records wall time, CPU time, memory and row counts of pipeline stages.
+
+    Sections can be nested (e.g. the training steps inside the predictive stage);
+    nested records are named 'outer/inner'. Code that is not sure whether it runs under
+    instrumentation uses the module-level section(), which is a no-op otherwise.
+
+    CPU time is that of the measuring thread ('cpu_seconds') and of the whole process
+    ('process_cpu_seconds', which includes library worker threads but also any stages
+    running concurrently in other threads).
+
+    Memory is reported as the process's resident set size before and after the section
+    and, as 'process_peak_rss_mb', the high-water mark of the whole process at the end
+    of the section. That is a process-lifetime peak: it includes everything that ran
+    before in the same process, so it is not the peak of the section itself.
+    With trace_memory=True the tracemalloc peak of the outermost sections is recorded as
+    well. tracemalloc is process-wide, so only one outermost section may be traced at a
+    time; run_stages ignores trace_memory unless the stages run one at a time.
+    """
+
+    def __init__(self, profile=False, trace_memory=False, profile_dir=None, profile_limit=20):
+        """
+        Parameters:
+        - profile (bool): Capture a cProfile of every outermost section.
+        - trace_memory (bool): Record tracemalloc peaks (slows Python code down noticeably).
+        - profile_dir (str): If given, full profiles are written there as <section>.prof.
+        - profile_limit (int): Number of functions listed per profile in the report.
+        """
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.profile_dir = profile_dir
+        self.profile_limit = profile_limit
+        self.records = []
+        self._stack = []
+
+    @contextlib.contextmanager
+    def measure(self, name, rows_in=None):
+        """
+        Measures the enclosed block. Yields the record so that the caller can add
+        e.g. 'rows_out' or other fields.
+        """
+        full_name = '/'.join(self._stack + [name])
+        outermost = not self._stack
+        record = {'stage': full_name, 'status': 'succeeded', 'rows_in': rows_in, 'rows_out': None,
+                  'rss_start_mb': _rss_mb()}
+
+        profiler = None
+        if self.profile and outermost:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # another profiler is active in this process
+                profiler = None
+                record['profile'] = 'unavailable: another profiler is active'
+        tracing = self.trace_memory and outermost
+        started_tracing = False
+        if tracing:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+
+        previous = getattr(_local, 'instrumentation', None)
+        _local.instrumentation = self
+        self._stack.append(name)
+        wall_start, cpu_start, process_cpu_start = time.perf_counter(), time.thread_time(), time.process_time()
+        try:
+            yield record
+        except BaseException as e:
+            record['status'] = 'failed'
+            record['error'] = repr(e)
+            raise
+        finally:
+            record['wall_seconds'] = round(time.perf_counter() - wall_start, 6)
+            record['cpu_seconds'] = round(time.thread_time() - cpu_start, 6)
+            record['process_cpu_seconds'] = round(time.process_time() - process_cpu_start, 6)
+            self._stack.pop()
+            _local.instrumentation = previous
+            if tracing:
+                record['tracemalloc_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+                if started_tracing:
+                    tracemalloc.stop()
+            if profiler is not None:
+                profiler.disable()
+                record['profile'] = _profile_summary(profiler, self.profile_limit)
+                if self.profile_dir:
+                    os.makedirs(self.profile_dir, exist_ok=True)
+                    profiler.dump_stats(os.path.join(self.profile_dir, full_name.replace('/', '.') + '.prof'))
+            record['rss_end_mb'] = _rss_mb()
+            record['process_peak_rss_mb'] = _peak_rss_mb()
+            self.records.append(record)
+
+    def call(self, name, func, *args, **kwargs):
+        """
+        Calls func(*args, **kwargs) inside measure(name). Row counts are taken from the
+        first DataFrame argument and a DataFrame result.
+
+        Returns:
+        - The return value of `func`.
+        """
+        rows_in = next((_row_count(arg) for arg in args if _row_count(arg) is not None), None)
+        with self.measure(name, rows_in=rows_in) as record:
+            result = func(*args, **kwargs)
+            record['rows_out'] = _row_count(result)
+        return result
+
+    def report(self, **extra):
+        """
+        Returns the JSON-serializable report: environment information plus one record
+        per section, in the order the sections finished.
+        """
+        return {
+            'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'cpu_count': os.cpu_count(),
+            **extra,
+            'stages': self.records,
+        }
+
+    def write_report(self, path, **extra):
+        """
+        Writes report() to `path` as JSON.
+        """
+        with open(path, 'w') as f:
+            json.dump(self.report(**extra), f, indent=2, default=str)
+
+
+def current():
+    """
+    The Instrumentation measuring the running section in this thread, or None.
+    """
+    return getattr(_local, 'instrumentation', None)
+
+
+@contextlib.contextmanager
+def section(name, rows_in=None):
+    """
+    Measures the enclosed block as a nested section of the current Instrumentation.
+    Does nothing (yielding a throwaway record) when nothing is being measured.
+    """
+    instrumentation = current()
+    if instrumentation is None:
+        yield {}
+    else:
+        with instrumentation.measure(name, rows_in=rows_in) as record:
+            yield record
+
+
+def load_report(path):
+    """
+    Loads a report written by write_report() as a DataFrame with one row per section.
+    """
+    with open(path) as f:
+        return pd.DataFrame(json.load(f)['stages'])
+
+
+def compare_reports(baseline_path, current_path, columns=('wall_seconds', 'cpu_seconds', 'process_peak_rss_mb')):
+    """
+    Compares two reports, e.g. from two releases.
+
+    Returns:
+    - DataFrame: Per section, the baseline and current values and their ratio.
+    """
+    baseline = load_report(baseline_path).set_index('stage')
+    latest = load_report(current_path).set_index('stage')
+    columns = [col for col in columns if col in baseline.columns and col in latest.columns]
+    comparison = baseline[columns].join(latest[columns], how='outer', lsuffix='_baseline', rsuffix='_current')
+    for col in columns:
+        comparison[f'{col}_ratio'] = comparison[f'{col}_current'] / comparison[f'{col}_baseline']
+    return comparison
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python instrumentation.py BASELINE_REPORT CURRENT_REPORT")
+        sys.exit(1)
+    print(compare_reports(sys.argv[1], sys.argv[2]).round(3).to_string())
@@ -0,0 +1,52 @@
+import importlib
+import sys
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+
+    Heavy plotting, geospatial and machine learning libraries are only needed by some
+    stages, so modules bind them through lazy_import() and pay the import cost only when
+    a function actually uses them.
+    """
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            module = importlib.import_module(self.__dict__['_name'])
+            self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name):
+    """
+    Returns a module that is imported on first use, or the module itself if it is
+    already imported.
+
+    Parameters:
+    - name (str): The dotted module name, e.g. 'matplotlib.pyplot'.
+
+    Returns:
+    - module or LazyModule: The module, or a stand-in that imports it on first access.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
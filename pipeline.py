@@ -0,0 +1,214 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+import pandas as pd
+from data_cleaning import as_dataframe
+from instrumentation import Instrumentation
+
+
+class PipelineContext:
+    """
+    Holds the dataset for one pipeline run so that it is read and cleaned exactly once.
+    """
+
+    def __init__(self, source='tallest_buildings.csv', loader=as_dataframe):
+        """
+        Parameters:
+        - source (str or DataFrame): Path to the raw data file, or an already cleaned DataFrame.
+        - loader (callable): Turns `source` into a cleaned DataFrame (or None on failure).
+        """
+        self.source = source
+        self.loader = loader
+        self._data = source if isinstance(source, pd.DataFrame) else None
+        self._loaded = self._data is not None
+
+    @property
+    def data(self):
+        """
+        The cleaned dataset, loaded on first access. None if loading failed.
+        """
+        if not self._loaded:
+            self._data = self.loader(self.source)
+            self._loaded = True
+        return self._data
+
+
+class Stage:
+    """
+    A pipeline step: a function, the artifacts it reads and the artifacts it produces.
+
+    The function is called with the `inputs` artifacts as positional arguments. Its
+    return value becomes the single output, or is unpacked over several outputs.
+    Stages run in a thread by default and share the data of their inputs. Stages with
+    executor='process' run in a worker process, e.g. because they use pyplot, whose
+    global figure state is not thread-safe; their function and inputs must be
+    picklable, and the inputs are copied into the worker.
+    """
+
+    def __init__(self, name, func, inputs=(), outputs=(), executor='thread'):
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor '{executor}' for stage '{name}'.")
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.executor = executor
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, inputs={list(self.inputs)}, outputs={list(self.outputs)})"
+
+
+class StageResult:
+    """
+    Outcome of one stage: status is 'succeeded', 'failed' or 'skipped'. `metrics`
+    holds the instrumentation records of the stage and its nested sections.
+    """
+
+    def __init__(self, name, status, value=None, error=None, seconds=None, metrics=None):
+        self.name = name
+        self.status = status
+        self.value = value
+        self.error = error
+        self.seconds = seconds
+        self.metrics = metrics or []
+
+    def __repr__(self):
+        return f"StageResult({self.name!r}, {self.status!r})"
+
+
+class StageError(Exception):
+    """
+    Wraps a stage's exception together with the metrics recorded before it failed.
+    """
+
+    def __init__(self, error, metrics):
+        super().__init__(repr(error))
+        self.error = error
+        self.metrics = metrics
+
+
+def _call_stage(name, func, args, instrumentation_options):
+    # Runs in the worker thread or process, so every stage gets its own recorder.
+    instrumentation = Instrumentation(**instrumentation_options)
+    start = time.perf_counter()
+    try:
+        value = instrumentation.call(name, func, *args)
+    except Exception as e:
+        raise StageError(e, instrumentation.records) from e
+    return value, time.perf_counter() - start, instrumentation.records
+
+
+def _stage_input(value):
+    # Shallow copies keep columns a stage adds from leaking into other stages.
+    return value.copy(deep=False) if isinstance(value, pd.DataFrame) else value
+
+
+def run_stages(stages, artifacts, max_workers=None, logger=None, instrumentation=None):
+    """
+    Runs stages concurrently as soon as their inputs are available.
+
+    Independent stages run in parallel in a thread pool (or a process pool for
+    executor='process' stages), so the total time approaches that of the slowest
+    chain of dependent stages. A failing stage does not stop the others; the stages
+    that depend on its outputs are skipped.
+
+    Parameters:
+    - stages (list): Stage objects. Names and outputs must be unique.
+    - artifacts (dict): Initially available artifacts, e.g. {'data': df}.
+    - max_workers (int): Maximum number of stages running at once (default: number of stages).
+    - logger (Logger): Optional logger for stage progress.
+    - instrumentation (Instrumentation): Optional recorder; the metrics of every stage,
+      measured in its worker, are appended to its records. Its trace_memory setting is
+      ignored when stages can run concurrently (max_workers > 1): tracemalloc is
+      process-wide, so concurrent stages would reset and stop each other's tracing.
+
+    Returns:
+    - dict: Stage name -> StageResult, in the order the stages were given.
+    """
+    artifacts = dict(artifacts)
+    providers = {}
+    for stage in stages:
+        for output in stage.outputs:
+            if output in providers or output in artifacts:
+                raise ValueError(f"Artifact '{output}' is produced more than once.")
+            providers[output] = stage.name
+    for stage in stages:
+        missing = [name for name in stage.inputs if name not in artifacts and name not in providers]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' needs unknown artifacts {missing}.")
+
+    log = logger.info if logger else (lambda message: None)
+    max_workers = max_workers or max(len(stages), 1)
+    options = {}
+    if instrumentation is not None:
+        trace_memory = instrumentation.trace_memory
+        if trace_memory and max_workers > 1 and len(stages) > 1:
+            if logger:
+                logger.warning("Ignoring trace_memory: tracemalloc peaks need stages run one at a time "
+                               "(max_workers=1).")
+            trace_memory = False
+        options = {'profile': instrumentation.profile, 'trace_memory': trace_memory,
+                   'profile_dir': instrumentation.profile_dir, 'profile_limit': instrumentation.profile_limit}
+    results = {}
+    pending = list(stages)
+    running = {}
+    thread_pool = ThreadPoolExecutor(max_workers=max_workers)
+    process_pool = None
+    try:
+        while pending or running:
+            # Skip stages whose inputs can no longer be produced.
+            for stage in list(pending):
+                blocked = [providers[name] for name in stage.inputs
+                           if name not in artifacts and results.get(providers[name]) is not None]
+                if blocked:
+                    pending.remove(stage)
+                    results[stage.name] = StageResult(stage.name, 'skipped',
+                                                      error=f"upstream stage(s) {blocked} did not succeed")
+                    log(f"Skipping stage '{stage.name}': upstream stage(s) {blocked} did not succeed.")
+
+            for stage in list(pending):
+                if len(running) >= max_workers:
+                    break
+                if all(name in artifacts for name in stage.inputs):
+                    pending.remove(stage)
+                    if stage.executor == 'process':
+                        if process_pool is None:
+                            process_pool = ProcessPoolExecutor(max_workers=max_workers)
+                        pool = process_pool
+                    else:
+                        pool = thread_pool
+                    args = [_stage_input(artifacts[name]) for name in stage.inputs]
+                    log(f"Starting stage '{stage.name}'...")
+                    running[pool.submit(_call_stage, stage.name, stage.func, args, options)] = stage
+
+            if not running:
+                if pending:
+                    raise ValueError(f"Stages {[stage.name for stage in pending]} form a dependency cycle.")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    value, seconds, metrics = future.result()
+                except Exception as e:
+                    error, metrics = (e.error, e.metrics) if isinstance(e, StageError) else (e, [])
+                    results[stage.name] = StageResult(stage.name, 'failed', error=error, metrics=metrics)
+                    if instrumentation is not None:
+                        instrumentation.records.extend(metrics)
+                    if logger:
+                        logger.error(f"Stage '{stage.name}' failed: {error!r}")
+                    continue
+                if instrumentation is not None:
+                    instrumentation.records.extend(metrics)
+                if len(stage.outputs) == 1:
+                    artifacts[stage.outputs[0]] = value
+                elif stage.outputs:
+                    artifacts.update(zip(stage.outputs, value))
+                results[stage.name] = StageResult(stage.name, 'succeeded', value=value, seconds=seconds,
+                                                  metrics=metrics)
+                log(f"Stage '{stage.name}' finished in {seconds:.2f} seconds.")
+    finally:
+        thread_pool.shutdown()
+        if process_pool is not None:
+            process_pool.shutdown()
+    return {stage.name: results[stage.name] for stage in stages}
@@ -0,0 +1,173 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from category_encoding import UNKNOWN_CODE
+from data_cleaning import clean_text_column, clean_integer_column
+from predictive_model import MODEL_PATH, load_model_artifact
+
+# Raw input columns, with the spellings accepted for each.
+INPUT_COLUMNS = {
+    'City': ['City'],
+    'Country': ['Country'],
+    'Year Completed': ['Year Completed', 'Year'],
+    'Floors': ['Floors'],
+}
+
+
+class HeightPredictor:
+    """
+    Scores candidate buildings with a saved model artifact.
+
+    The artifact is loaded once; every call encodes, scales and predicts a whole batch
+    with vectorized operations. Category lookups are hash lookups in the artifact's
+    category dictionaries, and unseen cities or countries are scored with the unknown
+    code instead of failing.
+    """
+
+    def __init__(self, artifact):
+        """
+        Parameters:
+        - artifact (dict): A model artifact, see predictive_model.save_model_artifact().
+        """
+        self.artifact = artifact
+        self.models = artifact['models']
+        self.reference_year = artifact['reference_year']
+        self.encoders = artifact['encoders']
+        self._mean = artifact['scaler'].mean_
+        self._scale = artifact['scaler'].scale_
+
+    @classmethod
+    def from_file(cls, path=MODEL_PATH):
+        """
+        Loads the artifact at `path`. Returns None if it cannot be loaded.
+        """
+        artifact = load_model_artifact(path)
+        return None if artifact is None else cls(artifact)
+
+    def features(self, rows):
+        """
+        Turns raw rows into the scaled feature matrix.
+
+        Parameters:
+        - rows (DataFrame, dict or list of dicts): 'City', 'Country', 'Year Completed'
+          (or 'Year') and 'Floors', raw (e.g. 'Dubai†', '163') or clean.
+
+        Returns:
+        - ndarray: float64 array of shape (len(rows), 4) in the order of FEATURE_COLUMNS.
+        """
+        rows = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(rows)
+        columns = {}
+        for name, spellings in INPUT_COLUMNS.items():
+            found = next((col for col in spellings if col in rows.columns), None)
+            if found is None:
+                raise KeyError(f"Missing input column '{name}'.")
+            columns[name] = rows[found]
+
+        X = np.empty((len(rows), 4), dtype=np.float64)
+        X[:, 0] = self._encode(columns['City'], 'City')
+        X[:, 1] = self._encode(columns['Country'], 'Country')
+        X[:, 2] = self.reference_year - _as_number(columns['Year Completed'])
+        X[:, 3] = _as_number(columns['Floors'])
+        return (X - self._mean) / self._scale
+
+    def _encode(self, values, column):
+        """
+        Looks values up as they are and cleans (footnotes, whitespace) only the misses.
+        """
+        codes = self.encoders[column].encode(values)
+        missing = codes == UNKNOWN_CODE
+        if missing.any():
+            codes[missing] = self.encoders[column].encode(clean_text_column(values[missing]))
+        return codes
+
+    def predict(self, rows, model='random_forest'):
+        """
+        Predicts building heights in metres.
+
+        Parameters:
+        - rows: See features().
+        - model (str): 'random_forest' or 'linear'.
+
+        Returns:
+        - ndarray: One predicted height per row.
+        """
+        X = self.features(rows)
+        estimator = self.models[model]
+        if hasattr(estimator, 'estimators_'):
+            # Averaging the trees directly skips the per-call thread pool set-up of
+            # RandomForestRegressor.predict, which dominates the latency of small batches.
+            X = np.ascontiguousarray(X, dtype=np.float32)
+            total = np.zeros(len(X))
+            for tree in estimator.estimators_:
+                total += tree.predict(X, check_input=False)
+            return total / len(estimator.estimators_)
+        return estimator.predict(X)
+
+
+def _as_number(values):
+    """
+    Converts a column to float64, parsing raw strings such as '1,234' only if needed.
+    """
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=np.float64)
+    numbers = pd.to_numeric(values, errors='coerce')
+    if numbers.isna().any():
+        numbers = clean_integer_column(values)
+    return numbers.to_numpy(dtype=np.float64)
+
+
+def benchmark_predictor(predictor, rows, batch_sizes=(1, 10, 100, 1000, 10000), repeat=200,
+                        model='random_forest'):
+    """
+    Measures prediction latency and throughput per batch size.
+
+    Parameters:
+    - predictor (HeightPredictor): The loaded predictor.
+    - rows (DataFrame): Pool of raw rows; batches are drawn from it.
+    - batch_sizes (tuple): Batch sizes to measure.
+    - repeat (int): Timed calls per batch size (fewer for large batches).
+    - model (str): The model to score with.
+
+    Returns:
+    - DataFrame: p50 and p99 latency in milliseconds and rows per second per batch size.
+    """
+    rng = np.random.default_rng(0)
+    results = []
+    for batch_size in batch_sizes:
+        calls = max(5, min(repeat, 200_000 // batch_size))
+        batches = [rows.iloc[rng.integers(0, len(rows), batch_size)] for _ in range(calls)]
+        predictor.predict(batches[0], model)  # warm-up
+        latencies = np.empty(calls)
+        for i, batch in enumerate(batches):
+            start = time.perf_counter()
+            predictor.predict(batch, model)
+            latencies[i] = time.perf_counter() - start
+        results.append({
+            'batch_size': batch_size,
+            'calls': calls,
+            'p50_ms': np.percentile(latencies, 50) * 1000,
+            'p99_ms': np.percentile(latencies, 99) * 1000,
+            'rows_per_second': batch_size * calls / latencies.sum(),
+        })
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score buildings with the saved height model.")
+    parser.add_argument('--model-path', default=MODEL_PATH)
+    parser.add_argument('--train', action='store_true', help="Train and save the artifact first")
+    parser.add_argument('--data', default='tallest_buildings.csv', help="Dataset used for --train")
+    parser.add_argument('--model', default='random_forest', choices=['random_forest', 'linear'])
+    args = parser.parse_args()
+
+    if args.train:
+        from predictive_model import run_predictive_model
+        run_predictive_model(args.data, save_path=args.model_path)
+
+    predictor = HeightPredictor.from_file(args.model_path)
+    if predictor is not None:
+        from synthetic_data import generate_buildings
+        candidates = generate_buildings(50_000, seed=1)
+        results = benchmark_predictor(predictor, candidates, model=args.model)
+        print(results.round(3).to_string(index=False))
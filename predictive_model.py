@@ -1,20 +1,50 @@
+import datetime
+import os
+import time
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
-import matplotlib.pyplot as plt
-import seaborn as sns
+from chart_rendering import finish_figure
 from data_cleaning import clean_data
-from data_validation import load_data, check_missing_values, check_range_values
+from data_validation import load_data, validate
+from instrumentation import section
+from category_encoding import CATEGORY_PATH, fit_dictionaries
+from lazy_imports import lazy_import
+
+# scikit-learn and the plotting libraries are imported on first use
+model_selection = lazy_import('sklearn.model_selection')
+preprocessing = lazy_import('sklearn.preprocessing')
+linear_model = lazy_import('sklearn.linear_model')
+ensemble = lazy_import('sklearn.ensemble')
+metrics = lazy_import('sklearn.metrics')
+joblib = lazy_import('joblib')
+plt = lazy_import('matplotlib.pyplot')
+sns = lazy_import('seaborn')
+
+FEATURE_COLUMNS = ['City_encoded', 'Country_encoded', 'Building_age', 'Floors']
+TARGET_COLUMN = 'Height'
+
+# Search spaces for tune_models(). For the linear model, alpha=0 is plain least squares.
+RF_PARAM_GRID = {
+    'max_depth': [None, 8, 16],
+    'min_samples_leaf': [1, 2, 5],
+    'max_features': [1.0, 0.5],
+    'max_samples': [None, 0.5],
+}
+LINEAR_PARAM_GRID = {'alpha': [0.0, 0.1, 1.0, 10.0, 100.0]}
+
+# Saved models: bump ARTIFACT_VERSION whenever the artifact layout or the features change.
+ARTIFACT_VERSION = 2
+MODEL_PATH = os.path.join('models', 'height_model.joblib')
 
 # Load and clean the data
 def load_and_clean_data(file_path='tallest_buildings.csv'):
     """
     Load and clean the dataset. This function calls the clean_data module for processing.
+    An already cleaned DataFrame is returned as is.
     """
+    if isinstance(file_path, pd.DataFrame):
+        return file_path
+
     # Load data
     data = load_data(file_path)
     if data is None:
@@ -24,85 +54,276 @@ def load_and_clean_data(file_path='tallest_buildings.csv'):
     cleaned_data = clean_data(data)
     return cleaned_data
 
+# Fit one dictionary encoder per categorical column
+def fit_encoders(df, columns=('City', 'Country'), path=None):
+    """
+    Fit a separate CategoryDictionary for each categorical column. With `path`, the
+    persisted dictionaries are extended instead, so codes are stable across runs.
+    """
+    return fit_dictionaries(df, columns, path=path)
+
+# Encode a categorical column with a fitted encoder
+def encode_column(values, encoder):
+    """
+    Look up the codes of `values` in a CategoryDictionary. Values it has not seen get
+    UNKNOWN_CODE instead of raising, so new rows can be scored.
+    """
+    return encoder.encode(values)
+
 # Feature engineering
-def feature_engineering(df):
+def feature_engineering(df, encoders=None, reference_year=2025):
     """
     Create new features or process existing features for model training.
+
+    `encoders` maps 'City' and 'Country' to fitted encoders (see fit_encoders()); by
+    default they are fitted on `df`.
     """
-    # Encoding categorical data: 'City', 'Country', 'Building'
-    label_encoder = LabelEncoder()
-    df['City_encoded'] = label_encoder.fit_transform(df['City'])
-    df['Country_encoded'] = label_encoder.fit_transform(df['Country'])
+    # Encoding categorical data: 'City', 'Country'
+    if encoders is None:
+        encoders = fit_encoders(df)
+    df['City_encoded'] = encode_column(df['City'], encoders['City'])
+    df['Country_encoded'] = encode_column(df['Country'], encoders['Country'])
     
     # Converting 'Year Completed' to a more useful feature by calculating building age
-    df['Building_age'] = 2025 - df['Year Completed']  # Assuming current year is 2025
+    df['Building_age'] = reference_year - df['Year Completed']  # Assuming current year is 2025
 
     return df
 
-# Prepare data for training and testing
-def prepare_data(df):
+# Split data into unscaled train and test sets
+def split_data(df):
     """
-    Prepare the dataset by splitting into features (X) and target (y) and then into train-test sets.
+    Split the engineered dataset into features (X) and target (y) and then into train-test sets.
     """
     # Select features (X) and target (y)
-    X = df[['City_encoded', 'Country_encoded', 'Building_age', 'Floors']]
-    y = df['Height']
+    X = df[FEATURE_COLUMNS]
+    y = df[TARGET_COLUMN]
 
     # Split into train and test sets (80% train, 20% test)
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    return model_selection.train_test_split(X, y, test_size=0.2, random_state=42)
+
+# Prepare data for training and testing
+def prepare_data(df, return_scaler=False):
+    """
+    Prepare the dataset by splitting into features (X) and target (y) and then into train-test sets.
+    With `return_scaler=True` the fitted StandardScaler is returned as a fifth value.
+    """
+    X_train, X_test, y_train, y_test = split_data(df)
 
     # Feature Scaling (Standardization)
-    scaler = StandardScaler()
+    scaler = preprocessing.StandardScaler()
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
 
+    if return_scaler:
+        return X_train_scaled, X_test_scaled, y_train, y_test, scaler
     return X_train_scaled, X_test_scaled, y_train, y_test
 
 # Train a Linear Regression Model
-def train_linear_regression(X_train, y_train):
+def train_linear_regression(X_train, y_train, alpha=0.0):
     """
-    Train a Linear Regression model.
+    Train a Linear Regression model, or a ridge regression if `alpha` > 0.
     """
-    model = LinearRegression()
+    model = linear_model.Ridge(alpha=alpha) if alpha else linear_model.LinearRegression()
     model.fit(X_train, y_train)
     return model
 
 # Train a Random Forest Regressor Model
-def train_random_forest(X_train, y_train):
+def train_random_forest(X_train, y_train, n_estimators=100, n_jobs=None, **params):
     """
-    Train a Random Forest Regressor model.
+    Train a Random Forest Regressor model. Further keyword arguments (e.g. the best
+    parameters from tune_models()) are passed to RandomForestRegressor.
     """
-    model = RandomForestRegressor(n_estimators=100, random_state=42)
+    model = ensemble.RandomForestRegressor(n_estimators=n_estimators, random_state=42, n_jobs=n_jobs, **params)
     model.fit(X_train, y_train)
     return model
 
+# Scale cross-validation folds once for all candidates
+def scaled_folds(X, y, n_splits=5, random_state=42):
+    """
+    Splits the training data into K folds and standardizes each fold once.
+
+    Every candidate of a search is evaluated on the same matrices, so StandardScaler runs
+    K times in total instead of K times per candidate. The matrices are float32 arrays;
+    joblib memory-maps large arrays into its worker processes instead of copying them
+    for every task.
+
+    Parameters:
+    - X (DataFrame or ndarray): Unscaled training features.
+    - y (Series or ndarray): Training target.
+    - n_splits (int): Number of folds.
+    - random_state (int): Seed of the fold assignment.
+
+    Returns:
+    - list: One (X_train, X_val, y_train, y_val) tuple per fold.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    folds = []
+    splitter = model_selection.KFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    for train_index, val_index in splitter.split(X):
+        scaler = preprocessing.StandardScaler().fit(X[train_index])
+        folds.append((
+            np.ascontiguousarray(scaler.transform(X[train_index]), dtype=np.float32),
+            np.ascontiguousarray(scaler.transform(X[val_index]), dtype=np.float32),
+            y[train_index], y[val_index],
+        ))
+    return folds
+
+def _fit_linear_candidate(fold, params):
+    """
+    Fits one linear candidate on one fold and scores it on the validation part.
+    """
+    X_train, X_val, y_train, y_val = fold
+    model = train_linear_regression(X_train, y_train, **params)
+    y_pred = model.predict(X_val)
+    return {'rmse': float(np.sqrt(metrics.mean_squared_error(y_val, y_pred))),
+            'mae': float(metrics.mean_absolute_error(y_val, y_pred))}
+
+def _fit_forest_candidate(fold, params, max_estimators, step, patience, tol, random_state):
+    """
+    Grows a warm-started forest on one fold `step` trees at a time and stops once the
+    validation RMSE has not improved by more than `tol` (relative) for `patience` steps.
+
+    Only the newly added trees are evaluated after each step: their predictions are
+    added to a running sum, so checking the validation error stays cheap.
+    """
+    X_train, X_val, y_train, y_val = fold
+    model = ensemble.RandomForestRegressor(n_estimators=0, warm_start=True, n_jobs=1,
+                                           random_state=random_state, **params)
+    prediction_sum = np.zeros(len(y_val))
+    best = {'rmse': np.inf}
+    grown = stale = 0
+    while grown < max_estimators:
+        model.set_params(n_estimators=min(grown + step, max_estimators))
+        model.fit(X_train, y_train)
+        for tree in model.estimators_[grown:]:
+            prediction_sum += tree.predict(X_val)
+        grown = len(model.estimators_)
+        y_pred = prediction_sum / grown
+        rmse = float(np.sqrt(metrics.mean_squared_error(y_val, y_pred)))
+        if rmse < best['rmse'] * (1 - tol):
+            best = {'rmse': rmse, 'mae': float(metrics.mean_absolute_error(y_val, y_pred)),
+                    'n_estimators': grown}
+            stale = 0
+        else:
+            stale += 1
+            if stale >= patience:
+                break
+    return best
+
+def _evaluate_candidate(model_name, params, fold_index, fold, forest_options):
+    start = time.perf_counter()
+    if model_name == 'random_forest':
+        scores = _fit_forest_candidate(fold, params, **forest_options)
+    else:
+        scores = _fit_linear_candidate(fold, params)
+    return {'model': model_name, 'params': params, 'fold': fold_index,
+            'seconds': time.perf_counter() - start, **scores}
+
+# Search hyperparameters of both models in parallel
+def tune_models(X_train, y_train, search='random', n_iter=20, n_splits=5, n_jobs=-1,
+                rf_param_grid=RF_PARAM_GRID, linear_param_grid=LINEAR_PARAM_GRID,
+                max_estimators=300, step=25, patience=2, tol=0.002, random_state=42):
+    """
+    Searches random forest and linear-model settings with cross-validation on all cores.
+
+    The folds are scaled once (see scaled_folds()) and every (candidate, fold) pair is a
+    separate joblib task. Forests are grown with warm starts and stopped early once more
+    trees no longer help, which also selects their number of trees.
+
+    Parameters:
+    - X_train (DataFrame or ndarray): Unscaled training features.
+    - y_train (Series or ndarray): Training target.
+    - search (str): 'grid' for every combination, 'random' for `n_iter` sampled forest settings.
+    - n_iter (int): Number of forest candidates in a random search.
+    - n_splits (int): Number of cross-validation folds.
+    - n_jobs (int): Number of worker processes (-1: all cores).
+    - rf_param_grid (dict): Random forest search space.
+    - linear_param_grid (dict): Linear model search space (always searched exhaustively).
+    - max_estimators (int): Upper limit on the number of trees.
+    - step (int): Trees added between early-stopping checks.
+    - patience (int): Checks without improvement before a forest stops growing.
+    - tol (float): Minimum relative RMSE improvement that counts.
+    - random_state (int): Seed for folds, sampling and forests.
+
+    Returns:
+    - tuple: (results, best) where `results` is a DataFrame with the mean cross-validation
+      scores per candidate, best first, and `best` maps 'random_forest' and 'linear' to
+      the keyword arguments for train_random_forest() and train_linear_regression().
+    """
+    if search == 'grid':
+        forest_candidates = list(model_selection.ParameterGrid(rf_param_grid))
+    elif search == 'random':
+        forest_candidates = list(model_selection.ParameterSampler(rf_param_grid, n_iter=n_iter,
+                                                                  random_state=random_state))
+    else:
+        raise ValueError(f"Unknown search '{search}'; use 'grid' or 'random'.")
+    candidates = ([('random_forest', params) for params in forest_candidates] +
+                  [('linear', params) for params in model_selection.ParameterGrid(linear_param_grid)])
+
+    folds = scaled_folds(X_train, y_train, n_splits=n_splits, random_state=random_state)
+    forest_options = {'max_estimators': max_estimators, 'step': step, 'patience': patience,
+                      'tol': tol, 'random_state': random_state}
+    print(f"Evaluating {len(candidates)} candidates on {n_splits} folds...")
+    scores = joblib.Parallel(n_jobs=n_jobs)(
+        joblib.delayed(_evaluate_candidate)(model_name, params, fold_index, fold, forest_options)
+        for model_name, params in candidates
+        for fold_index, fold in enumerate(folds))
+
+    scores = pd.DataFrame(scores)
+    scores['candidate'] = scores['params'].map(lambda params: repr(sorted(params.items())))
+    aggregations = {'params': 'first', 'rmse': 'mean', 'mae': 'mean', 'seconds': 'sum'}
+    if 'n_estimators' in scores.columns:
+        aggregations['n_estimators'] = 'median'
+    results = (scores.groupby(['model', 'candidate'], sort=False).agg(aggregations)
+               .reset_index().drop(columns='candidate').sort_values('rmse', ignore_index=True))
+
+    best = {}
+    for model_name, group in results.groupby('model', sort=False):
+        top = group.iloc[0]
+        best[model_name] = dict(top['params'])
+        if model_name == 'random_forest':
+            best[model_name]['n_estimators'] = int(top['n_estimators'])
+    return results, best
+
 # Evaluate the model performance
-def evaluate_model(model, X_test, y_test):
+def evaluate_model(model, X_test, y_test, output_file=None, plot=True):
     """
     Evaluate the performance of the model using MAE, MSE, RMSE, and R².
+    Returns the metrics as a dict. With `plot`, actual and predicted heights are plotted
+    as well (see plot_predictions()).
     """
     y_pred = model.predict(X_test)
     
-    mae = mean_absolute_error(y_test, y_pred)
-    mse = mean_squared_error(y_test, y_pred)
+    mae = metrics.mean_absolute_error(y_test, y_pred)
+    mse = metrics.mean_squared_error(y_test, y_pred)
     rmse = np.sqrt(mse)
-    r2 = r2_score(y_test, y_pred)
+    r2 = metrics.r2_score(y_test, y_pred)
 
     print(f"Mean Absolute Error (MAE): {mae}")
     print(f"Mean Squared Error (MSE): {mse}")
     print(f"Root Mean Squared Error (RMSE): {rmse}")
     print(f"R² Score: {r2}")
 
-    # Plotting actual vs predicted values
+    if plot:
+        plot_predictions(y_test, y_pred, output_file)
+
+    return {'mae': float(mae), 'mse': float(mse), 'rmse': float(rmse), 'r2': float(r2)}
+
+# Plotting actual vs predicted values
+def plot_predictions(y_test, y_pred, output_file=None):
+    """
+    Scatter plot of actual against predicted building heights.
+    """
     plt.figure(figsize=(10, 6))
     sns.scatterplot(x=y_test, y=y_pred)
     plt.title("Actual vs Predicted Building Heights")
     plt.xlabel("Actual Height")
     plt.ylabel("Predicted Height")
-    plt.show()
+    finish_figure(output_file)
 
 # Visualizing feature importance for Random Forest Model
-def plot_feature_importance(model, X):
+def plot_feature_importance(model, X, output_file=None):
     """
     Plot feature importance using Random Forest.
     """
@@ -115,44 +336,185 @@ def plot_feature_importance(model, X):
     plt.xlabel("Features")
     plt.ylabel("Importance")
     plt.xticks(rotation=45)
-    plt.show()
+    finish_figure(output_file)
+
+# Plot the charts of a run_predictive_model(plot=False) result
+def plot_model_results(results):
+    """
+    Draws the charts run_predictive_model() skips with plot=False: actual vs predicted
+    heights of both models and the Random Forest feature importance, so training and
+    plotting can run in separate pipeline stages.
+
+    Parameters:
+    - results (dict): The return value of run_predictive_model().
+    """
+    if results is None:
+        return
+    for name in ('linear', 'random_forest'):
+        plot_predictions(results['y_test'], results['models'][name].predict(results['X_test']))
+    plot_feature_importance(results['models']['random_forest'], pd.DataFrame(columns=results['feature_names']))
+
+# Save the fitted preprocessing and models as one artifact
+def save_model_artifact(path, encoders, scaler, models, evaluation=None, reference_year=2025, training_rows=None):
+    """
+    Saves everything needed to score new buildings as one versioned joblib file.
+
+    Parameters:
+    - path (str): Where to write the artifact.
+    - encoders (dict): Column -> CategoryDictionary (see fit_encoders()).
+    - scaler (StandardScaler): The scaler fitted on the training features.
+    - models (dict): Model name -> fitted regressor.
+    - evaluation (dict): Optional model name -> test metrics.
+    - reference_year (int): Year used to compute building ages.
+    - training_rows (int): Number of rows the models were trained on.
+
+    Returns:
+    - dict: The saved artifact.
+    """
+    import sklearn
+    artifact = {
+        'version': ARTIFACT_VERSION,
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'sklearn_version': sklearn.__version__,
+        'feature_columns': list(FEATURE_COLUMNS),
+        'reference_year': reference_year,
+        'training_rows': training_rows,
+        'encoders': encoders,
+        'scaler': scaler,
+        'models': models,
+        'evaluation': evaluation or {},
+    }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    joblib.dump(artifact, path + '.tmp')
+    os.replace(path + '.tmp', path)
+    print(f"Model artifact saved to {path}.")
+    return artifact
+
+# Load a saved artifact
+def load_model_artifact(path=MODEL_PATH):
+    """
+    Loads an artifact written by save_model_artifact().
+
+    Returns:
+    - dict: The artifact, or None if the file is missing or was written by an
+      incompatible version.
+    """
+    try:
+        artifact = joblib.load(path)
+    except FileNotFoundError:
+        print(f"Error: Model artifact not found at {path}")
+        return None
+    if artifact.get('version') != ARTIFACT_VERSION:
+        print(f"Error: Model artifact {path} has version {artifact.get('version')}, expected {ARTIFACT_VERSION}. "
+              "Retrain with run_predictive_model(save_path=...).")
+        return None
+    return artifact
 
 # Main function to orchestrate the predictive modeling
-def run_predictive_model(file_path='tallest_buildings_cleaned.csv'):
+def run_predictive_model(data='tallest_buildings_cleaned.csv', tune=False, search='random', n_jobs=-1,
+                         save_path=None, category_path=None, plot=True):
     """
     Run the entire predictive modeling process: data loading, cleaning, feature engineering,
     model training, evaluation, and visualization.
+
+    `data` is either a path to the dataset or an already cleaned DataFrame, which is not
+    modified (engineered features are added to a shallow copy).
+
+    When run under instrumentation (e.g. as a stage of index.main), every step is
+    recorded as a nested section.
+
+    With `tune=True` both models are first tuned on the training set with
+    tune_models(search=search, n_jobs=n_jobs); the test set is only used for the final
+    evaluation.
+
+    With `save_path`, the fitted encoders, scaler and both models are saved there as one
+    artifact (see save_model_artifact() and prediction_service.py).
+
+    Returns a dict with the fitted 'models', their 'metrics', the scaled test set
+    ('X_test', 'y_test') and the 'feature_names', or None if the data cannot be loaded.
+    With `plot=False` no charts are drawn; pass the result to plot_model_results() to
+    draw them later, e.g. in another process.
+
+    City and Country codes come from the category dictionaries persisted at
+    `category_path`. By default they are only persisted (at CATEGORY_PATH) when the
+    model is saved as well; other runs fit fresh dictionaries without saving them.
     """
+    if category_path is None and save_path:
+        category_path = CATEGORY_PATH
+
     # Load and clean the data
-    df = load_and_clean_data(file_path)
+    with section('load', rows_in=len(data) if isinstance(data, pd.DataFrame) else None) as record:
+        df = load_and_clean_data(data)
+        record['rows_out'] = None if df is None else len(df)
     if df is None:
         print("Data could not be loaded. Exiting.")
         return
 
     # Check for missing values or range issues after cleaning
-    check_missing_values(df)
-    check_range_values(df)
+    with section('validate', rows_in=len(df)):
+        validate(df).print_summary()
 
     # Feature engineering
-    df = feature_engineering(df)
+    with section('feature_engineering', rows_in=len(df)):
+        encoders = fit_encoders(df, path=category_path)
+        df = feature_engineering(df.copy(deep=False), encoders)
 
     # Prepare data for training
-    X_train, X_test, y_train, y_test = prepare_data(df)
+    with section('prepare_data', rows_in=len(df)) as record:
+        X_train, X_test, y_train, y_test, scaler = prepare_data(df, return_scaler=True)
+        record['rows_out'] = len(X_train) + len(X_test)
+
+    # Optionally tune both models on the training set
+    best = {'linear': {}, 'random_forest': {}}
+    if tune:
+        with section('tune_models', rows_in=len(X_train)):
+            unscaled_X_train = split_data(df)[0]
+            tuning_results, best = tune_models(unscaled_X_train, y_train, search=search, n_jobs=n_jobs)
+        print("\nBest cross-validated candidates:")
+        print(tuning_results.groupby('model').head(3).to_string(index=False))
 
     # Train models
     print("\nTraining Linear Regression Model...")
-    lr_model = train_linear_regression(X_train, y_train)
+    with section('train_linear_regression', rows_in=len(X_train)):
+        lr_model = train_linear_regression(X_train, y_train, **best['linear'])
     print("\nEvaluating Linear Regression Model...")
-    evaluate_model(lr_model, X_test, y_test)
+    with section('evaluate_linear_regression', rows_in=len(X_test)):
+        lr_metrics = evaluate_model(lr_model, X_test, y_test, plot=plot)
 
     print("\nTraining Random Forest Regressor Model...")
-    rf_model = train_random_forest(X_train, y_train)
+    with section('train_random_forest', rows_in=len(X_train)):
+        rf_model = train_random_forest(X_train, y_train, n_jobs=n_jobs if tune else None, **best['random_forest'])
     print("\nEvaluating Random Forest Regressor Model...")
-    evaluate_model(rf_model, X_test, y_test)
+    with section('evaluate_random_forest', rows_in=len(X_test)):
+        rf_metrics = evaluate_model(rf_model, X_test, y_test, plot=plot)
 
     # Plot feature importance (Random Forest only)
-    print("\nPlotting Feature Importance for Random Forest Model...")
-    plot_feature_importance(rf_model, pd.DataFrame(X_train))
+    if plot:
+        print("\nPlotting Feature Importance for Random Forest Model...")
+        with section('plot_feature_importance'):
+            plot_feature_importance(rf_model, pd.DataFrame(X_train))
+
+    if save_path:
+        with section('save_model_artifact'):
+            save_model_artifact(save_path, encoders, scaler,
+                                {'linear': lr_model, 'random_forest': rf_model},
+                                {'linear': lr_metrics, 'random_forest': rf_metrics},
+                                training_rows=len(X_train))
+
+    return {'models': {'linear': lr_model, 'random_forest': rf_model},
+            'metrics': {'linear': lr_metrics, 'random_forest': rf_metrics},
+            'X_test': X_test, 'y_test': y_test, 'feature_names': list(pd.DataFrame(X_train).columns)}
 
 if __name__ == "__main__":
-    run_predictive_model()
+    import sys
+    from instrumentation import Instrumentation
+    tune = '--tune' in sys.argv
+    save_path = MODEL_PATH if '--save' in sys.argv else None
+    if '--report' in sys.argv:
+        instrumentation = Instrumentation(profile='--profile' in sys.argv)
+        with instrumentation.measure('predictive'):
+            run_predictive_model(tune=tune, save_path=save_path)
+        instrumentation.write_report('predictive_metrics.json')
+        print("Metrics written to predictive_metrics.json.")
+    else:
+        run_predictive_model(tune=tune, save_path=save_path)
@@ -0,0 +1,171 @@
+import os
+import numpy as np
+import pandas as pd
+from result_cache import code_fingerprint, fingerprint, get_cache
+
+REGIONS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'country_regions.csv')
+UNKNOWN_REGION = 'Other'
+LEVELS = {'region': ['Region'], 'country': ['Region', 'Country'], 'city': ['Region', 'Country', 'City']}
+
+# Mergeable partial aggregates per group: sums and counts for means, extremes, and the
+# position of the tallest building.
+_PARTIALS = {
+    'count': ('Height', 'size'),
+    'height_sum': ('Height', 'sum'),
+    'height_count': ('Height', 'count'),
+    'height_max': ('Height', 'max'),
+    'tallest_pos': ('_height_key', 'idxmax'),
+    'floors_sum': ('Floors', 'sum'),
+    'floors_count': ('Floors', 'count'),
+    'floors_max': ('Floors', 'max'),
+    'year_sum': ('Year Completed', 'sum'),
+    'year_count': ('Year Completed', 'count'),
+    'year_min': ('Year Completed', 'min'),
+    'year_max': ('Year Completed', 'max'),
+}
+_COMBINE = {'count': 'sum', 'height_sum': 'sum', 'height_count': 'sum', 'height_max': 'max',
+            'floors_sum': 'sum', 'floors_count': 'sum', 'floors_max': 'max',
+            'year_sum': 'sum', 'year_count': 'sum', 'year_min': 'min', 'year_max': 'max'}
+
+
+def load_region_table(path=REGIONS_PATH):
+    """
+    Loads the country -> region table.
+
+    Returns:
+    - dict: Country name -> region name.
+    """
+    table = pd.read_csv(path)
+    return dict(zip(table['Country'], table['Region']))
+
+
+def _regions(countries, region_mapping):
+    """
+    Maps each row's country to its region; countries not in the table get UNKNOWN_REGION.
+    """
+    if isinstance(countries.dtype, pd.CategoricalDtype):
+        # Map the categories once instead of every row.
+        mapped = countries.cat.categories.map(lambda country: region_mapping.get(country, UNKNOWN_REGION))
+        codes = countries.cat.codes.to_numpy()
+        values = np.where(codes >= 0, np.asarray(mapped, dtype=object)[codes], UNKNOWN_REGION)
+        return pd.Series(values, index=countries.index, name='Region')
+    return countries.map(region_mapping).fillna(UNKNOWN_REGION).rename('Region')
+
+
+def _fingerprint(df, region_mapping):
+    """
+    Cache key: the content of the grouped and aggregated columns and the index, the
+    region table and the code that computes the result. Building names are not hashed;
+    they are looked up in `df` on every call.
+    """
+    code = code_fingerprint(_aggregate, _regions, _roll_up, _finalize)
+    return fingerprint('regional_aggregation.aggregate_regions', 1, code,
+                       df[['City', 'Country', 'Height', 'Floors', 'Year Completed']], region_mapping)
+
+
+def _roll_up(partials, keys):
+    """
+    Combines finer partial aggregates into coarser groups (e.g. cities into countries).
+    """
+    grouped = partials.groupby(level=keys, sort=False, observed=True)
+    combined = grouped.agg(_COMBINE)
+    # The tallest building of a group is the one of its tallest subgroup.
+    best = partials['height_max'].fillna(-np.inf).groupby(level=keys, sort=False, observed=True).idxmax()
+    positions = partials.index.get_indexer(pd.MultiIndex.from_tuples(best.to_list(), names=partials.index.names))
+    combined['tallest_pos'] = partials['tallest_pos'].to_numpy()[positions]
+    return combined
+
+
+def _finalize(partials):
+    """
+    Turns partial aggregates into the reported statistics.
+    """
+    result = pd.DataFrame({
+        'count': partials['count'],
+        'height_mean': partials['height_sum'] / partials['height_count'],
+        'height_max': partials['height_max'],
+        'floors_mean': partials['floors_sum'] / partials['floors_count'],
+        'floors_max': partials['floors_max'],
+        'year_min': partials['year_min'],
+        'year_mean': partials['year_sum'] / partials['year_count'],
+        'year_max': partials['year_max'],
+        'tallest_pos': partials['tallest_pos'].where(partials['height_count'] > 0, -1),
+    }, index=partials.index)
+    return result.sort_values('count', ascending=False, kind='stable')
+
+
+def _with_rows(result, df):
+    """
+    Replaces the tallest building's position by its index label in `df` and adds its name.
+    """
+    positions = result['tallest_pos'].to_numpy()
+    found = positions >= 0
+    safe = np.where(found, positions, 0)
+    columns = {'tallest_row': np.where(found, df.index[safe].to_numpy(dtype=object), None)}
+    if 'Building' in df.columns:
+        columns['tallest_building'] = np.where(found, df['Building'].iloc[safe].to_numpy(dtype=object), None)
+    return result.drop(columns='tallest_pos').assign(**columns)
+
+
+def aggregate_regions(df, region_mapping=None, use_cache=True):
+    """
+    Computes building statistics per region, country and city.
+
+    The rows are grouped once, at the city level, into mergeable partial aggregates
+    (sums, counts, extremes and the tallest row); countries and regions are rolled up
+    from the city groups. The input is not modified. Results are cached by the content
+    of the input and the region table, so charts and reports over the same data share
+    one computation (see result_cache.py).
+
+    Parameters:
+    - df (DataFrame): Cleaned buildings with 'City', 'Country', 'Height', 'Floors' and
+      'Year Completed' (and optionally 'Building').
+    - region_mapping (dict): Country -> region; defaults to country_regions.csv.
+    - use_cache (bool): Reuse a cached result for identical data.
+
+    Returns:
+    - dict: 'region', 'country' and 'city' DataFrames indexed by their keys, with
+      'count', 'height_mean', 'height_max', 'floors_mean', 'floors_max', 'year_min',
+      'year_mean', 'year_max', 'tallest_row' (index label in `df`) and, if available,
+      'tallest_building', sorted by count.
+    """
+    region_mapping = load_region_table() if region_mapping is None else region_mapping
+    if use_cache:
+        result = get_cache().get_or_compute(_fingerprint(df, region_mapping), lambda: _aggregate(df, region_mapping))
+    else:
+        result = _aggregate(df, region_mapping)
+    return {level: _with_rows(result, df) for level, result in result.items()}
+
+
+def _aggregate(df, region_mapping):
+    """
+    Computes the statistics of every level, with the tallest building as a row position.
+    """
+    region = _regions(df['Country'], region_mapping)
+    unmapped = df['Country'][region == UNKNOWN_REGION].dropna().unique()
+    if len(unmapped):
+        print(f"No region for {len(unmapped)} countries (grouped as '{UNKNOWN_REGION}'): {', '.join(map(str, unmapped[:5]))}")
+
+    frame = pd.DataFrame({
+        'Region': region,
+        'Country': df['Country'],
+        'City': df['City'],
+        'Height': df['Height'],
+        '_height_key': df['Height'].astype('float64').fillna(-np.inf),
+        'Floors': df['Floors'],
+        'Year Completed': df['Year Completed'],
+    }).reset_index(drop=True)
+    city = frame.groupby(LEVELS['city'], sort=False, observed=True, dropna=False).agg(**_PARTIALS)
+    country = _roll_up(city, LEVELS['country'])
+    partials = {'city': city, 'country': country, 'region': _roll_up(country, LEVELS['region'])}
+    return {level: _finalize(partials[level]) for level in ('region', 'country', 'city')}
+
+
+if __name__ == "__main__":
+    import sys
+    from dataset_cache import read_dataset
+    data = read_dataset(sys.argv[1] if len(sys.argv) > 1 else 'tallest_buildings.csv', clean=True)
+    aggregates = aggregate_regions(data)
+    for level in ('region', 'country'):
+        print(aggregates[level].drop(columns='tallest_row').round(1).to_string())
+        print()
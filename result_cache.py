@@ -0,0 +1,330 @@
+import functools
+import hashlib
+import os
+import pickle
+import threading
+import time
+import types
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+# The disk tier is opt-in: set TALL_BUILDINGS_RESULT_CACHE to a directory, or pass
+# cache_dir to ResultCache, to share results between processes and runs.
+RESULT_CACHE_DIR = os.environ.get('TALL_BUILDINGS_RESULT_CACHE') or None
+MEMORY_ENTRIES = 32
+DISK_LIMIT_BYTES = 256 * 1024 * 1024
+
+
+def _values(values):
+    """
+    The bytes that identify a column or index: the raw data of numeric, boolean and
+    datetime columns, per-value hashes of everything else.
+    """
+    if isinstance(values, pd.RangeIndex):
+        return repr((values.start, values.stop, values.step)).encode('utf-8')
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biufcmM':
+        return np.ascontiguousarray(values.to_numpy()).view(np.uint8)
+    try:
+        return pd.util.hash_pandas_object(values, index=False).to_numpy().view(np.uint8)
+    except TypeError:
+        return pickle.dumps(values)
+
+
+def _update(digest, value):
+    """
+    Feeds a value into a hash: pandas objects by their content, index, column names and
+    dtypes; arrays by their bytes; containers item by item; anything else by its repr.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(type(value).__name__.encode('utf-8'))
+        digest.update(repr(value.shape).encode('utf-8'))
+        digest.update(_values(value.index))
+        if isinstance(value, pd.DataFrame):
+            for col, series in value.items():
+                digest.update(repr((col, str(series.dtype))).encode('utf-8'))
+                digest.update(_values(series))
+        else:
+            digest.update(repr((value.name, str(value.dtype))).encode('utf-8'))
+            digest.update(_values(value))
+    elif isinstance(value, np.ndarray):
+        digest.update(repr((value.dtype.str, value.shape)).encode('utf-8'))
+        digest.update(np.ascontiguousarray(value).tobytes() if value.dtype != object else pickle.dumps(value))
+    elif isinstance(value, dict):
+        digest.update(b'{')
+        for key in sorted(value, key=repr):
+            _update(digest, key)
+            _update(digest, value[key])
+        digest.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        digest.update(b'(' if isinstance(value, tuple) else b'[')
+        for item in value:
+            _update(digest, item)
+        digest.update(b')')
+    else:
+        digest.update(repr(value).encode('utf-8'))
+    digest.update(b'\x00')
+
+
+def fingerprint(*values):
+    """
+    Content fingerprint of any mix of DataFrames, Series, arrays and plain values.
+
+    Equal data gives equal fingerprints regardless of object identity, and any change to
+    a value, the index, a column name or a dtype gives a different one.
+
+    Returns:
+    - str: A hex digest.
+    """
+    digest = hashlib.sha256()
+    _update(digest, values)
+    return digest.hexdigest()[:32]
+
+
+def _code_bytes(code):
+    """
+    The bytecode, names and constants of a code object, including nested functions.
+    """
+    parts = [code.co_code, repr(code.co_names).encode('utf-8')]
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            parts.append(_code_bytes(const))
+        elif isinstance(const, frozenset):
+            # Sets of strings repr in a different order in every process.
+            parts.append(repr(sorted(const, key=repr)).encode('utf-8'))
+        else:
+            parts.append(repr(const).encode('utf-8'))
+    return b'\x00'.join(parts)
+
+
+def code_fingerprint(*funcs):
+    """
+    Fingerprint of the code of the given functions, so cached results are not reused
+    after the code that computed them changes.
+
+    Returns:
+    - str: A hex digest.
+    """
+    digest = hashlib.sha256()
+    for func in funcs:
+        digest.update(func.__qualname__.encode('utf-8'))
+        digest.update(_code_bytes(func.__code__))
+    return digest.hexdigest()[:32]
+
+
+def _detach(value):
+    """
+    Gives a caller its own view of a cached result, so modifying a returned frame does
+    not modify the cache (pandas copies the data only when it is written to).
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, dict):
+        return {key: _detach(item) for key, item in value.items()}
+    return value
+
+
+class ResultCache:
+    """
+    Two-tier store for computed results: an in-process LRU of `memory_entries` entries,
+    and optionally a directory of pickled results bounded to `disk_limit` bytes, from
+    which the least recently used entries are evicted. The disk tier is off unless a
+    `cache_dir` is given (by default from TALL_BUILDINGS_RESULT_CACHE); it lets separate
+    processes and later runs share results.
+    """
+
+    def __init__(self, memory_entries=MEMORY_ENTRIES, cache_dir=RESULT_CACHE_DIR, disk_limit=DISK_LIMIT_BYTES):
+        """
+        Parameters:
+        - memory_entries (int): Maximum number of results kept in memory.
+        - cache_dir (str): Directory of the disk tier, or None (the default unless
+          TALL_BUILDINGS_RESULT_CACHE is set) for memory only.
+        - disk_limit (int): Maximum total size of the disk tier in bytes.
+        """
+        self.memory_entries = memory_entries
+        self.cache_dir = cache_dir
+        self.disk_limit = disk_limit
+        self.hits = {'memory': 0, 'disk': 0}
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.pkl')
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _read(self, key):
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(path)  # mark as recently used for eviction
+            return (value,)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return None
+
+    def _write(self, key, value):
+        if self.cache_dir is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f'{self._path(key)}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+            print(f"Result not cached on disk: {e}")
+            return
+        self._evict()
+
+    def _evict(self):
+        """
+        Removes the least recently used files until the disk tier fits in `disk_limit`.
+        """
+        entries = []
+        with os.scandir(self.cache_dir) as scan:
+            for entry in scan:
+                if entry.name.endswith('.pkl'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_limit:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the result stored under `key`, or computes, stores and returns it.
+
+        Parameters:
+        - key (str): A fingerprint of everything the result depends on.
+        - compute (callable): Called without arguments on a miss.
+
+        Returns:
+        - The result (pandas objects as shallow copies of the cached ones).
+        """
+        with self._lock:
+            found = key in self._memory
+            if found:
+                self._memory.move_to_end(key)
+                value = self._memory[key]
+                self.hits['memory'] += 1
+        if found:
+            return _detach(value)
+
+        stored = self._read(key)
+        if stored is not None:
+            self.hits['disk'] += 1
+            self._remember(key, stored[0])
+            return _detach(stored[0])
+
+        self.misses += 1
+        value = compute()
+        self._remember(key, value)
+        self._write(key, value)
+        return _detach(value)
+
+    def clear(self):
+        """
+        Drops every entry of both tiers.
+        """
+        with self._lock:
+            self._memory.clear()
+        if self.cache_dir is not None and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(('.pkl', '.tmp')):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+
+_default_cache = None
+
+
+def get_cache():
+    """
+    The process-wide cache used by memoize() (created on first use).
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
+
+
+def clear_cache():
+    """
+    Drops every result of the process-wide cache, in memory and on disk.
+    """
+    get_cache().clear()
+
+
+def memoize(func=None, *, cache=None, version=1):
+    """
+    Decorator that caches a function's result by a content fingerprint of its
+    arguments, so calling it again on equal data returns the stored result.
+
+    The function must not have side effects and must return a picklable result. The
+    key includes a fingerprint of the function's code, so editing it invalidates its
+    results; bump `version` when its output changes for the same inputs because of code
+    it calls. The original function is available as `.uncached`.
+
+    Parameters:
+    - cache (ResultCache): The store to use; defaults to get_cache().
+    - version (int): Part of every key.
+    """
+    def decorate(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+        code = code_fingerprint(func) if hasattr(func, '__code__') else None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = fingerprint(name, version, code, args, kwargs)
+            return (cache or get_cache()).get_or_compute(key, lambda: func(*args, **kwargs))
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorate if func is None else decorate(func)
+
+
+def benchmark_result_cache(n_rows=1_000_000, seed=0):
+    """
+    Times a correlation matrix computed directly, through a cold cache, from memory
+    and from the disk tier.
+
+    Returns:
+    - DataFrame: Seconds per variant.
+    """
+    import tempfile
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(rng.normal(size=(n_rows, 6)), columns=[f'x{i}' for i in range(6)])
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ResultCache(cache_dir=cache_dir)
+        correlation = memoize(cache=cache)(pd.DataFrame.corr)
+        timings = {}
+        for label, call in [('direct', lambda: data.corr()),
+                            ('cold cache', lambda: correlation(data)),
+                            ('memory hit', lambda: correlation(data)),
+                            ('disk hit', lambda: (cache._memory.clear(), correlation(data)))]:
+            start = time.perf_counter()
+            call()
+            timings[label] = time.perf_counter() - start
+    return pd.DataFrame({'seconds': timings}).round(4)
+
+
+if __name__ == "__main__":
+    print(benchmark_result_cache())
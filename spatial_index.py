@@ -0,0 +1,188 @@
+import time
+import numpy as np
+import pandas as pd
+from geocoding import COORDINATE_COLUMNS, add_coordinates
+from lazy_imports import lazy_import
+
+neighbors = lazy_import('sklearn.neighbors')
+
+EARTH_RADIUS_KM = 6371.0088
+SUPERTALL_HEIGHT = 300  # metres
+
+
+def _radians(lat, lon):
+    """
+    Stacks latitudes and longitudes in degrees into an (n, 2) array of radians.
+    """
+    return np.radians(np.column_stack([np.atleast_1d(lat), np.atleast_1d(lon)]).astype(np.float64))
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in km between points given in degrees (broadcasts like numpy).
+    """
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+class BuildingIndex:
+    """
+    Ball tree over building coordinates with haversine distance.
+
+    Radius and k-nearest-neighbour queries take logarithmic time per query point, and
+    every query method also accepts arrays of points to answer a whole batch in one call.
+    Results are rows of `data` with a 'distance_km' column.
+    """
+
+    def __init__(self, df, leaf_size=40):
+        """
+        Parameters:
+        - df (DataFrame): Buildings with 'Latitude' and 'Longitude', or with 'City' and
+          'Country' to be geocoded (see geocoding.add_coordinates). Rows without
+          coordinates are left out.
+        - leaf_size (int): Leaf size of the ball tree.
+        """
+        if not set(COORDINATE_COLUMNS).issubset(df.columns):
+            df = add_coordinates(df)
+        self.data = df.dropna(subset=COORDINATE_COLUMNS)
+        self.leaf_size = leaf_size
+        self._tree = neighbors.BallTree(_radians(self.data['Latitude'], self.data['Longitude']),
+                                        leaf_size=leaf_size, metric='haversine')
+
+    def __len__(self):
+        return len(self.data)
+
+    def filter(self, mask):
+        """
+        Returns an index over the buildings selected by a boolean mask aligned with
+        `data`, e.g. index.filter(index.data['Height'] >= SUPERTALL_HEIGHT).
+        """
+        return BuildingIndex(self.data[np.asarray(mask, dtype=bool)], leaf_size=self.leaf_size)
+
+    def _rows(self, positions, distances):
+        rows = self.data.iloc[positions].copy()
+        rows['distance_km'] = distances
+        return rows
+
+    def query_radius(self, lat, lon, radius_km):
+        """
+        Batched radius query.
+
+        Parameters:
+        - lat, lon (float or array-like): Query points in degrees.
+        - radius_km (float or array-like): Search radius per point.
+
+        Returns:
+        - tuple: (positions, distances_km), object arrays with one array of row positions
+          in `data` and one of distances per query point, nearest first.
+        """
+        positions, distances = self._tree.query_radius(_radians(lat, lon), r=np.asarray(radius_km) / EARTH_RADIUS_KM,
+                                                       return_distance=True, sort_results=True)
+        distances_km = np.empty(len(distances), dtype=object)
+        for i, d in enumerate(distances):
+            distances_km[i] = d * EARTH_RADIUS_KM
+        return positions, distances_km
+
+    def query_knn(self, lat, lon, k=5):
+        """
+        Batched k-nearest-neighbour query.
+
+        Returns:
+        - tuple: (positions, distances_km), arrays of shape (n_points, k), nearest first.
+        """
+        k = min(k, len(self))
+        distances, positions = self._tree.query(_radians(lat, lon), k=k, sort_results=True)
+        return positions, distances * EARTH_RADIUS_KM
+
+    def within(self, lat, lon, radius_km):
+        """
+        Buildings within `radius_km` of one point, nearest first.
+        """
+        positions, distances = self.query_radius(lat, lon, radius_km)
+        return self._rows(positions[0], distances[0])
+
+    def nearest(self, lat, lon, k=5):
+        """
+        The `k` buildings nearest to one point.
+        """
+        positions, distances = self.query_knn(lat, lon, k)
+        return self._rows(positions[0], distances[0])
+
+    def nearest_to_city(self, city, country, k=5):
+        """
+        The `k` buildings nearest to a city from the gazetteer, or None if it is unknown.
+        """
+        location = add_coordinates(pd.DataFrame({'City': [city], 'Country': [country]}))
+        if location['Latitude'].isna().all():
+            print(f"Error: No coordinates for {city}, {country}.")
+            return None
+        return self.nearest(location.at[0, 'Latitude'], location.at[0, 'Longitude'], k)
+
+    def density(self, lat, lon, radius_km):
+        """
+        Batched density: number of buildings within `radius_km` of each point and the
+        count per 1000 km² of the (spherical) search area.
+
+        Returns:
+        - DataFrame: 'count' and 'per_1000_km2' per query point.
+        """
+        counts = self._tree.query_radius(_radians(lat, lon), r=np.asarray(radius_km) / EARTH_RADIUS_KM,
+                                         count_only=True)
+        area = 2 * np.pi * EARTH_RADIUS_KM ** 2 * (1 - np.cos(np.asarray(radius_km) / EARTH_RADIUS_KM))
+        return pd.DataFrame({'count': counts, 'per_1000_km2': counts / area * 1000})
+
+
+def _brute_force_counts(lat, lon, points_lat, points_lon, radius_km):
+    """
+    Counts buildings within the radius of each query point by computing every distance.
+    """
+    return np.array([(haversine_km(q_lat, q_lon, points_lat, points_lon) <= radius_km).sum()
+                     for q_lat, q_lon in zip(lat, lon)])
+
+
+def benchmark_spatial_index(n_rows=1_000_000, n_queries=500, radius_km=25, k=10, seed=0):
+    """
+    Compares radius counts and kNN queries through the ball tree with a brute-force
+    distance scan on synthetic buildings, and checks that both give the same counts.
+
+    Returns:
+    - DataFrame: Seconds and queries per second per approach.
+    """
+    from synthetic_data import generate_buildings
+
+    buildings = generate_buildings(n_rows, seed=seed, raw=False, with_coordinates=True)
+    rng = np.random.default_rng(seed)
+    sample = buildings.iloc[rng.integers(0, n_rows, n_queries)]
+    lat = sample['Latitude'].to_numpy() + rng.normal(0, 0.2, n_queries)
+    lon = sample['Longitude'].to_numpy() + rng.normal(0, 0.2, n_queries)
+
+    start = time.perf_counter()
+    index = BuildingIndex(buildings)
+    build_seconds = time.perf_counter() - start
+
+    results = []
+    start = time.perf_counter()
+    tree_counts = index.density(lat, lon, radius_km)['count'].to_numpy()
+    results.append({'approach': 'ball tree (radius count)', 'seconds': time.perf_counter() - start})
+    start = time.perf_counter()
+    index.query_knn(lat, lon, k)
+    results.append({'approach': f'ball tree (k={k} nearest)', 'seconds': time.perf_counter() - start})
+
+    points_lat, points_lon = buildings['Latitude'].to_numpy(), buildings['Longitude'].to_numpy()
+    start = time.perf_counter()
+    brute_counts = _brute_force_counts(lat, lon, points_lat, points_lon, radius_km)
+    results.append({'approach': 'brute force (radius count)', 'seconds': time.perf_counter() - start})
+
+    # Points exactly on the radius may fall either way by rounding.
+    mismatches = int(np.abs(tree_counts - brute_counts).sum())
+    results = pd.DataFrame(results)
+    results['queries_per_second'] = n_queries / results['seconds']
+    print(f"Index over {n_rows} buildings built in {build_seconds:.2f}s; "
+          f"{n_queries} queries, count differences: {mismatches}")
+    print(results.to_string(index=False))
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_spatial_index()
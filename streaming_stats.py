@@ -0,0 +1,608 @@
+import time
+import numpy as np
+import pandas as pd
+from data_cleaning import clean_columns
+
+OUTLIER_METHODS = ('iqr', 'zscore')
+IQR_FACTOR = 1.5
+Z_THRESHOLD = 3.0
+
+
+def numeric_matrix(data, columns=None):
+    """
+    Stacks numeric columns into one float64 array, with NaN for missing values. The
+    array is column-major, so each column is contiguous.
+
+    Parameters:
+    - data (DataFrame): The data.
+    - columns (list): Columns to use (default: every numeric column).
+
+    Returns:
+    - tuple: (columns, ndarray of shape (len(data), len(columns))).
+    """
+    columns = list(data.select_dtypes(include='number').columns if columns is None else columns)
+    matrix = np.empty((len(data), len(columns)), dtype=np.float64, order='F')
+    for i, col in enumerate(columns):
+        matrix[:, i] = pd.to_numeric(data[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return columns, matrix
+
+
+def read_clean_chunks(file_path, chunksize=100_000, usecols=None):
+    """
+    Reads a raw CSV in blocks of rows and cleans each block (see data_cleaning.clean_columns).
+
+    Yields:
+    - DataFrame: Cleaned chunks of at most `chunksize` rows.
+    """
+    for chunk in pd.read_csv(file_path, chunksize=chunksize, usecols=usecols):
+        yield clean_columns(chunk)
+
+
+class RunningMoments:
+    """
+    Count, mean, sum of squared deviations, minimum and maximum per column, updated a
+    block of rows at a time and mergeable with the states of other blocks (Chan et al.'s
+    parallel form of Welford's algorithm). Missing values are skipped.
+    """
+
+    def __init__(self, n_columns):
+        self.count = np.zeros(n_columns)
+        self.mean = np.zeros(n_columns)
+        self.m2 = np.zeros(n_columns)
+        self.min = np.full(n_columns, np.inf)
+        self.max = np.full(n_columns, -np.inf)
+
+    def update(self, matrix):
+        """
+        Adds the rows of a (n_rows, n_columns) array.
+        """
+        matrix = np.asarray(matrix, dtype=np.float64).reshape(-1, len(self.count))
+        present = ~np.isnan(matrix)
+        count = present.sum(axis=0).astype(np.float64)
+        total = np.where(present, matrix, 0).sum(axis=0)
+        mean = np.divide(total, count, out=np.zeros_like(total), where=count > 0)
+        m2 = (np.where(present, matrix - mean, 0) ** 2).sum(axis=0)
+        self.min = np.fmin(self.min, np.where(present, matrix, np.inf).min(axis=0, initial=np.inf))
+        self.max = np.fmax(self.max, np.where(present, matrix, -np.inf).max(axis=0, initial=-np.inf))
+        self._combine(count, mean, m2)
+        return self
+
+    def merge(self, other):
+        """
+        Adds the state of another RunningMoments over the same columns.
+        """
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+        self._combine(other.count, other.mean, other.m2)
+        return self
+
+    def _combine(self, count, mean, m2):
+        total = self.count + count
+        safe = np.where(total > 0, total, 1)
+        delta = mean - self.mean
+        self.mean = self.mean + delta * count / safe
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * count / safe
+        self.count = total
+
+    def variance(self, ddof=1):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > ddof, self.m2 / (self.count - ddof), np.nan)
+
+    def std(self, ddof=1):
+        return np.sqrt(self.variance(ddof))
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch (Karnin, Lang and Liberty) over a stream of numbers.
+
+    Items are kept in levels; an item on level h stands for 2**h inputs. When a level
+    outgrows its capacity it is sorted and every other item (from a random offset) is
+    promoted to the next level. Memory stays around 3 * k items however many values are
+    added, and the rank error of a quantile is about 1.7 / k of the count. Sketches of
+    separate chunks, files or workers can be merged.
+    """
+
+    def __init__(self, k=200, seed=None):
+        """
+        Parameters:
+        - k (int): Accuracy parameter; the capacity of the top level.
+        - seed (int): Seed for the compaction offsets.
+        """
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return sum(len(items) for items in self.levels)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def update(self, values):
+        """
+        Adds values; missing values are skipped.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.count += len(values)
+            self.min = min(self.min, values.min())
+            self.max = max(self.max, values.max())
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Adds the items of another sketch.
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _compress(self):
+        # Adding a level lowers the capacity of the ones below, so repeat until all fit.
+        compacted = True
+        while compacted:
+            compacted = False
+            for level in range(len(self.levels)):
+                items = self.levels[level]
+                if len(items) <= self._capacity(level):
+                    continue
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                odd = len(items) % 2
+                promoted = items[odd + self._rng.integers(2)::2]
+                self.levels[level] = items[:odd]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                compacted = True
+
+    def quantile(self, q):
+        """
+        Estimated quantile(s) for q in [0, 1]; NaN if the sketch is empty. Exact (with
+        linear interpolation, as in pandas) until the first compaction.
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if self.count == 0:
+            return np.full(q.shape, np.nan) if q.ndim else np.nan
+        if len(self.levels) == 1:
+            # Nothing has been compacted yet: the quantiles are exact.
+            result = np.quantile(self.levels[0], q)
+            return result if q.ndim else float(result)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        result = items[np.clip(positions, 0, len(items) - 1)]
+        result = np.where(q <= 0, self.min, np.where(q >= 1, self.max, result))
+        return result if q.ndim else float(result)
+
+
+class CoMoments:
+    """
+    Pairwise co-moments of several columns for the correlation matrix, updated a block
+    of rows at a time and mergeable like RunningMoments.
+
+    Each pair of columns keeps its own count, means, sums of squared deviations and sum
+    of cross-deviations over the rows where both values are present, so the result
+    matches DataFrame.corr() (pairwise-complete observations).
+    """
+
+    def __init__(self, n_columns):
+        shape = (n_columns, n_columns)
+        self.count = np.zeros(shape)
+        self.mean_x = np.zeros(shape)  # mean of column i over the rows of pair (i, j)
+        self.mean_y = np.zeros(shape)  # mean of column j over the rows of pair (i, j)
+        self.m2_x = np.zeros(shape)
+        self.m2_y = np.zeros(shape)
+        self.cross = np.zeros(shape)
+
+    def update(self, matrix):
+        """
+        Adds the rows of a (n_rows, n_columns) array.
+        """
+        matrix = np.asarray(matrix, dtype=np.float64).reshape(-1, len(self.count))
+        present = ~np.isnan(matrix)
+        weights = present.astype(np.float64)
+        # Shift by the chunk means so the sums of products below do not lose precision.
+        with np.errstate(invalid='ignore'):
+            shift = np.nan_to_num(np.nanmean(np.where(present.any(axis=0), matrix, 0), axis=0))
+        centered = np.where(present, matrix - shift, 0)
+        count = weights.T @ weights
+        safe = np.where(count > 0, count, 1)
+        sums = centered.T @ weights  # [i, j]: sum of column i over the rows of pair (i, j)
+        mean_x, mean_y = sums / safe, sums.T / safe
+        squares = (centered ** 2).T @ weights
+        m2_x = squares - count * mean_x ** 2
+        m2_y = squares.T - count * mean_y ** 2
+        cross = centered.T @ centered - count * mean_x * mean_y
+        self._combine(count, mean_x + shift[:, None], mean_y + shift[None, :], m2_x, m2_y, cross)
+        return self
+
+    def merge(self, other):
+        """
+        Adds the state of another CoMoments over the same columns.
+        """
+        self._combine(other.count, other.mean_x, other.mean_y, other.m2_x, other.m2_y, other.cross)
+        return self
+
+    def _combine(self, count, mean_x, mean_y, m2_x, m2_y, cross):
+        total = self.count + count
+        safe = np.where(total > 0, total, 1)
+        delta_x = mean_x - self.mean_x
+        delta_y = mean_y - self.mean_y
+        factor = self.count * count / safe
+        self.m2_x = self.m2_x + m2_x + delta_x ** 2 * factor
+        self.m2_y = self.m2_y + m2_y + delta_y ** 2 * factor
+        self.cross = self.cross + cross + delta_x * delta_y * factor
+        self.mean_x = self.mean_x + delta_x * count / safe
+        self.mean_y = self.mean_y + delta_y * count / safe
+        self.count = total
+
+    def correlation(self):
+        """
+        Pearson correlation matrix; NaN for pairs with fewer than two rows or no variance.
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.cross / np.sqrt(self.m2_x * self.m2_y)
+        corr[(self.count < 2) | (self.m2_x <= 0) | (self.m2_y <= 0)] = np.nan
+        corr = np.clip(corr, -1, 1)
+        diagonal = np.diag_indices_from(corr)
+        corr[diagonal] = np.where(np.isnan(corr[diagonal]), np.nan, 1.0)
+        return corr
+
+
+def _bounds_frame(columns, q1, q3, mean, std, count, iqr_factor, z_threshold):
+    iqr = q3 - q1
+    return pd.DataFrame({
+        'count': count,
+        'q1': q1,
+        'q3': q3,
+        'iqr_lower': q1 - iqr_factor * iqr,
+        'iqr_upper': q3 + iqr_factor * iqr,
+        'mean': mean,
+        'std': std,
+        'z_lower': mean - z_threshold * std,
+        'z_upper': mean + z_threshold * std,
+    }, index=pd.Index(columns, name='column'))
+
+
+def outlier_bounds(data, columns=None, iqr_factor=IQR_FACTOR, z_threshold=Z_THRESHOLD):
+    """
+    Computes the IQR and z-score outlier bounds of several numeric columns at once.
+
+    Parameters:
+    - data (DataFrame): The data.
+    - columns (list): Columns to analyze (default: every numeric column).
+    - iqr_factor (float): Multiple of the interquartile range beyond the quartiles.
+    - z_threshold (float): Number of standard deviations from the mean.
+
+    Returns:
+    - DataFrame: One row per column with the count, quartiles, mean, std and the
+      'iqr_lower'/'iqr_upper' and 'z_lower'/'z_upper' bounds.
+    """
+    columns, matrix = numeric_matrix(data, columns)
+    return _matrix_bounds(columns, matrix, iqr_factor, z_threshold)
+
+
+def _matrix_bounds(columns, matrix, iqr_factor, z_threshold):
+    stats = np.full((len(columns), 5), np.nan)
+    for i in range(len(columns)):
+        values = matrix[:, i]
+        missing = np.isnan(values)
+        if missing.any():
+            values = values[~missing]
+        stats[i, 0] = len(values)
+        if len(values):
+            # One partition per column for both quartiles (linear interpolation, as in pandas).
+            stats[i, 1:3] = np.quantile(values, [0.25, 0.75])
+            stats[i, 3] = values.mean()
+            if len(values) > 1:
+                stats[i, 4] = values.std(ddof=1)
+    return _bounds_frame(columns, stats[:, 1], stats[:, 2], stats[:, 3], stats[:, 4],
+                         stats[:, 0].astype(np.int64), iqr_factor, z_threshold)
+
+
+def outlier_mask(data, bounds=None, columns=None, methods=OUTLIER_METHODS,
+                 iqr_factor=IQR_FACTOR, z_threshold=Z_THRESHOLD):
+    """
+    Flags outliers in all numeric columns and with every method in one vectorized pass.
+
+    Unlike data_cleaning.detect_outliers, which returns copied rows for one column and
+    one method, this returns a boolean mask, so the caller can combine, count or select
+    without copying the data.
+
+    Parameters:
+    - data (DataFrame): The data to flag.
+    - bounds (DataFrame): Precomputed bounds, e.g. from outlier_bounds() or a
+      StreamingOutlierDetector; computed from `data` if None.
+    - columns (list): Columns to flag (default: the columns of `bounds`, or every
+      numeric column).
+    - methods (tuple): 'iqr' and/or 'zscore'.
+    - iqr_factor, z_threshold (float): See outlier_bounds(); used if `bounds` is None.
+
+    Returns:
+    - DataFrame: Booleans with the index of `data` and (method, column) columns, e.g.
+      mask['iqr'].any(axis=1) selects rows that are IQR outliers in any column.
+    """
+    unknown = set(methods) - set(OUTLIER_METHODS)
+    if unknown:
+        print(f"Unknown methods: {sorted(unknown)}. No outliers detected for them.")
+        methods = [method for method in methods if method in OUTLIER_METHODS]
+    if columns is None and bounds is not None:
+        columns = list(bounds.index)
+    columns, matrix = numeric_matrix(data, columns)
+    if bounds is None:
+        bounds = _matrix_bounds(columns, matrix, iqr_factor, z_threshold)
+    bounds = bounds.loc[columns]
+
+    values = np.empty((len(data), len(methods) * len(columns)), dtype=bool, order='F')
+    for m, method in enumerate(methods):
+        prefix = 'iqr' if method == 'iqr' else 'z'
+        lower = bounds[f'{prefix}_lower'].to_numpy()
+        upper = bounds[f'{prefix}_upper'].to_numpy()
+        for i in range(len(columns)):
+            out = values[:, m * len(columns) + i]
+            np.less(matrix[:, i], lower[i], out=out)
+            out |= matrix[:, i] > upper[i]
+    index = pd.MultiIndex.from_product([list(methods), columns], names=['method', 'column'])
+    return pd.DataFrame(values, index=data.index, columns=index, copy=False)
+
+
+class StreamingOutlierDetector:
+    """
+    Outlier bounds learned from data that arrives in chunks or does not fit in memory.
+
+    Every chunk updates running moments (for the z-score bounds) and one KLL sketch
+    per column (for the quartiles), so memory does not grow with the data. Detectors
+    fitted on separate chunks or workers can be merged.
+    """
+
+    def __init__(self, columns, k=200, iqr_factor=IQR_FACTOR, z_threshold=Z_THRESHOLD, seed=0):
+        """
+        Parameters:
+        - columns (list): Numeric columns to track.
+        - k (int): KLL accuracy parameter; quartiles are within about 1.7 / k in rank.
+        - iqr_factor, z_threshold (float): See outlier_bounds().
+        - seed (int): Seed for the sketches.
+        """
+        self.columns = list(columns)
+        self.iqr_factor = iqr_factor
+        self.z_threshold = z_threshold
+        self.moments = RunningMoments(len(self.columns))
+        self.sketches = [KLLSketch(k, seed=None if seed is None else seed + i) for i in range(len(self.columns))]
+
+    def update(self, chunk):
+        """
+        Adds a chunk of rows (a DataFrame with the tracked columns).
+        """
+        _, matrix = numeric_matrix(chunk, self.columns)
+        self.moments.update(matrix)
+        for i, sketch in enumerate(self.sketches):
+            sketch.update(matrix[:, i])
+        return self
+
+    def merge(self, other):
+        """
+        Adds the state of a detector fitted on other data.
+        """
+        self.moments.merge(other.moments)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        return self
+
+    def bounds(self):
+        """
+        The current bounds, in the format of outlier_bounds().
+        """
+        q1, q3 = np.array([sketch.quantile([0.25, 0.75]) for sketch in self.sketches]).reshape(-1, 2).T
+        return _bounds_frame(self.columns, q1, q3, self.moments.mean, self.moments.std(),
+                             self.moments.count.astype(np.int64), self.iqr_factor, self.z_threshold)
+
+    def mask(self, chunk, methods=OUTLIER_METHODS):
+        """
+        Flags outliers in a chunk against the current bounds, see outlier_mask().
+        """
+        return outlier_mask(chunk, bounds=self.bounds(), methods=methods)
+
+
+def scan_outliers(file_path, columns=('Height', 'Floors', 'Year Completed'), chunksize=100_000, k=200,
+                  methods=OUTLIER_METHODS):
+    """
+    Counts outliers in a raw CSV that may not fit in memory, in two passes over
+    cleaned chunks: the first learns the bounds, the second flags the rows.
+
+    Returns:
+    - tuple: (bounds DataFrame, Series of outlier counts per (method, column)).
+    """
+    detector = StreamingOutlierDetector(columns, k=k)
+    for chunk in read_clean_chunks(file_path, chunksize):
+        detector.update(chunk)
+    bounds = detector.bounds()
+    counts = None
+    for chunk in read_clean_chunks(file_path, chunksize):
+        chunk_counts = outlier_mask(chunk, bounds=bounds, methods=methods).sum()
+        counts = chunk_counts if counts is None else counts + chunk_counts
+    return bounds, counts
+
+
+class ChunkedStatistics:
+    """
+    Summary statistics and correlations of numeric columns with bounded memory.
+
+    Rows are added a chunk at a time; the state is running moments (mean, variance,
+    minimum and maximum), pairwise co-moments and one KLL sketch per column for the
+    median. States built from separate chunks, files or workers can be merged.
+    """
+
+    def __init__(self, columns=None, k=1000, seed=0):
+        """
+        Parameters:
+        - columns (list): Numeric columns; taken from the first chunk if None.
+        - k (int): KLL accuracy parameter for the medians.
+        - seed (int): Seed for the sketches.
+        """
+        self.k = k
+        self.seed = seed
+        self.columns = None
+        self.rows = 0
+        if columns is not None:
+            self._start(list(columns))
+
+    def _start(self, columns):
+        self.columns = columns
+        self.moments = RunningMoments(len(columns))
+        self.comoments = CoMoments(len(columns))
+        self.sketches = [KLLSketch(self.k, seed=self.seed + i) for i in range(len(columns))]
+
+    def update(self, chunk):
+        """
+        Adds a chunk of rows (a cleaned DataFrame).
+        """
+        if self.columns is None:
+            self._start(list(chunk.select_dtypes(include='number').columns))
+        _, matrix = numeric_matrix(chunk, self.columns)
+        self.rows += len(chunk)
+        self.moments.update(matrix)
+        self.comoments.update(matrix)
+        for i, sketch in enumerate(self.sketches):
+            sketch.update(matrix[:, i])
+        return self
+
+    def merge(self, other):
+        """
+        Adds the state of statistics computed on other data.
+        """
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self._start(other.columns)
+        if other.columns != self.columns:
+            raise ValueError(f"Cannot merge statistics of columns {other.columns} into {self.columns}.")
+        self.rows += other.rows
+        self.moments.merge(other.moments)
+        self.comoments.merge(other.comoments)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        return self
+
+    def summary(self):
+        """
+        Mean, median, standard deviation and range per column, as in
+        data_analysis.calculate_summary_statistics.
+        """
+        return pd.DataFrame({
+            'mean': np.where(self.moments.count > 0, self.moments.mean, np.nan),
+            'median': [sketch.quantile(0.5) for sketch in self.sketches],
+            'std': self.moments.std(),
+            'range': np.where(self.moments.count > 0, self.moments.max - self.moments.min, np.nan),
+        }, index=self.columns)
+
+    def correlation(self):
+        """
+        The Pearson correlation matrix, as DataFrame.corr().
+        """
+        return pd.DataFrame(self.comoments.correlation(), index=self.columns, columns=self.columns)
+
+
+def _file_statistics(file_path, chunksize, columns, k, seed):
+    statistics = ChunkedStatistics(columns, k=k, seed=seed)
+    for chunk in read_clean_chunks(file_path, chunksize):
+        statistics.update(chunk)
+    return statistics
+
+
+def chunked_statistics(sources, chunksize=100_000, columns=None, k=1000, processes=None):
+    """
+    Computes ChunkedStatistics over one or more raw CSV files, reading and cleaning
+    `chunksize` rows at a time. Several files are processed in parallel worker
+    processes and their states merged.
+
+    Parameters:
+    - sources (str or list): The raw CSV file(s).
+    - chunksize (int): Rows per chunk.
+    - columns (list): Numeric columns (default: every numeric column after cleaning).
+    - k (int): KLL accuracy parameter for the medians.
+    - processes (int): Worker processes for several files; 1 reads them in turn.
+
+    Returns:
+    - ChunkedStatistics: The merged statistics.
+    """
+    sources = [sources] if isinstance(sources, str) else list(sources)
+    if len(sources) > 1 and processes != 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            parts = list(executor.map(_file_statistics, sources, [chunksize] * len(sources),
+                                      [columns] * len(sources), [k] * len(sources), range(len(sources))))
+    else:
+        parts = [_file_statistics(source, chunksize, columns, k, i) for i, source in enumerate(sources)]
+    statistics = ChunkedStatistics(columns, k=k)
+    for part in parts:
+        statistics.merge(part)
+    return statistics
+
+
+def benchmark_outliers(n_rows=1_000_000, chunksize=100_000, k=200, seed=0):
+    """
+    Compares detect_outliers (one call per column and method) with outlier_mask and
+    with a StreamingOutlierDetector fed in chunks, and reports how far the sketched
+    quartiles are from the exact ones.
+
+    Returns:
+    - DataFrame: Seconds per approach.
+    """
+    from data_cleaning import detect_outliers
+    from synthetic_data import generate_buildings
+
+    data = clean_columns(generate_buildings(n_rows, seed=seed))
+    columns = list(data.select_dtypes(include='number').columns)
+    results = []
+
+    start = time.perf_counter()
+    for column in columns:
+        for method in OUTLIER_METHODS:
+            detect_outliers(data, column, method)
+    results.append({'approach': 'detect_outliers per column and method', 'seconds': time.perf_counter() - start})
+
+    start = time.perf_counter()
+    mask = outlier_mask(data)
+    results.append({'approach': 'outlier_mask', 'seconds': time.perf_counter() - start})
+
+    start = time.perf_counter()
+    detector = StreamingOutlierDetector(columns, k=k)
+    for begin in range(0, n_rows, chunksize):
+        detector.update(data.iloc[begin:begin + chunksize])
+    streamed = outlier_mask(data, bounds=detector.bounds())
+    results.append({'approach': f'streaming (k={k}, {chunksize}-row chunks)', 'seconds': time.perf_counter() - start})
+
+    exact = outlier_bounds(data)
+    print("Quartiles, exact vs. sketched:")
+    print(pd.concat({'exact': exact[['q1', 'q3']], 'sketch': detector.bounds()[['q1', 'q3']]}, axis=1).to_string())
+    print("Outliers flagged, exact vs. streaming bounds:")
+    print(pd.DataFrame({'exact': mask.sum(), 'streaming': streamed.sum()}).to_string())
+    results = pd.DataFrame(results)
+    print(results.to_string(index=False))
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        bounds, counts = scan_outliers(sys.argv[1])
+        print(bounds.to_string())
+        print(counts.to_string())
+    else:
+        benchmark_outliers()
@@ -0,0 +1,215 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+# Real cities with many tall buildings: (city, country, latitude, longitude).
+CITIES = [
+    ('Dubai', 'United Arab Emirates', 25.2048, 55.2708),
+    ('Shenzhen', 'China', 22.5431, 114.0579),
+    ('New York City', 'United States', 40.7128, -74.0060),
+    ('Hong Kong', 'China', 22.3193, 114.1694),
+    ('Shanghai', 'China', 31.2304, 121.4737),
+    ('Guangzhou', 'China', 23.1291, 113.2644),
+    ('Chicago', 'United States', 41.8781, -87.6298),
+    ('Wuhan', 'China', 30.5928, 114.3055),
+    ('Kuala Lumpur', 'Malaysia', 3.1390, 101.6869),
+    ('Chongqing', 'China', 29.4316, 106.9123),
+    ('Tianjin', 'China', 39.3434, 117.3616),
+    ('Moscow', 'Russia', 55.7558, 37.6173),
+    ('Singapore', 'Singapore', 1.3521, 103.8198),
+    ('Tokyo', 'Japan', 35.6762, 139.6503),
+    ('Seoul', 'South Korea', 37.5665, 126.9780),
+    ('Bangkok', 'Thailand', 13.7563, 100.5018),
+    ('Jakarta', 'Indonesia', -6.2088, 106.8456),
+    ('Mumbai', 'India', 19.0760, 72.8777),
+    ('Nanjing', 'China', 32.0603, 118.7969),
+    ('Changsha', 'China', 28.2282, 112.9388),
+    ('Shenyang', 'China', 41.8057, 123.4315),
+    ('Chengdu', 'China', 30.5728, 104.0668),
+    ('Doha', 'Qatar', 25.2854, 51.5310),
+    ('Abu Dhabi', 'United Arab Emirates', 24.4539, 54.3773),
+    ('Toronto', 'Canada', 43.6532, -79.3832),
+    ('Miami', 'United States', 25.7617, -80.1918),
+    ('Los Angeles', 'United States', 34.0522, -118.2437),
+    ('Houston', 'United States', 29.7604, -95.3698),
+    ('Melbourne', 'Australia', -37.8136, 144.9631),
+    ('Gold Coast', 'Australia', -28.0167, 153.4000),
+    ('Sydney', 'Australia', -33.8688, 151.2093),
+    ('Taipei', 'Taiwan', 25.0330, 121.5654),
+    ('Kaohsiung', 'Taiwan', 22.6273, 120.3014),
+    ('Busan', 'South Korea', 35.1796, 129.0756),
+    ('Ho Chi Minh City', 'Vietnam', 10.8231, 106.6297),
+    ('Hanoi', 'Vietnam', 21.0278, 105.8342),
+    ('Manila', 'Philippines', 14.5995, 120.9842),
+    ('Mecca', 'Saudi Arabia', 21.3891, 39.8579),
+    ('Riyadh', 'Saudi Arabia', 24.7136, 46.6753),
+    ('Kuwait City', 'Kuwait', 29.3759, 47.9774),
+    ('Manama', 'Bahrain', 26.2285, 50.5860),
+    ('Istanbul', 'Turkey', 41.0082, 28.9784),
+    ('London', 'United Kingdom', 51.5074, -0.1278),
+    ('Frankfurt', 'Germany', 50.1109, 8.6821),
+    ('Paris', 'France', 48.8566, 2.3522),
+    ('Tel Aviv', 'Israel', 32.0853, 34.7818),
+    ('Cairo', 'Egypt', 30.0444, 31.2357),
+    ('Mexico City', 'Mexico', 19.4326, -99.1332),
+    ('Monterrey', 'Mexico', 25.6866, -100.3161),
+    ('Sao Paulo', 'Brazil', -23.5505, -46.6333),
+    ('Balneario Camboriu', 'Brazil', -26.9906, -48.6348),
+]
+
+CITY_COLUMNS = ['City', 'Country', 'Latitude', 'Longitude']
+
+BUILDING_PREFIXES = np.array([
+    'Tower', 'Center', 'Plaza', 'Financial Center', 'Trade Center', 'Residences', 'Square',
+    'Landmark', 'International', 'One', 'Park Tower', 'Harbour', 'Marina', 'Sky', 'Metropolitan',
+])
+
+
+def city_table(n_cities=500, seed=0):
+    """
+    Builds the cities that synthetic buildings are placed in.
+
+    The real cities in CITIES come first; the remaining cities are synthetic, each
+    assigned to the country of a real city and placed within about 2 degrees of it.
+
+    Parameters:
+    - n_cities (int): Total number of cities (at least len(CITIES)).
+    - seed (int): Random seed.
+
+    Returns:
+    - DataFrame: 'City', 'Country', 'Latitude' and 'Longitude', most popular city first.
+    """
+    cities = pd.DataFrame(CITIES, columns=CITY_COLUMNS)
+    extra = max(n_cities - len(cities), 0)
+    if extra:
+        rng = np.random.default_rng(seed)
+        anchors = cities.iloc[rng.integers(0, len(cities), extra)].reset_index(drop=True)
+        synthetic = pd.DataFrame({
+            'City': [f'{city} New District {i}' for i, city in enumerate(anchors['City'], start=1)],
+            'Country': anchors['Country'],
+            'Latitude': (anchors['Latitude'] + rng.uniform(-2, 2, extra)).clip(-89, 89),
+            'Longitude': ((anchors['Longitude'] + rng.uniform(-2, 2, extra) + 180) % 360) - 180,
+        })
+        cities = pd.concat([cities, synthetic], ignore_index=True)
+    return cities
+
+
+def _zipf_choice(rng, n_items, size, exponent):
+    """
+    Draws `size` indices into range(n_items) with probability proportional to 1 / rank**exponent.
+    """
+    weights = 1.0 / np.arange(1, n_items + 1) ** exponent
+    return rng.choice(n_items, size=size, p=weights / weights.sum())
+
+
+def generate_buildings(n_rows, seed=0, n_cities=500, city_exponent=1.1, raw=True,
+                       with_coordinates=False, footnote_rate=0.08, feet_rate=0.02, missing_floors_rate=0.0,
+                       first_id=1):
+    """
+    Generates buildings in the schema of tallest_buildings.csv.
+
+    Cities (and with them countries) follow a Zipf distribution, so a few cities hold
+    most buildings, as in the real data. Heights are log-normal above 150 m, floors
+    follow from a storey height of about 4 m, and completion years lean towards recent
+    decades.
+
+    Parameters:
+    - n_rows (int): Number of buildings.
+    - seed (int): Random seed; the same seed gives the same data.
+    - n_cities (int): Number of distinct cities (see city_table()).
+    - city_exponent (float): Zipf exponent of the city distribution.
+    - raw (bool): Produce scraped formats ('632 m', '2,073 ft', 'Name†', 'Name[12]')
+      instead of clean numbers.
+    - with_coordinates (bool): Add 'Latitude' and 'Longitude' near the city centre.
+    - footnote_rate (float): Share of building names with a footnote marker (raw only).
+    - feet_rate (float): Share of heights given in feet (raw only).
+    - missing_floors_rate (float): Share of rows without a floor count.
+    - first_id (int): Number of the first building; names are numbered consecutively.
+
+    Returns:
+    - DataFrame: The generated buildings.
+    """
+    rng = np.random.default_rng(seed)
+    cities = city_table(n_cities, seed)
+    city_index = _zipf_choice(rng, len(cities), n_rows, city_exponent)
+
+    height = np.round(150 + rng.lognormal(mean=4.4, sigma=0.6, size=n_rows), 1).clip(max=1000)
+    storey = rng.normal(4.0, 0.35, n_rows).clip(3.0, 5.5)
+    floors = np.maximum(np.round(height / storey), 30).astype(np.int64)
+    years = 2024 - np.floor(rng.exponential(14, n_rows)).astype(np.int64)
+    years = np.where(years < 1930, rng.integers(1930, 2024, n_rows), years)
+
+    prefixes = pd.Series(BUILDING_PREFIXES[rng.integers(0, len(BUILDING_PREFIXES), n_rows)])
+    building = prefixes + ' ' + pd.Series(np.arange(first_id, first_id + n_rows)).astype(str)
+    data = {
+        'Building': building,
+        'City': cities['City'].to_numpy()[city_index],
+        'Country': cities['Country'].to_numpy()[city_index],
+    }
+
+    if raw:
+        markers = rng.random(n_rows)
+        dagger = markers < footnote_rate / 2
+        reference = (markers >= footnote_rate / 2) & (markers < footnote_rate)
+        building = building.where(~dagger, building + '†')
+        data['Building'] = building.where(~reference, building + '[' + pd.Series(rng.integers(1, 99, n_rows)).astype(str) + ']')
+
+        in_feet = rng.random(n_rows) < feet_rate
+        metres = pd.Series(height).astype(str).str.removesuffix('.0') + ' m'
+        feet = pd.Series(np.round(height[in_feet] / 0.3048).astype(np.int64)).map('{:,} ft'.format)
+        metres[in_feet] = feet.to_numpy()
+        data['Height'] = metres
+        data['Floors'] = pd.Series(floors).astype(str)
+        if missing_floors_rate:
+            data['Floors'] = data['Floors'].mask(rng.random(n_rows) < missing_floors_rate)
+    else:
+        data['Height'] = height
+        data['Floors'] = floors
+        if missing_floors_rate:
+            data['Floors'] = pd.Series(floors, dtype='float64').mask(rng.random(n_rows) < missing_floors_rate)
+    data['Year Completed'] = years
+
+    if with_coordinates:
+        data['Latitude'] = cities['Latitude'].to_numpy()[city_index] + rng.normal(0, 0.05, n_rows)
+        data['Longitude'] = cities['Longitude'].to_numpy()[city_index] + rng.normal(0, 0.05, n_rows)
+    return pd.DataFrame(data)
+
+
+def write_synthetic_csv(output_path, n_rows, chunk_size=1_000_000, seed=0, **kwargs):
+    """
+    Writes a synthetic dataset in chunks, so that memory stays bounded for 10M+ rows.
+
+    Every chunk gets its own seed derived from `seed`, so the file is reproducible, and
+    building names are numbered across chunks so they stay unique. Keyword arguments are passed
+    to generate_buildings().
+
+    Parameters:
+    - output_path (str): The CSV file to write.
+    - n_rows (int): Total number of rows.
+    - chunk_size (int): Rows generated and written at a time.
+    - seed (int): Random seed.
+
+    Returns:
+    - str: `output_path`.
+    """
+    seeds = np.random.SeedSequence(seed).generate_state(max(-(-n_rows // chunk_size), 1))
+    written = 0
+    for i, chunk_seed in enumerate(seeds):
+        size = min(chunk_size, n_rows - written)
+        chunk = generate_buildings(size, seed=int(chunk_seed), first_id=written + 1, **kwargs)
+        chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        written += size
+    print(f"Wrote {written} synthetic buildings to {output_path}.")
+    return output_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic tallest buildings dataset.")
+    parser.add_argument('rows', type=int, help="Number of buildings, e.g. 1000000")
+    parser.add_argument('--output', default='synthetic_buildings.csv')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--clean', action='store_true', help="Write clean numbers instead of scraped formats")
+    parser.add_argument('--coordinates', action='store_true', help="Add Latitude and Longitude columns")
+    args = parser.parse_args()
+    write_synthetic_csv(args.output, args.rows, seed=args.seed, raw=not args.clean,
+                        with_coordinates=args.coordinates)
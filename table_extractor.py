@@ -0,0 +1,387 @@
+import re
+import time
+import numpy as np
+import pandas as pd
+import requests
+from lxml import etree
+
+# Output columns of the scraper and the header labels that map onto them.
+# Labels are compared after normalization (see _normalize_label), in order of preference.
+BUILDINGS_SCHEMA = {
+    'Building': {'aliases': ['name', 'building'], 'dtype': 'str'},
+    'City': {'aliases': ['city', 'location'], 'dtype': 'str'},
+    'Country': {'aliases': ['country', 'country region', 'nation'], 'dtype': 'str'},
+    'Height': {'aliases': ['height m', 'height metres', 'height meters', 'height'], 'dtype': 'str'},
+    'Floors': {'aliases': ['floors', 'floor count', 'storeys'], 'dtype': 'int'},
+    'Year Completed': {'aliases': ['year completed', 'year', 'built', 'completed'], 'dtype': 'int'},
+}
+
+_LABEL_NOISE = re.compile(r'\[[^\]]*\]|[^0-9a-z]+')
+_LEADING_INT = r'(-?\d[\d,]*)'
+
+
+def _normalize_label(label):
+    """
+    Normalizes a header label for matching, e.g. 'Height\\n(m)[3]' -> 'height m'.
+    """
+    return _LABEL_NOISE.sub(' ', label.lower()).strip()
+
+
+def _class_matches(element, table_class):
+    """
+    Checks whether an element carries all CSS classes in `table_class`.
+    """
+    classes = set((element.get('class') or '').split())
+    return set(table_class.split()) <= classes
+
+
+def _span(element, attribute):
+    """
+    Reads a colspan/rowspan attribute, defaulting to 1 for missing or malformed values.
+    """
+    value = element.get(attribute)
+    if value is None:
+        return 1
+    try:
+        return max(int(value), 1)
+    except ValueError:
+        return 1
+
+
+def _iter_chunks(source, chunk_size):
+    """
+    Yields byte chunks from bytes, str, a file-like object or an iterable of chunks.
+    """
+    if isinstance(source, str):
+        source = source.encode('utf-8')
+    if isinstance(source, bytes):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+    elif hasattr(source, 'read'):
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+    else:
+        for chunk in source:
+            yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+def iter_table_rows(source, table_class='wikitable sortable', chunk_size=1 << 16):
+    """
+    Incrementally parses HTML and yields the rows of the first table with the given class.
+
+    The document is fed to an lxml pull parser chunk by chunk and only table and row
+    events are reported, so the Python side does work per row rather than per element.
+    Each row is released once it has been yielded and parsing stops at the end of the
+    target table.
+
+    Parameters:
+    - source: HTML as bytes/str, a file-like object or an iterable of byte chunks.
+    - table_class (str): Space-separated CSS classes identifying the table.
+    - chunk_size (int): Number of bytes fed to the parser at a time.
+
+    Yields:
+    - tuple: (is_header, cells) where cells is a list of (text, colspan, rowspan) tuples.
+    """
+    parser = etree.HTMLPullParser(events=('start', 'end'), tag=('table', 'tr'))
+    target = None
+
+    for chunk in _iter_chunks(source, chunk_size):
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if element.tag == 'table':
+                if target is None and event == 'start' and _class_matches(element, table_class):
+                    target = element
+                elif event == 'end' and element is target:
+                    parser.close()
+                    return
+                continue
+            if event != 'end' or target is None or _owning_table(element) is not target:
+                continue
+
+            cells = [(cell.tag, ''.join(cell.itertext()).strip(), _span(cell, 'colspan'), _span(cell, 'rowspan'))
+                     for cell in element if cell.tag in ('td', 'th')]
+            if cells:
+                is_header = all(cell[0] == 'th' for cell in cells)
+                yield is_header, [cell[1:] for cell in cells]
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    parser.close()
+
+
+def _owning_table(row):
+    """
+    Returns the table element a row belongs to, looking through thead/tbody/tfoot.
+    """
+    parent = row.getparent()
+    if parent is not None and parent.tag in ('thead', 'tbody', 'tfoot'):
+        parent = parent.getparent()
+    return parent
+
+
+def _expand_rows(rows, carried):
+    """
+    Lays out rows on a grid, resolving colspan and rowspan.
+
+    Parameters:
+    - rows (iterable): Lists of (text, colspan, rowspan) tuples.
+    - carried (dict): Column index -> [text, remaining rows] for cells spanning down.
+      Updated in place so it can be shared across calls.
+
+    Yields:
+    - list: Cell texts, one per grid column.
+    """
+    for cells in rows:
+        grid = []
+        cells = iter(cells)
+        column = 0
+        while True:
+            if column in carried:
+                text, remaining = carried[column]
+                grid.append(text)
+                if remaining == 1:
+                    del carried[column]
+                else:
+                    carried[column][1] -= 1
+                column += 1
+                continue
+            cell = next(cells, None)
+            if cell is None:
+                break
+            text, colspan, rowspan = cell
+            for offset in range(colspan):
+                grid.append(text)
+                if rowspan > 1:
+                    carried[column + offset] = [text, rowspan - 1]
+            column += colspan
+        # Spans that reach past the last explicit cell.
+        while column in carried:
+            text, remaining = carried[column]
+            grid.append(text)
+            if remaining == 1:
+                del carried[column]
+            else:
+                carried[column][1] -= 1
+            column += 1
+        yield grid
+
+
+def _header_labels(header_rows):
+    """
+    Flattens one or more header rows into one label per grid column, e.g. 'Height m'.
+    """
+    labels = []
+    for grid in _expand_rows(header_rows, {}):
+        for column, text in enumerate(grid):
+            if column >= len(labels):
+                labels.append(text)
+            elif text and text != labels[column]:
+                labels[column] = f'{labels[column]} {text}'
+    return labels
+
+
+def map_columns(labels, schema=BUILDINGS_SCHEMA):
+    """
+    Maps schema columns to grid column indexes based on header labels.
+
+    Parameters:
+    - labels (list): Header label for every grid column.
+    - schema (dict): Output column -> {'aliases': [...], 'dtype': ...}.
+
+    Returns:
+    - dict: Output column -> grid column index, for every column that could be matched.
+    """
+    normalized = [_normalize_label(label) for label in labels]
+    mapping = {}
+    for name, spec in schema.items():
+        for alias in spec['aliases']:
+            matches = [i for i, label in enumerate(normalized)
+                       if label == alias and i not in mapping.values()]
+            if matches:
+                mapping[name] = matches[0]
+                break
+    return mapping
+
+
+def _to_column(values, dtype):
+    """
+    Converts a list of cell texts into a typed column array.
+    """
+    values = np.array(values, dtype=object)
+    if dtype == 'int':
+        numbers = pd.Series(values, dtype=object).str.extract(_LEADING_INT, expand=False)
+        return pd.to_numeric(numbers.str.replace(',', '', regex=False), errors='coerce').astype('Int64').array
+    if dtype == 'float':
+        return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype='float64')
+    return values
+
+
+def extract_table(source, table_class='wikitable sortable', schema=BUILDINGS_SCHEMA, chunk_size=1 << 16):
+    """
+    Streams an HTML document and extracts the target table into a DataFrame.
+
+    Columns are located by header name rather than by position, so added, removed or
+    reordered columns in the source page do not shift the extracted values.
+
+    Parameters:
+    - source: HTML as bytes/str, a file-like object or an iterable of byte chunks.
+    - table_class (str): Space-separated CSS classes identifying the table.
+    - schema (dict): Output column -> {'aliases': [...], 'dtype': 'str' | 'int' | 'float'}.
+    - chunk_size (int): Number of bytes fed to the parser at a time.
+
+    Returns:
+    - DataFrame: One typed column per schema entry, or None if the table or one of its
+      columns could not be found.
+    """
+    rows = iter_table_rows(source, table_class=table_class, chunk_size=chunk_size)
+    header_rows = []
+    first_body = None
+    for is_header, cells in rows:
+        if not is_header:
+            first_body = cells
+            break
+        header_rows.append(cells)
+
+    if first_body is None and not header_rows:
+        print(f"Error: No table with class '{table_class}' found.")
+        return None
+
+    mapping = map_columns(_header_labels(header_rows), schema)
+    missing = [name for name in schema if name not in mapping]
+    if missing:
+        print(f"Error: Could not find columns {missing} in table header.")
+        return None
+
+    indexes = list(mapping.values())
+    width = max(indexes) + 1
+    columns = [[] for _ in indexes]
+    body = (cells for is_header, cells in rows if not is_header)
+    if first_body is not None:
+        body = _chain_first(first_body, body)
+    for grid in _expand_rows(body, {}):
+        if len(grid) < width:
+            continue
+        for values, index in zip(columns, indexes):
+            values.append(grid[index])
+
+    return pd.DataFrame({name: _to_column(values, schema[name]['dtype'])
+                         for name, values in zip(mapping, columns)})
+
+
+def _chain_first(first, rest):
+    yield first
+    yield from rest
+
+
+def extract_table_from_url(url, table_class='wikitable sortable', schema=BUILDINGS_SCHEMA,
+                           session=None, chunk_size=1 << 16, timeout=30):
+    """
+    Downloads a page as a stream and extracts the target table without buffering the body.
+
+    Parameters:
+    - url (str): The page to scrape.
+    - table_class (str): Space-separated CSS classes identifying the table.
+    - schema (dict): Output columns and their header aliases.
+    - session (requests.Session): Optional session to reuse connections.
+    - chunk_size (int): Number of bytes read from the socket at a time.
+    - timeout (float): Request timeout in seconds.
+
+    Returns:
+    - DataFrame: The extracted table, or None if it could not be found.
+    """
+    http = session or requests
+    with http.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        return extract_table(response.iter_content(chunk_size=chunk_size),
+                             table_class=table_class, schema=schema, chunk_size=chunk_size)
+
+
+def _beautifulsoup_extract(html):
+    """
+    The original BeautifulSoup loop from main.py, kept as the benchmark baseline.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    table = soup.find('table', {'class': 'wikitable sortable'})
+    building, city, country, height, floors, built = [], [], [], [], [], []
+    for row in table.find_all('tr')[1:]:
+        cells = row.find_all('td')
+        building.append(cells[1].text.strip())
+        city.append(cells[2].text.strip())
+        country.append(cells[3].text.strip())
+        height.append(cells[4].text.strip())
+        floors.append(cells[6].text.strip())
+        built.append(cells[7].text.strip())
+    return pd.DataFrame({
+        'Building': building,
+        'City': city,
+        'Country': country,
+        'Height': height,
+        'Floors': floors,
+        'Year Completed': built
+    })
+
+
+def synthetic_table_html(n_rows, seed=0):
+    """
+    Builds a Wikipedia-like page with a large 'wikitable sortable' table.
+
+    Parameters:
+    - n_rows (int): Number of body rows.
+    - seed (int): Random seed.
+
+    Returns:
+    - str: The HTML document.
+    """
+    rng = np.random.default_rng(seed)
+    countries = ['China', 'United States', 'United Arab Emirates', 'Saudi Arabia', 'Malaysia', 'South Korea']
+    heights = rng.uniform(150, 830, n_rows).round(1)
+    floors = (heights / rng.uniform(3.5, 4.5, n_rows)).astype(int)
+    years = rng.integers(1930, 2024, n_rows)
+    country = rng.choice(countries, n_rows)
+    rows = [
+        f'<tr><td>{i + 1}</td><td><a href="/wiki/T{i}">Tower {i}</a><sup>[{i % 90}]</sup></td>'
+        f'<td>City {i % 500}</td><td><span class="flag"></span> {country[i]}</td>'
+        f'<td>{heights[i]} m</td><td>{round(heights[i] * 3.28084)} ft</td>'
+        f'<td>{floors[i]}</td><td>{years[i]}</td></tr>'
+        for i in range(n_rows)
+    ]
+    return (
+        '<html><head><title>List</title></head><body><p>Intro</p>'
+        '<table class="wikitable sortable"><tr><th>Rank</th><th>Name</th><th>City</th>'
+        '<th>Country</th><th>Height (m)</th><th>Height (ft)</th><th>Floors</th><th>Year</th></tr>'
+        + ''.join(rows) +
+        '</table><table class="wikitable"><tr><td>Other</td></tr></table></body></html>'
+    )
+
+
+def benchmark_extractors(n_rows=50000, repeat=3):
+    """
+    Times the streaming extractor against the original BeautifulSoup loop on a synthetic table.
+
+    Parameters:
+    - n_rows (int): Number of rows in the synthetic table.
+    - repeat (int): Number of timed runs per extractor; the best run is reported.
+
+    Returns:
+    - DataFrame: Best time and throughput for each extractor.
+    """
+    html = synthetic_table_html(n_rows).encode('utf-8')
+    results = []
+    for name, extractor in [('beautifulsoup', _beautifulsoup_extract), ('streaming', extract_table)]:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            df = extractor(html)
+            timings.append(time.perf_counter() - start)
+        assert len(df) == n_rows
+        best = min(timings)
+        results.append({'extractor': name, 'rows': n_rows, 'seconds': best, 'rows_per_second': n_rows / best})
+    results = pd.DataFrame(results)
+    print(results.to_string(index=False))
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_extractors()
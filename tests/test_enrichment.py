@@ -0,0 +1,88 @@
+import json
+import time
+
+from enrichment import fetch_country_series
+
+CODES = {'Flaky': 'FLK', 'Slow': 'SLW', 'Missing': 'MIS', 'Steady': 'STD'}
+
+
+def series_body(value):
+    return json.dumps([{'page': 1}, [{'date': '2020', 'value': value}, {'date': '2021', 'value': value + 1}]]).encode('utf-8')
+
+
+class WorldBank:
+    """
+    Stand-in for the indicator API: 'FLK' fails with 503 twice before answering,
+    'SLW' answers after `delay` seconds, 'MIS' is 404 and 'STD' always answers.
+    """
+
+    def __init__(self, delay=1.0):
+        self.delay = delay
+        self.calls = {}
+
+    def __call__(self, request):
+        code = request.path.split('/')[3]
+        self.calls[code] = self.calls.get(code, 0) + 1
+        if code == 'FLK' and self.calls[code] <= 2:
+            return 503, {}, b'busy'
+        if code == 'SLW':
+            time.sleep(self.delay)
+        if code == 'MIS':
+            return 404, {}, b'not found'
+        return 200, {'Content-Type': 'application/json'}, series_body(100.0)
+
+
+def fetch(server, countries, **kwargs):
+    options = dict(url_template=server.url + '/v2/country/{code}/indicator/{indicator}', country_codes=CODES,
+                   rate=0, retries=2, backoff=0.01, timeout=0.3, cache_dir=None)
+    options.update(kwargs)
+    return fetch_country_series(countries, **options)
+
+
+def test_retries_transient_errors(local_server):
+    api = WorldBank()
+    server = local_server(api)
+    series = fetch(server, ['Flaky'])
+    assert api.calls['FLK'] == 3
+    assert series['Country'].tolist() == ['Flaky', 'Flaky']
+    assert series['GDP'].tolist() == [100.0, 101.0]
+
+
+def test_failures_are_isolated_per_country(local_server):
+    api = WorldBank(delay=1.0)
+    server = local_server(api)
+    series = fetch(server, ['Slow', 'Missing', 'Steady', 'Flaky', 'Unknown'])
+
+    assert sorted(series['Country'].unique()) == ['Flaky', 'Steady']
+    # Timeouts are retried; a 404 is final.
+    assert api.calls['SLW'] == 3
+    assert api.calls['MIS'] == 1
+
+
+def test_responses_are_cached(local_server, tmp_path):
+    api = WorldBank()
+    server = local_server(api)
+    first = fetch(server, ['Steady'], cache_dir=str(tmp_path))
+    second = fetch(server, ['Steady'], cache_dir=str(tmp_path))
+    assert api.calls['STD'] == 1
+    assert first.equals(second)
+
+
+def test_each_thread_gets_its_own_session():
+    from concurrent.futures import ThreadPoolExecutor
+    import threading
+    from enrichment import ThreadSessions
+
+    sessions = ThreadSessions()
+    barrier = threading.Barrier(3)
+
+    def session_ids():
+        first = sessions.get()
+        barrier.wait()
+        return id(first), sessions.get() is first
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        results = list(executor.map(lambda _: session_ids(), range(3)))
+    sessions.close()
+    assert all(same for _, same in results)
+    assert len({session for session, _ in results}) == 3
@@ -0,0 +1,90 @@
+import pandas as pd
+
+from incremental_scrape import incremental_scrape
+
+HEADER = '<tr><th>Name</th><th>City</th><th>Country</th><th>Height (m)</th><th>Floors</th><th>Year</th></tr>'
+
+
+def page(rows):
+    cells = ''.join(f"<tr>{''.join(f'<td>{value}</td>' for value in row)}</tr>" for row in rows)
+    return f'<html><body><table class="wikitable sortable">{HEADER}{cells}</table></body></html>'.encode('utf-8')
+
+
+ROWS = [
+    ('Tower A', 'Dubai', 'United Arab Emirates', '500 m', 100, 2010),
+    ('Tower B', 'Shanghai', 'China', '400 m', 90, 2012),
+    ('Tower C', 'Seoul', 'South Korea', '300 m', 80, 2015),
+]
+
+
+class Site:
+    """
+    Serves `body` with an ETag derived from its version and answers 304 to a matching
+    If-None-Match.
+    """
+
+    def __init__(self, body):
+        self.body = body
+        self.version = 1
+
+    def publish(self, body):
+        self.body = body
+        self.version += 1
+
+    def __call__(self, request):
+        etag = f'"v{self.version}"'
+        if request.headers.get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, b''
+        return 200, {'ETag': etag, 'Content-Type': 'text/html'}, self.body
+
+
+def test_unchanged_page_returns_empty_changeset(local_server, tmp_path):
+    site = Site(page(ROWS))
+    server = local_server(site)
+    output = tmp_path / 'buildings.csv'
+
+    first = incremental_scrape(server.url, output_path=str(output), cache_dir=str(tmp_path / 'cache'))
+    assert len(first.added) == 3
+    written = output.stat().st_mtime_ns
+
+    second = incremental_scrape(server.url, output_path=str(output), cache_dir=str(tmp_path / 'cache'))
+    assert second.is_empty
+    assert server.requests[-1][1].get('If-None-Match') == '"v1"'
+    assert output.stat().st_mtime_ns == written
+
+
+def test_changed_page_reports_added_changed_and_removed_rows(local_server, tmp_path):
+    site = Site(page(ROWS))
+    server = local_server(site)
+    output = tmp_path / 'buildings.csv'
+    incremental_scrape(server.url, output_path=str(output), cache_dir=str(tmp_path / 'cache'))
+
+    site.publish(page([
+        ('Tower A', 'Dubai', 'United Arab Emirates', '510 m', 100, 2010),
+        ROWS[2],
+        ('Tower D', 'Doha', 'Qatar', '350 m', 70, 2020),
+    ]))
+    changes = incremental_scrape(server.url, output_path=str(output), cache_dir=str(tmp_path / 'cache'))
+
+    assert changes.added['Building'].tolist() == ['Tower D']
+    assert changes.changed['Building'].tolist() == ['Tower A']
+    assert changes.changed['Height'].tolist() == ['510 m']
+    assert changes.removed['Building'].tolist() == ['Tower B']
+    stored = pd.read_csv(output)
+    assert stored['Building'].tolist() == ['Tower A', 'Tower C', 'Tower D']
+
+
+def test_failed_extraction_is_fetched_again(local_server, tmp_path):
+    site = Site(b'<html><body><p>No table here</p></body></html>')
+    server = local_server(site)
+    output = tmp_path / 'buildings.csv'
+
+    assert incremental_scrape(server.url, output_path=str(output), cache_dir=str(tmp_path / 'cache')) is None
+    assert not output.exists()
+
+    # Same page version: without stored validators the request is unconditional.
+    site.body = page(ROWS)
+    changes = incremental_scrape(server.url, output_path=str(output), cache_dir=str(tmp_path / 'cache'))
+    assert 'If-None-Match' not in server.requests[-1][1]
+    assert len(changes.added) == 3
+    assert len(pd.read_csv(output)) == 3
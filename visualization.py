@@ -1,14 +1,21 @@
-import matplotlib.pyplot as plt
-import seaborn as sns
 import pandas as pd
+from chart_rendering import finish_figure
+from data_analysis import correlation_matrix
+from data_cleaning import as_dataframe
+from lazy_imports import lazy_import
+from regional_aggregation import aggregate_regions
 
-def plot_height_trend(data, country_name):
+plt = lazy_import('matplotlib.pyplot')
+sns = lazy_import('seaborn')
+
+def plot_height_trend(data, country_name, output_file=None):
     """
     Plots the height trend of buildings in a given country over time.
     
     Parameters:
     - data (DataFrame): The DataFrame containing building data.
     - country_name (str): The name of the country to filter data by.
+    - output_file (str): Optional path to save the figure to.
     """
     country_data = data[data['Country'] == country_name]
     if country_data.empty:
@@ -17,101 +24,107 @@ def plot_height_trend(data, country_name):
     
     sorted_data = country_data.sort_values(by='Year Completed')
     plt.figure(figsize=(10, 6))
-    plt.plot(sorted_data['Year Completed'], sorted_data['Height (m)'], marker='o', label=country_name)
+    plt.plot(sorted_data['Year Completed'], sorted_data['Height'], marker='o', label=country_name)
     plt.title(f'Height Trend of Tallest Buildings in {country_name}')
     plt.xlabel('Year Completed')
     plt.ylabel('Height (m)')
     plt.grid()
     plt.legend()
-    plt.show()
+    finish_figure(output_file)
 
-def compare_country_trends(data, countries):
+def compare_country_trends(data, countries, output_file=None):
     """
     Plots the height trends of buildings for multiple countries over time.
     
     Parameters:
     - data (DataFrame): The DataFrame containing building data.
     - countries (list of str): List of country names to compare.
+    - output_file (str): Optional path to save the figure to.
     """
     plt.figure(figsize=(12, 8))
     for country in countries:
         country_data = data[data['Country'] == country]
         if not country_data.empty:
             sorted_data = country_data.sort_values(by='Year Completed')
-            plt.plot(sorted_data['Year Completed'], sorted_data['Height (m)'], marker='o', label=country)
+            plt.plot(sorted_data['Year Completed'], sorted_data['Height'], marker='o', label=country)
     
     plt.title('Height Trends of Tallest Buildings by Country')
     plt.xlabel('Year Completed')
     plt.ylabel('Height (m)')
     plt.grid()
     plt.legend()
-    plt.show()
+    finish_figure(output_file)
 
-def country_building_distribution(data):
+def country_building_distribution(data, output_file=None):
     """
     Visualizes the distribution of tallest buildings by country.
     
     Parameters:
     - data (DataFrame): The DataFrame containing building data.
+    - output_file (str): Optional path to save the figure to.
     """
     plt.figure(figsize=(10, 8))
-    sns.countplot(y='Country', data=data, order=data['Country'].value_counts().index)
+    country_counts = aggregate_regions(data)['country']['count'].droplevel('Region')
+    sns.barplot(x=country_counts.to_numpy(), y=country_counts.index.astype(str), orient='h')
     plt.title('Distribution of Tallest Buildings by Country')
     plt.xlabel('Count of Buildings')
     plt.ylabel('Country')
-    plt.show()
+    finish_figure(output_file)
 
-def tallest_buildings_bar_chart(data, top_n=10):
+def tallest_buildings_bar_chart(data, top_n=10, output_file=None):
     """
     Creates a bar chart for the top N tallest buildings.
     
     Parameters:
     - data (DataFrame): The DataFrame containing building data.
     - top_n (int): Number of top tallest buildings to display.
+    - output_file (str): Optional path to save the figure to.
     """
-    top_buildings = data.nlargest(top_n, 'Height (m)')
+    top_buildings = data.nlargest(top_n, 'Height')
     plt.figure(figsize=(12, 8))
-    sns.barplot(x='Height (m)', y='Building', data=top_buildings)
+    sns.barplot(x='Height', y='Building', data=top_buildings)
     plt.title(f'Top {top_n} Tallest Buildings')
     plt.xlabel('Height (m)')
     plt.ylabel('Building')
-    plt.show()
+    finish_figure(output_file)
 
-def height_histogram(data, bins=15):
+def height_histogram(data, bins=15, output_file=None):
     """
     Plots a histogram of building heights.
     
     Parameters:
     - data (DataFrame): The DataFrame containing building data.
     - bins (int): Number of bins for the histogram.
+    - output_file (str): Optional path to save the figure to.
     """
     plt.figure(figsize=(10, 6))
-    plt.hist(data['Height (m)'], bins=bins, color='blue', edgecolor='black')
+    plt.hist(data['Height'], bins=bins, color='blue', edgecolor='black')
     plt.title('Distribution of Building Heights')
     plt.xlabel('Height (m)')
     plt.ylabel('Frequency')
     plt.grid()
-    plt.show()
+    finish_figure(output_file)
 
-def correlation_heatmap(data):
+def correlation_heatmap(data, output_file=None):
     """
     Displays a heatmap of correlations between numerical attributes in the dataset.
     
     Parameters:
     - data (DataFrame): The DataFrame containing building data.
+    - output_file (str): Optional path to save the figure to.
     """
-    correlation_matrix = data.corr()
     plt.figure(figsize=(10, 8))
-    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm', fmt='.2f', linewidths=0.5)
+    sns.heatmap(correlation_matrix(data), annot=True, cmap='coolwarm', fmt='.2f', linewidths=0.5)
     plt.title('Correlation Heatmap')
-    plt.show()
+    finish_figure(output_file)
 
-def yearly_construction_trend(data):
+def yearly_construction_trend(data, output_file=None):
     """
     Plots the number of buildings constructed per year.
     
     Parameters:
     - data (DataFrame): The DataFrame containing building data.
+    - output_file (str): Optional path to save the figure to.
     """
     yearly_count = data['Year Completed'].value_counts().sort_index()
     plt.figure(figsize=(12, 6))
@@ -120,35 +133,57 @@ def yearly_construction_trend(data):
     plt.xlabel('Year')
     plt.ylabel('Number of Buildings')
     plt.grid()
-    plt.show()
+    finish_figure(output_file)
 
-def floors_vs_height_scatter(data):
+def floors_vs_height_scatter(data, output_file=None):
     """
     Creates a scatter plot to show the relationship between the number of floors and building height.
     
     Parameters:
     - data (DataFrame): The DataFrame containing building data.
+    - output_file (str): Optional path to save the figure to.
     """
     plt.figure(figsize=(10, 6))
-    sns.scatterplot(x='Floors', y='Height (m)', data=data, hue='Country')
+    sns.scatterplot(x='Floors', y='Height', data=data, hue='Country')
     plt.title('Number of Floors vs Height of Buildings')
     plt.xlabel('Floors')
     plt.ylabel('Height (m)')
     plt.legend(loc='upper left')
     plt.grid()
-    plt.show()
+    finish_figure(output_file)
 
-def tallest_in_each_country(data):
+def tallest_in_each_country(data, output_file=None):
     """
     Creates a bar chart showing the tallest building in each country.
     
     Parameters:
     - data (DataFrame): The DataFrame containing building data.
+    - output_file (str): Optional path to save the figure to.
     """
-    tallest_per_country = data.loc[data.groupby('Country')['Height (m)'].idxmax()]
+    tallest = aggregate_regions(data)['country'].droplevel('Region').sort_index()
+    tallest_per_country = pd.DataFrame({'Country': tallest.index.astype(str), 'Height': tallest['height_max'].to_numpy()})
     plt.figure(figsize=(14, 8))
-    sns.barplot(x='Height (m)', y='Country', data=tallest_per_country)
+    sns.barplot(x='Height', y='Country', data=tallest_per_country)
     plt.title('Tallest Building in Each Country')
     plt.xlabel('Height (m)')
     plt.ylabel('Country')
-    plt.show()
+    finish_figure(output_file)
+
+
+def create_visualizations(data):
+    """
+    Creates the standard set of charts for the dataset.
+    
+    Parameters:
+    - data (DataFrame or str): The cleaned DataFrame, or the path to the raw data file.
+    """
+    data = as_dataframe(data)
+    if data is None:
+        return
+    tallest_buildings_bar_chart(data)
+    height_histogram(data)
+    floors_vs_height_scatter(data)
+    yearly_construction_trend(data)
+    country_building_distribution(data)
+    tallest_in_each_country(data)
+    correlation_heatmap(data.select_dtypes(include='number'))